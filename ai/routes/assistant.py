@@ -1,10 +1,8 @@
 from datetime import datetime, timezone
 import logging
 import torch
-from fastapi import APIRouter, Depends, Request, HTTPException
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
-from typing import List
+from fastapi import APIRouter, Depends, Header, Request, Response, HTTPException
+from typing import Annotated, List, Optional
 
 from models.users import UserResponse
 from models.assistant import AssistantResponse, AssistantMessage, VoiceRequest, MessageRequest
@@ -13,6 +11,7 @@ from queries.tasks import TaskQueries
 from queries.calendar import CalendarQueries
 from utils.authentication import try_get_jwt_user_data
 from utils.exceptions import AuthExceptions
+from utils.responses import encode_response, preferred_media_type
 
 
 router = APIRouter(tags=["ADHDAssistant"], prefix="/api/assistant")
@@ -34,8 +33,9 @@ async def send_message(
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     assistant_queries: ADHDAssistantQueries = Depends(get_assistant_queries),
     task_queries: TaskQueries = Depends(),
-    calendar_queries: CalendarQueries = Depends()
-) -> JSONResponse:
+    calendar_queries: CalendarQueries = Depends(),
+    accept: Annotated[Optional[str], Header()] = None
+) -> Response:
     if not current_user:
         raise AuthExceptions.unauthorized()
     
@@ -51,8 +51,9 @@ async def send_message(
             logger.error(f"Invalid response format: {response}")
             raise HTTPException(status_code=500, detail="Invalid response format from assistant")
 
-        return JSONResponse(
-            content=jsonable_encoder(response),
+        return encode_response(
+            response,
+            preferred_media_type(accept),
             headers={
                 "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
                 "Pragma": "no-cache",
@@ -90,8 +91,9 @@ async def send_voice(
 async def get_message_history(
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     assistant_queries: ADHDAssistantQueries = Depends(),
-    limit: int = 10
-):
+    limit: int = 10,
+    accept: Annotated[Optional[str], Header()] = None
+) -> Response:
     if not current_user:
         raise AuthExceptions.unauthorized()
     
@@ -100,7 +102,7 @@ async def get_message_history(
             user_id=current_user.id,
             limit=limit
         )
-        return messages
+        return encode_response(messages, preferred_media_type(accept))
 
     except Exception as e:
         logger.error(f"Failed to fetch message history: {e}")
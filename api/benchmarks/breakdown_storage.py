@@ -0,0 +1,123 @@
+"""
+Storage footprint and encode/decode cost of task breakdowns.
+
+Compares the previous layout, where every task embedded its breakdown and
+the analyzer cache kept a second JSON copy, with the content-addressed
+task_breakdowns store holding one compressed payload per distinct
+breakdown. Sizes are BSON document bytes; no MongoDB connection is made:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.breakdown_storage
+"""
+import json
+import os
+import random
+import time
+import bson
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from models.tasks import Task, TaskBreakdown, TaskStep, TaskCache, StoredBreakdown
+from queries.breakdowns import BreakdownStore
+
+TASK_COUNT = 5_000
+DISTINCT_BREAKDOWNS = 1_000
+ROUNDS = 2_000
+
+WORDS = (
+    "open the laptop write first sentence pick one item set a timer clear the desk "
+    "gather materials take a short walk reply to the email check the list put on music"
+).split()
+
+
+def sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+
+def sample_breakdown(rng: random.Random) -> TaskBreakdown:
+    return TaskBreakdown(
+        steps=[
+            TaskStep(
+                description=sentence(rng, 8),
+                time_estimate=rng.choice([5, 10, 15, 25]),
+                initiation_tip=sentence(rng, 10),
+                completion_signal=sentence(rng, 6),
+                dopamine_hook=sentence(rng, 6)
+            )
+            for _ in range(rng.randint(3, 7))
+        ],
+        suggested_breaks=[2, 4],
+        initiation_strategy=sentence(rng, 12),
+        energy_level_needed=rng.randint(1, 3),
+        materials_needed=[rng.choice(WORDS) for _ in range(3)],
+        environment_setup=sentence(rng, 10)
+    )
+
+
+def bson_size(document: dict) -> int:
+    return len(bson.encode(document))
+
+
+def per_op_us(func, rounds: int = ROUNDS) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1_000_000
+
+
+def main() -> None:
+    rng = random.Random(7)
+    distinct = [sample_breakdown(rng) for _ in range(DISTINCT_BREAKDOWNS)]
+    assigned = [distinct[index % DISTINCT_BREAKDOWNS] for index in range(TASK_COUNT)]
+
+    def task(**fields) -> Task:
+        return Task(title="Plan the week", description="Groceries and meals", priority=2,
+                    status="pending", user_id="benchmark-user", **fields)
+
+    bare_task = bson_size(task().model_dump_doc())
+
+    embedded = sum(bson_size(task(breakdown=b).model_dump_doc()) - bare_task for b in assigned)
+    legacy_cache = sum(
+        bson_size(TaskCache(task_key="plan the week:groceries and meals",
+                            breakdown=json.dumps(b.model_dump())).model_dump_doc())
+        for b in distinct
+    )
+    before = embedded + legacy_cache
+
+    keys = [BreakdownStore.key_for(b) for b in distinct]
+    referenced = sum(bson_size(task(breakdown_key=keys[0]).model_dump_doc()) - bare_task for _ in assigned)
+    cache_refs = sum(
+        bson_size(TaskCache(task_key="plan the week:groceries and meals", breakdown_key=key).model_dump_doc())
+        for key in keys
+    )
+    stored = []
+    for b in distinct:
+        canonical = BreakdownStore.canonical(b)
+        stored.append(StoredBreakdown(
+            key=BreakdownStore.key_for(b),
+            payload=BreakdownStore.encode(canonical),
+            size=len(canonical)
+        ))
+    store = sum(bson_size(s.model_dump_doc()) for s in stored)
+    after = referenced + cache_refs + store
+
+    raw = sum(s.size for s in stored)
+    compressed = sum(len(s.payload) for s in stored)
+
+    sample = distinct[0]
+    sample_doc = task(breakdown=sample).model_dump_doc()
+    encode_us = per_op_us(lambda: BreakdownStore.encode(BreakdownStore.canonical(sample)))
+    hash_us = per_op_us(lambda: BreakdownStore.key_for(sample))
+    decode_us = per_op_us(lambda: BreakdownStore.decode(stored[0]))
+    embedded_decode_us = per_op_us(lambda: TaskBreakdown.model_validate(sample_doc["breakdown"]))
+
+    print(f"tasks={TASK_COUNT} distinct_breakdowns={DISTINCT_BREAKDOWNS}")
+    print(f"before: embedded={embedded / 1e6:.2f}MB cache_json={legacy_cache / 1e6:.2f}MB total={before / 1e6:.2f}MB")
+    print(f"after:  task_refs={referenced / 1e6:.2f}MB cache_refs={cache_refs / 1e6:.2f}MB "
+          f"store={store / 1e6:.2f}MB total={after / 1e6:.2f}MB ({1 - after / before:.1%} smaller)")
+    print(f"payload: canonical={raw / 1e3:.0f}KB zlib={compressed / 1e3:.0f}KB ratio={raw / compressed:.2f}x")
+    print(f"encode={encode_us:.1f}us hash={hash_us:.1f}us decode={decode_us:.1f}us "
+          f"embedded_decode={embedded_decode_us:.1f}us per breakdown")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Per-insert CPU overhead of preparing a Google Calendar event insert,
+excluding the network round trip. "per call" is the old path: decrypt both
+tokens, build the service from the discovery document, create its events()
+resource and the insert request. "cached" is a warm request through the
+credentials cache and the process-wide calendar_events() builder:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.calendar_insert_overhead
+"""
+import os
+import time
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from googleapiclient.discovery import build
+
+from config.calendar_mgr import CredentialsCache, calendar_events, get_google_service
+
+USER_ID = "6507f1f77bcf86cd79943901"
+MIN_SECONDS = 1.0
+EVENT = {
+    "summary": "Write the quarterly report",
+    "description": "Outline, draft and review",
+    "start": {"dateTime": "2026-01-05T09:00:00+00:00", "timeZone": "UTC"},
+    "end": {"dateTime": "2026-01-05T10:00:00+00:00", "timeZone": "UTC"},
+    "reminders": {"useDefault": False, "overrides": [{"method": "popup", "minutes": 30}]},
+}
+
+
+def per_op_ms(func) -> float:
+    func()
+    rounds = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < MIN_SECONDS:
+        func()
+        rounds += 1
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main() -> None:
+    google_service = get_google_service()
+    access = google_service.encrypt_token("ya29." + "a" * 160)
+    refresh = google_service.encrypt_token("1//" + "r" * 100)
+
+    def per_call():
+        credentials = google_service.create_credentials(access, refresh)
+        service = build("calendar", "v3", credentials=credentials)
+        service.events().insert(calendarId="primary", body=EVENT)
+
+    credentials_cache = CredentialsCache()
+
+    def cached():
+        credentials = credentials_cache.get(USER_ID)
+        if credentials is None:
+            credentials = google_service.create_credentials(access, refresh)
+            credentials_cache.set(USER_ID, credentials)
+        calendar_events().insert(calendarId="primary", body=EVENT)
+
+    before = per_op_ms(per_call)
+    after = per_op_ms(cached)
+    print(f"per call: {before:7.3f}ms/insert")
+    print(f"cached:   {after:7.3f}ms/insert ({before / after:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
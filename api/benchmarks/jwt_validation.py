@@ -0,0 +1,59 @@
+"""
+Per-request session token validation cost, with and without the verified
+token cache. "uncached" is a full HS256 verification plus JWTPayload
+construction on every request; "cached" is the steady state once a token has
+been seen; "miss" is the first request of a token, including the cache write:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.jwt_validation
+"""
+import asyncio
+import os
+import time
+from datetime import UTC, datetime, timedelta
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from jose import jwt
+
+from models.jwt import JWTPayload, JWTUserData
+from utils.authentication import ALGORITHM, SIGNING_KEY, decode_jwt
+from utils.token_cache import token_cache
+
+ROUNDS = 20_000
+
+
+def make_token(index: int) -> str:
+    payload = JWTPayload(
+        exp=int((datetime.now(tz=UTC) + timedelta(hours=1)).timestamp()),
+        sub=f"user{index}",
+        user=JWTUserData(id=f"{index:024x}", username=f"user{index}"),
+    )
+    return jwt.encode(payload.model_dump(), SIGNING_KEY, algorithm=ALGORITHM)
+
+
+async def per_request_us(tokens: list[str], before_each=None) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        if before_each:
+            before_each()
+        await decode_jwt(token)
+    return (time.perf_counter() - start) / len(tokens) * 1_000_000
+
+
+async def main() -> None:
+    token = make_token(0)
+    fresh = [make_token(index) for index in range(ROUNDS)]
+
+    uncached = await per_request_us([token] * ROUNDS, before_each=token_cache.clear)
+    token_cache.clear()
+    miss = await per_request_us(fresh)
+    cached = await per_request_us([token] * ROUNDS)
+
+    print(f"uncached: {uncached:7.1f}us/request")
+    print(f"miss:     {miss:7.1f}us/request")
+    print(f"cached:   {cached:7.1f}us/request ({uncached / cached:.0f}x)")
+    print(token_cache.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+NDJSON export/import throughput in MB/s.
+
+Runs TaskQueries.export_tasks and TaskQueries.import_tasks against an
+in-memory stand-in for the tasks collection, so the numbers cover cursor
+decoding, validation and serialization but not MongoDB I/O:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.ndjson_throughput
+"""
+import asyncio
+import logging
+import os
+import time
+import structlog
+from unittest.mock import patch
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from models.tasks import Task, TaskBreakdown, TaskStep, TaskContext
+from queries.tasks import TaskQueries
+
+TASK_COUNT = 20_000
+CHUNK_SIZE = 64 * 1024
+
+
+class InMemoryCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def batch_size(self, size):
+        return self
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+class InMemoryCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.version = 0
+
+    def find(self, query):
+        return InMemoryCursor(self.docs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        self.version += 1
+        return {"version": self.version}
+
+    async def update_one(self, *args, **kwargs):
+        pass
+
+    async def bulk_write(self, requests, ordered=True):
+        class Result:
+            inserted_count = len(requests)
+        return Result()
+
+
+class InMemoryEngine:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get_collection(self, model):
+        return self.collection
+
+
+def sample_task(index: int) -> Task:
+    return Task(
+        title=f"Task number {index}",
+        description="Pick up groceries and plan meals for the week",
+        priority=1 + index % 3,
+        status="pending",
+        user_id="benchmark-user",
+        context=TaskContext(),
+        breakdown=TaskBreakdown(
+            steps=[
+                TaskStep(
+                    description=f"Step {step} of the plan",
+                    time_estimate=10,
+                    initiation_tip="Set a five minute timer",
+                    completion_signal="List is written down",
+                    dopamine_hook="Tick it off"
+                )
+                for step in range(5)
+            ],
+            suggested_breaks=[2, 4],
+            initiation_strategy="Start with the easiest item",
+            energy_level_needed=2,
+            materials_needed=["notebook", "pen"],
+            environment_setup="Clear the kitchen table"
+        )
+    )
+
+
+async def main() -> None:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    docs = [sample_task(index).model_dump_doc() for index in range(TASK_COUNT)]
+    collection = InMemoryCollection(docs)
+
+    with patch("queries.tasks.engine", InMemoryEngine(collection)), \
+         patch("queries.breakdowns.engine", InMemoryEngine(collection)):
+        queries = TaskQueries()
+        queries.events.local_publish = False
+
+        start = time.perf_counter()
+        exported = [line async for line in queries.export_tasks("benchmark-user")]
+        export_seconds = time.perf_counter() - start
+        payload = b"".join(exported)
+        megabytes = len(payload) / 1_000_000
+
+        async def chunks():
+            for offset in range(0, len(payload), CHUNK_SIZE):
+                yield payload[offset:offset + CHUNK_SIZE]
+
+        start = time.perf_counter()
+        result = await queries.import_tasks("benchmark-user", chunks())
+        import_seconds = time.perf_counter() - start
+
+    print(f"tasks={TASK_COUNT} payload={megabytes:.1f}MB imported={result.imported}")
+    print(f"export={megabytes / export_seconds:.1f}MB/s import={megabytes / import_seconds:.1f}MB/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+CPU cost against bytes saved for response compression, to tune
+COMPRESSION_MIN_SIZE and COMPRESSION_LEVELS. Bodies are task lists with
+distinct generated breakdowns rendered by utils.responses, from a single
+task up to a large /api/tasks/all response:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.response_compression
+"""
+import gzip
+import os
+import random
+import time
+
+import brotli
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from benchmarks.breakdown_storage import sample_breakdown
+from benchmarks.task_list_rendering import sample_task
+from utils.responses import dumps, packb, task_document
+
+LIST_SIZES = (1, 5, 20, 100, 500)
+SETTINGS = (
+    ("gzip", 1), ("gzip", 6), ("gzip", 9),
+    ("br", 1), ("br", 4), ("br", 6), ("br", 11),
+)
+MIN_SECONDS = 0.2
+
+
+def compressor(encoding: str, level: int):
+    if encoding == "br":
+        return lambda body: brotli.compress(body, quality=level)
+    return lambda body: gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def per_op_ms(func, body: bytes) -> float:
+    rounds = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < MIN_SECONDS:
+        func(body)
+        rounds += 1
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main() -> None:
+    for media_type, render in (("json", dumps), ("msgpack", packb)):
+        for count in LIST_SIZES:
+            rng = random.Random(count)
+            body = render([
+                task_document(sample_task(index), sample_breakdown(rng))
+                for index in range(count)
+            ])
+            results = []
+            for encoding, level in SETTINGS:
+                compress = compressor(encoding, level)
+                saved = len(body) - len(compress(body))
+                cpu_ms = per_op_ms(compress, body)
+                results.append(
+                    f"{encoding}{level}: -{saved / len(body):.0%} {cpu_ms:.2f}ms "
+                    f"{saved / 1000 / cpu_ms:.0f}KB/ms"
+                )
+            print(f"{media_type} tasks={count} body={len(body) / 1000:.1f}KB")
+            print("  " + " | ".join(results))
+
+
+if __name__ == "__main__":
+    main()
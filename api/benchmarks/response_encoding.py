@@ -0,0 +1,55 @@
+"""
+Payload size and encode/decode cost of the JSON and MessagePack task list
+representations produced by utils.responses, for typical list sizes with
+and without breakdowns:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.response_encoding
+"""
+import os
+import time
+
+import msgpack
+import orjson
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from benchmarks.task_list_rendering import sample_task
+from utils.responses import dumps, packb, task_document
+
+LIST_SIZES = (20, 100, 500)
+ROUNDS = 200
+
+
+def per_op_us(func) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func()
+    return (time.perf_counter() - start) / ROUNDS * 1_000_000
+
+
+def main() -> None:
+    for with_breakdowns in (True, False):
+        for count in LIST_SIZES:
+            tasks = [sample_task(index) for index in range(count)]
+            if not with_breakdowns:
+                for task in tasks:
+                    task.breakdown = None
+            documents = [task_document(task) for task in tasks]
+
+            as_json = dumps(documents)
+            as_msgpack = packb(documents)
+            assert msgpack.unpackb(as_msgpack) == orjson.loads(as_json)
+
+            print(
+                f"tasks={count} breakdowns={'yes' if with_breakdowns else 'no'} "
+                f"json={len(as_json) / 1000:.1f}KB msgpack={len(as_msgpack) / 1000:.1f}KB "
+                f"({1 - len(as_msgpack) / len(as_json):.1%} smaller) "
+                f"encode json={per_op_us(lambda: dumps(documents)):.0f}us "
+                f"msgpack={per_op_us(lambda: packb(documents)):.0f}us "
+                f"decode json={per_op_us(lambda: orjson.loads(as_json)):.0f}us "
+                f"msgpack={per_op_us(lambda: msgpack.unpackb(as_msgpack)):.0f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
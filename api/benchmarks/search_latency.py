@@ -0,0 +1,98 @@
+"""
+Task search latency at 10k tasks for a single user.
+
+Seeds a scratch database, then times ranked, paginated searches through
+TaskQueries.search_tasks. Requires a reachable MongoDB:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.search_latency
+"""
+import asyncio
+import logging
+import os
+import random
+import statistics
+import time
+import structlog
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from odmantic import AIOEngine
+
+import queries.tasks as task_queries_module
+from models.tasks import Task, TaskBreakdown, TaskStep
+from queries.tasks import TaskQueries
+
+DATABASE = "audhd_benchmark_search"
+TASK_COUNT = 10_000
+SEARCH_ROUNDS = 200
+WORDS = [
+    "call", "dentist", "laundry", "groceries", "email", "report", "taxes",
+    "doctor", "clean", "kitchen", "pay", "rent", "study", "exam", "walk",
+    "dog", "plan", "meeting", "water", "plants", "book", "flight", "gym",
+]
+QUERIES = ["dentist", "call dentist", "groceries", "pay rent", "study exam", "water plants"]
+
+
+def random_task(user_id: str) -> Task:
+    title = " ".join(random.sample(WORDS, 3))
+    steps = [
+        TaskStep(
+            description=" ".join(random.sample(WORDS, 5)),
+            time_estimate=10,
+            initiation_tip="Start small",
+            completion_signal="Done",
+            dopamine_hook="Treat"
+        )
+        for _ in range(4)
+    ]
+    return Task(
+        title=title,
+        description=" ".join(random.sample(WORDS, 8)),
+        priority=random.randint(1, 3),
+        status="pending",
+        user_id=user_id,
+        breakdown=TaskBreakdown(
+            steps=steps,
+            suggested_breaks=[2],
+            initiation_strategy="Begin",
+            energy_level_needed=2,
+            materials_needed=[],
+            environment_setup="Desk"
+        )
+    )
+
+
+async def main() -> None:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    client = AsyncIOMotorClient(os.environ["MONGO_DB_URI"])
+    engine = AIOEngine(client=client, database=DATABASE)
+    task_queries_module.engine = engine
+    user_id = "benchmark-user"
+
+    try:
+        await engine.configure_database([Task])
+        tasks = [random_task(user_id) for _ in range(TASK_COUNT)]
+        await engine.get_collection(Task).insert_many([task.model_dump_doc() for task in tasks])
+
+        queries = TaskQueries()
+        timings = []
+        for round_number in range(SEARCH_ROUNDS):
+            text = QUERIES[round_number % len(QUERIES)]
+            page = 1 + round_number % 3
+            start = time.perf_counter()
+            await queries.search_tasks(user_id, text, page=page, page_size=20)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        print(f"tasks={TASK_COUNT} searches={SEARCH_ROUNDS}")
+        print(f"p50={statistics.median(timings):.2f}ms "
+              f"p95={timings[int(len(timings) * 0.95)]:.2f}ms "
+              f"max={timings[-1]:.2f}ms")
+    finally:
+        await client.drop_database(DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+/signin throughput and event-loop stall against concurrency, with bcrypt run
+inline on the event loop (the old behaviour) and on the bounded hashing pool.
+
+Calls the signin route directly with the user lookup stubbed out (it still
+yields to the loop once, like a real query), so the numbers cover bcrypt,
+JWT signing and the route itself but not MongoDB. The stall column is the
+worst delay seen by a 1ms ticker, i.e. how long any other request would have
+waited behind the login burst. Throughput only scales past one core's worth
+of bcrypt with PASSWORD_HASH_WORKERS > 1 on a multi-core host:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.signin_throughput
+"""
+import asyncio
+import logging
+import os
+import time
+import structlog
+from unittest.mock import patch
+
+from bson import ObjectId
+from fastapi import HTTPException, Request, Response
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from models.users import SignInRequest, User
+from queries.auth import UserQueries
+from routes.auth import signin
+from utils.authentication import hash_password, verify_password
+from utils.password_hashing import password_pool
+
+CONCURRENCY = (1, 2, 4, 8, 16, 32, 64)
+SECONDS = 2.0
+PASSWORD = "StrongPass123!"
+
+
+def lookup(user: User):
+    async def find_by_username(self, username: str) -> User:
+        await asyncio.sleep(0)
+        return user
+    return find_by_username
+
+
+async def inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def ticker(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - start - 0.001)
+    return worst
+
+
+async def client(deadline: float, credentials: SignInRequest, latencies: list, shed: list) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            await signin(
+                user_req=credentials,
+                request=Request({"type": "http", "headers": []}),
+                response=Response(),
+                queries=UserQueries(),
+            )
+            latencies.append(time.perf_counter() - start)
+        except HTTPException:
+            shed.append(1)
+            await asyncio.sleep(password_pool.retry_after / 100)
+
+
+async def run(concurrency: int, credentials: SignInRequest) -> str:
+    latencies, shed = [], []
+    stop = asyncio.Event()
+    stall = asyncio.create_task(ticker(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(client(start + SECONDS, credentials, latencies, shed) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0
+    return (
+        f"{len(latencies) / elapsed:6.1f}/s p99={p99 * 1000:7.1f}ms "
+        f"stall={await stall * 1000:7.1f}ms shed={len(shed)}"
+    )
+
+
+async def main() -> None:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+    user = User(
+        id=ObjectId(),
+        username="benchmark",
+        name="Benchmark",
+        email="benchmark@example.com",
+        password=hash_password(PASSWORD),
+    )
+    credentials = SignInRequest(username=user.username, password=PASSWORD)
+    print(f"pool: {password_pool.max_workers} workers, queue {password_pool.max_queue}")
+
+    with patch.object(UserQueries, "find_by_username", lookup(user)):
+        for concurrency in CONCURRENCY:
+            with patch("routes.auth.verify_password_async", inline_verify):
+                inline = await run(concurrency, credentials)
+            pooled = await run(concurrency, credentials)
+            print(f"concurrency={concurrency:3d}")
+            print(f"  inline {inline}")
+            print(f"  pool   {pooled}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Task list response throughput: TaskResponse models serialized by FastAPI
+versus task documents rendered by FastJSONResponse.
+
+Both routes serve the same in-memory list of tasks with breakdowns through
+a real FastAPI app and ASGI client, so validation, serialization and
+response construction are included but MongoDB is not:
+
+    MONGO_DB_URI=mongodb://localhost:27017 python -m benchmarks.task_list_rendering
+"""
+import logging
+import os
+import time
+import structlog
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from models.tasks import Task, TaskBreakdown, TaskStep, TaskContext, TaskResponse
+from utils.responses import FastJSONResponse, task_document
+
+LIST_SIZES = (50, 500, 2_000)
+ROUNDS = 50
+
+
+def sample_task(index: int) -> Task:
+    return Task(
+        title=f"Task number {index}",
+        description="Pick up groceries and plan meals for the week",
+        priority=1 + index % 3,
+        status="pending",
+        user_id="benchmark-user",
+        context=TaskContext(),
+        breakdown=TaskBreakdown(
+            steps=[
+                TaskStep(
+                    description=f"Step {step} of the plan",
+                    time_estimate=10,
+                    initiation_tip="Set a five minute timer",
+                    completion_signal="List is written down",
+                    dopamine_hook="Tick it off"
+                )
+                for step in range(5)
+            ],
+            suggested_breaks=[2, 4],
+            initiation_strategy="Start with the easiest item",
+            energy_level_needed=2,
+            materials_needed=["notebook", "pen"],
+            environment_setup="Clear the kitchen table"
+        )
+    )
+
+
+def build_app(tasks: list[Task]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/models")
+    async def models() -> list[TaskResponse]:
+        return [TaskResponse.from_mongo(task) for task in tasks]
+
+    @app.get("/fast", response_model=list[TaskResponse])
+    async def fast():
+        return FastJSONResponse([task_document(task) for task in tasks])
+
+    return app
+
+
+def requests_per_second(client: TestClient, path: str) -> tuple[float, int]:
+    size = len(client.get(path).content)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        client.get(path)
+    return ROUNDS / (time.perf_counter() - start), size
+
+
+def main() -> None:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    for count in LIST_SIZES:
+        tasks = [sample_task(index) for index in range(count)]
+        with TestClient(build_app(tasks)) as client:
+            assert client.get("/models").json() == client.get("/fast").json()
+            baseline, size = requests_per_second(client, "/models")
+            fast, _ = requests_per_second(client, "/fast")
+        print(
+            f"tasks={count} body={size / 1000:.0f}KB "
+            f"models={baseline:.1f}req/s fast={fast:.1f}req/s speedup={fast / baseline:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
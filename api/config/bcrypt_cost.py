@@ -0,0 +1,72 @@
+"""
+Calibrate the bcrypt cost factor on this host. Times hash_password at each
+cost and recommends the highest one whose median hash time stays within the
+target, never going below MIN_ROUNDS:
+
+    python -m config.bcrypt_cost --target-ms 250 [--write]
+
+--write records the result as BCRYPT_ROUNDS in .env/api.env. Stored hashes
+made with a different cost are rehashed at the next successful signin.
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+SAMPLES = 5
+ENV_PATH = Path('.') / '.env' / 'api.env'
+
+
+def hash_ms(rounds: int, samples: int = SAMPLES) -> float:
+    salt = bcrypt.gensalt(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", salt)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float) -> tuple[int, dict[int, float]]:
+    timings = {}
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        timings[rounds] = hash_ms(rounds, samples=SAMPLES if rounds < 14 else 1)
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+def record(rounds: int, path: Path = ENV_PATH) -> None:
+    lines = path.read_text().splitlines() if path.exists() else []
+    lines = [line for line in lines if not line.startswith("BCRYPT_ROUNDS=")]
+    lines.append(f"BCRYPT_ROUNDS={rounds}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pick a bcrypt cost factor for this host")
+    parser.add_argument("--target-ms", type=float, default=250, help="longest acceptable single hash")
+    parser.add_argument("--write", action="store_true", help=f"record BCRYPT_ROUNDS in {ENV_PATH}")
+    args = parser.parse_args()
+
+    rounds, timings = calibrate(args.target_ms)
+    for cost, ms in timings.items():
+        print(f"cost {cost:2d}: {ms:8.1f}ms{'  <- target' if cost == rounds else ''}")
+    if timings[rounds] > args.target_ms:
+        print(f"warning: even cost {MIN_ROUNDS} exceeds {args.target_ms:.0f}ms on this host")
+    print(f"BCRYPT_ROUNDS={rounds}")
+
+    if args.write:
+        record(rounds)
+        print(f"recorded in {ENV_PATH}")
+
+
+if __name__ == "__main__":
+    main()
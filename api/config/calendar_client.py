@@ -0,0 +1,149 @@
+import asyncio
+import os
+import random
+import structlog
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import httpx
+from google.oauth2.credentials import Credentials
+from googleapiclient.http import HttpRequest
+
+logger = structlog.get_logger()
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_BACKOFF_SECONDS = 30
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+
+class CalendarAPIError(Exception):
+    def __init__(self, status_code: Optional[int], message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AsyncCalendarClient:
+    """
+    Sends Google Calendar requests over a pooled httpx.AsyncClient instead of
+    googleapiclient's blocking execute(). Requests are still built from the
+    discovery document (see calendar_events); only the I/O moves here.
+
+    Transport errors, 429/5xx and rate-limit 403s are retried with jittered
+    exponential backoff, honouring Retry-After. A 401 refreshes the access
+    token once through the token endpoint, updating the shared Credentials in
+    place. Retried POSTs are only safe when the body carries a client-chosen
+    id, as event inserts do.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        timeout_seconds: float = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout_seconds,
+            transport=transport,
+        )
+        self._refresh_lock = asyncio.Lock()
+        self.retries = 0
+        self.refreshes = 0
+
+    async def execute(self, request: HttpRequest, credentials: Credentials) -> dict:
+        refreshed = False
+        attempt = 0
+        while True:
+            headers = dict(request.headers)
+            headers["authorization"] = f"Bearer {credentials.token}"
+            try:
+                response = await self._client.request(
+                    request.method,
+                    request.uri,
+                    content=request.body,
+                    headers=headers
+                )
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise CalendarAPIError(None, f"Calendar request failed: {e}")
+                await self._backoff(attempt, None)
+                attempt += 1
+                continue
+
+            if response.status_code == 401 and not refreshed and credentials.refresh_token:
+                stale_token = headers["authorization"]
+                async with self._refresh_lock:
+                    # concurrent requests that hit the same expired token refresh it once
+                    if f"Bearer {credentials.token}" == stale_token:
+                        await self.refresh(credentials)
+                refreshed = True
+                continue
+            if self._retryable(response) and attempt < self.max_retries:
+                await self._backoff(attempt, response.headers.get("retry-after"))
+                attempt += 1
+                continue
+            if response.is_error:
+                raise CalendarAPIError(response.status_code, self._error_message(response))
+            return response.json() if response.content else {}
+
+    async def refresh(self, credentials: Credentials) -> None:
+        response = await self._client.post(credentials.token_uri, data={
+            "grant_type": "refresh_token",
+            "refresh_token": credentials.refresh_token,
+            "client_id": credentials.client_id,
+            "client_secret": credentials.client_secret,
+        })
+        if response.is_error:
+            raise CalendarAPIError(response.status_code, "Refreshing calendar credentials failed")
+        token = response.json()
+        credentials.token = token["access_token"]
+        if "expires_in" in token:
+            # google-auth keeps expiry as naive UTC
+            credentials.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=token["expires_in"])
+        self.refreshes += 1
+
+    @staticmethod
+    def _retryable(response: httpx.Response) -> bool:
+        if response.status_code in RETRY_STATUSES:
+            return True
+        if response.status_code == 403:
+            try:
+                errors = response.json()["error"]["errors"]
+            except (ValueError, KeyError, TypeError):
+                return False
+            return any(error.get("reason") in RATE_LIMIT_REASONS for error in errors)
+        return False
+
+    @staticmethod
+    def _error_message(response: httpx.Response) -> str:
+        try:
+            return response.json()["error"]["message"]
+        except (ValueError, KeyError, TypeError):
+            return f"Calendar API returned {response.status_code}"
+
+    async def _backoff(self, attempt: int, retry_after: Optional[str]) -> None:
+        self.retries += 1
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = self.backoff_seconds * 2 ** attempt * (0.5 + random.random())
+        delay = min(delay, MAX_BACKOFF_SECONDS)
+        logger.warning("calendar_request_retry", attempt=attempt + 1, delay=round(delay, 2))
+        await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> dict:
+        return {"retries": self.retries, "refreshes": self.refreshes}
+
+
+calendar_client = AsyncCalendarClient(
+    max_connections=int(os.environ.get("CALENDAR_MAX_CONNECTIONS", "20")),
+    max_retries=int(os.environ.get("CALENDAR_MAX_RETRIES", "3")),
+    timeout_seconds=float(os.environ.get("CALENDAR_TIMEOUT_SECONDS", "10")),
+)
@@ -1,14 +1,80 @@
+import httplib2
+import json
 import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 from cryptography.fernet import Fernet
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from dotenv import load_dotenv
 
 
 env_path = Path('.') / '.env' / 'api.env'
 load_dotenv(env_path)
 
+class CredentialsCache:
+    """
+    Short-lived per-user cache of decrypted Google Credentials, so calendar
+    calls do not Fernet-decrypt both tokens every time. Entries expire after
+    ttl_seconds, which bounds how long another worker can keep using
+    credentials replaced through save_google_credentials; this worker drops
+    them immediately. Cached Credentials are shared, and a refresh by
+    googleapiclient updates them in place for every later caller.
+    """
+
+    def __init__(self, max_users: int = 1000, ttl_seconds: float = 300):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[Credentials, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[Credentials]:
+        entry = self._entries.get(user_id)
+        if entry and entry[1] < time.monotonic():
+            del self._entries[user_id]
+            entry = None
+        if not entry:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, user_id: str, credentials: Credentials) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[user_id] = (credentials, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+credentials_cache = CredentialsCache(
+    max_users=int(os.environ.get("CALENDAR_CREDENTIALS_CACHE_MAX_USERS", "1000")),
+    ttl_seconds=float(os.environ.get("CALENDAR_CREDENTIALS_TTL_SECONDS", "300")),
+)
+
+
 class GoogleService:
     def __init__(self):
         encryption_key = os.environ.get("ENCRYPTION_KEY")
@@ -35,5 +101,36 @@ class GoogleService:
             scopes=['https://www.googleapis.com/auth/calendar']
         )
 
-def create_calendar_service(self, credentials: Credentials):
-    return build('calendar', 'v3', credentials=credentials)
\ No newline at end of file
+    def create_calendar_service(self, credentials: Credentials):
+        return build_from_document(calendar_discovery_document(), credentials=credentials)
+
+
+@lru_cache(maxsize=None)
+def calendar_discovery_document() -> dict:
+    """
+    The Calendar v3 discovery document from the static copy bundled with
+    google-api-python-client, parsed once per process; building a service
+    never fetches it over the network.
+    """
+    document = get_static_doc("calendar", "v3")
+    if document is None:
+        raise RuntimeError("Calendar v3 discovery document is not bundled with googleapiclient")
+    return json.loads(document)
+
+
+@lru_cache(maxsize=None)
+def calendar_events():
+    """
+    Process-wide builder for Calendar events requests. Generating the API
+    methods of a service and its events() resource costs milliseconds of CPU,
+    far more than building a request, so it is done once. Requests built here
+    carry no credentials and are authorized and sent by AsyncCalendarClient;
+    the placeholder http object is never used for I/O.
+    """
+    return build_from_document(calendar_discovery_document(), http=httplib2.Http()).events()
+
+
+@lru_cache(maxsize=None)
+def get_google_service() -> GoogleService:
+    """The process-wide GoogleService, built on first use"""
+    return GoogleService()
\ No newline at end of file
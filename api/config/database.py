@@ -3,11 +3,13 @@ from pathlib import Path
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
 from odmantic import AIOEngine
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
-from models.users import User
-from models.tasks import Task
+from models.users import User, LoginAttempt
+from models.tasks import Task, TaskVersion, TaskTombstone, StoredBreakdown, TASK_ARCHIVE_COLLECTION
 from models.calendar import GoogleCredentials
 from models.usage import UserAPIUsage
+from models.idempotency import IdempotencyRecord
 
 
 env_path = Path('.') / '.env' / 'api.env'
@@ -18,4 +20,7 @@ engine = AIOEngine(client=client, database="audhd")
 
 
 async def initialize_database():
-    await engine.configure_database([User, Task, GoogleCredentials, UserAPIUsage])
\ No newline at end of file
+    await engine.configure_database([User, Task, TaskVersion, TaskTombstone, StoredBreakdown, GoogleCredentials, UserAPIUsage, IdempotencyRecord, LoginAttempt])
+    await engine.database[TASK_ARCHIVE_COLLECTION].create_indexes([
+        IndexModel([("user_id", ASCENDING), ("completed_at", DESCENDING)]),
+    ])
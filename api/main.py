@@ -1,13 +1,71 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from fastapi import FastAPI
 from routes import auth, tasks, calendar
 from fastapi.middleware.cors import CORSMiddleware
 from middleware.logging import logging_middleware
+from middleware.compression import compression_middleware
 from config.logging import setup_logging
+from config.database import initialize_database, engine
+from config.calendar_mgr import calendar_events
+from config.calendar_client import calendar_client
+from models.tasks import TaskVersion, JOB_LEASE_COLLECTION
+from models.users import LoginAttempt
+from utils.task_cache import task_cache, watch_task_invalidations
+from utils.task_events import task_events, watch_task_changes
+from utils.task_archive import run_task_archiver
+from utils.login_throttle import login_throttle, MongoThrottleBackend
+from utils.stats import log_stats
+from queries.tasks import TaskQueries
 
 setup_logging()
 
-api = FastAPI()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await initialize_database()
+    await TaskQueries().backfill_breakdown_text()
+    calendar_events()
+
+    if os.environ.get("LOGIN_THROTTLE_BACKEND", "memory") == "mongo":
+        login_throttle.backend = MongoThrottleBackend(engine.get_collection(LoginAttempt))
+
+    background = []
+    if os.environ.get("TASK_CACHE_CHANGE_STREAM", "").lower() == "true":
+        background.append(asyncio.create_task(
+            watch_task_invalidations(task_cache, engine.get_collection(TaskVersion))
+        ))
+    if not task_events.local_publish:
+        background.append(asyncio.create_task(
+            watch_task_changes(task_events, engine.database)
+        ))
+    archive_after_days = int(os.environ.get("TASK_ARCHIVE_AFTER_DAYS", "30"))
+    if archive_after_days > 0:
+        background.append(asyncio.create_task(run_task_archiver(
+            TaskQueries(),
+            timedelta(days=archive_after_days),
+            float(os.environ.get("TASK_ARCHIVE_INTERVAL_SECONDS", "3600")),
+            engine.database[JOB_LEASE_COLLECTION]
+        )))
+    stats_interval = float(os.environ.get("STATS_LOG_INTERVAL_SECONDS", "300"))
+    if stats_interval > 0:
+        background.append(asyncio.create_task(log_stats(
+            {"task_cache": task_cache.stats, "login_throttle": login_throttle.stats},
+            stats_interval
+        )))
+
+    yield
+
+    for task in background:
+        task.cancel()
+    await calendar_client.aclose()
+
+
+api = FastAPI(lifespan=lifespan)
+
+api.middleware("http")(compression_middleware)
 api.middleware("http")(logging_middleware)
 
 api.add_middleware(
@@ -0,0 +1,163 @@
+import gzip
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+import brotli
+import structlog
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from utils.etags import coded_etag, etag_matches
+
+logger = structlog.get_logger()
+
+# (gzip level, brotli quality) per media type, picked from
+# benchmarks/response_compression.py: higher levels cost several times the
+# CPU for a few percent more savings. Anything not listed, such as images or
+# archives that are already compressed, is sent as-is.
+DEFAULT_LEVELS = {
+    "application/json": (1, 4),
+    "application/msgpack": (1, 4),
+    "application/x-ndjson": (1, 4),
+    "text/plain": (1, 4),
+    "text/html": (1, 4),
+}
+
+# Bodies above this are compressed off the event loop
+THREADPOOL_THRESHOLD = 256 * 1024
+
+
+def parse_levels(spec: str) -> dict[str, tuple[int, int]]:
+    """Parse "application/json=6:4,text/plain=9:5" into per media type levels"""
+    levels = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        media_type, _, value = entry.partition("=")
+        gzip_level, _, brotli_quality = value.partition(":")
+        levels[media_type.strip().lower()] = (int(gzip_level), int(brotli_quality))
+    return levels
+
+
+def preferred_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """br over gzip when both are acceptable, None for identity"""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for coding in accept_encoding.split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.lower())
+    for encoding in ("br", "gzip"):
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+class ResponseCompressor:
+    """
+    Compress buffered responses of at least min_size bytes whose media type
+    has configured levels. Streaming responses (no Content-Length, e.g. SSE
+    and NDJSON export), bodies that already carry a Content-Encoding and
+    anything below the threshold pass through untouched.
+    """
+
+    def __init__(self, min_size: int = 1024, levels: Optional[dict[str, tuple[int, int]]] = None):
+        self.min_size = min_size
+        self.levels = DEFAULT_LEVELS if levels is None else levels
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def _levels_for(self, response: Response) -> Optional[tuple[int, int]]:
+        content_type = response.headers.get("content-type", "")
+        return self.levels.get(content_type.split(";")[0].strip().lower())
+
+    def compress(self, body: bytes, encoding: str, levels: tuple[int, int]) -> bytes:
+        start = time.perf_counter()
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=levels[1])
+        else:
+            compressed = gzip.compress(body, compresslevel=levels[0], mtime=0)
+        self.seconds += time.perf_counter() - start
+        self.compressed += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    async def __call__(
+        self,
+        request: Request,
+        call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        response = await call_next(request)
+
+        encoding = preferred_encoding(request.headers.get("accept-encoding"))
+        etag = response.headers.get("etag")
+        if response.status_code == 304 and encoding and etag:
+            # answer with the tag of the coded representation the client validated
+            coded = coded_etag(etag, encoding)
+            if etag_matches(request.headers.get("if-none-match"), coded):
+                response.headers["etag"] = coded
+            return response
+
+        levels = self._levels_for(response)
+        length = int(response.headers.get("content-length", 0))
+        if (
+            encoding is None
+            or levels is None
+            or request.method == "HEAD"
+            or "content-encoding" in response.headers
+            or length < self.min_size
+        ):
+            self.skipped += 1
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if len(body) > THREADPOOL_THRESHOLD:
+            compressed = await run_in_threadpool(self.compress, body, encoding, levels)
+        else:
+            compressed = self.compress(body, encoding, levels)
+
+        # copied raw so repeated headers such as Set-Cookie all survive
+        headers = MutableHeaders(raw=list(response.raw_headers))
+        headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(compressed))
+        if etag:
+            # a strong validator must differ between content-codings
+            headers["etag"] = coded_etag(etag, encoding)
+        headers["vary"] = ", ".join([*headers.getlist("vary"), "Accept-Encoding"])
+
+        compressed_response = Response(
+            content=compressed,
+            status_code=response.status_code,
+            background=response.background
+        )
+        compressed_response.raw_headers = headers.raw
+        return compressed_response
+
+    def stats(self) -> dict:
+        return {
+            "compressed": self.compressed,
+            "skipped": self.skipped,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else 0.0,
+            "cpu_ms": round(self.seconds * 1000, 1),
+        }
+
+
+compression_middleware = ResponseCompressor(
+    min_size=int(os.environ.get("COMPRESSION_MIN_SIZE", "1024")),
+    levels=parse_levels(os.environ["COMPRESSION_LEVELS"]) if os.environ.get("COMPRESSION_LEVELS") else None,
+)
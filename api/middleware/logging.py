@@ -1,4 +1,4 @@
-from utils.authentication import decode_jwt
+from utils.authentication import get_request_jwt_payload
 from fastapi import Request, Response
 from typing import Callable, Awaitable
 import structlog
@@ -14,8 +14,7 @@ async def logging_middleware(
     user_id = None
     if "fast_api_token" in request.cookies:
         try:
-            token = request.cookies["fast_api_token"]
-            payload = await decode_jwt(token)
+            payload = await get_request_jwt_payload(request, request.cookies["fast_api_token"])
             if payload and payload.user:
                 user_id = payload.user.id
         except Exception:
@@ -1,7 +1,7 @@
 from odmantic import Model, Field
 from pydantic import BaseModel, Field as PydanticField, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from bson import ObjectId
 from bson.errors import InvalidId
 
@@ -44,4 +44,19 @@ class CalendarEventResponse(BaseModel):
             event_id=event['id'],
             task_id=task_id,
             calendar_link=event.get('htmlLink', '')
-        )
\ No newline at end of file
+        )
+
+class CalendarBatchRequest(BaseModel):
+    events: List[CalendarEventRequest] = PydanticField(min_length=1, max_length=50)
+
+class CalendarBatchResult(BaseModel):
+    index: int
+    task_id: str
+    status: str  # "ok", "not_found" or "failed"
+    event_id: Optional[str] = None
+    calendar_link: Optional[str] = None
+    detail: Optional[str] = None
+
+class CalendarBatchResponse(BaseModel):
+    results: List[CalendarBatchResult]
+    created: int
@@ -0,0 +1,33 @@
+import os
+from datetime import datetime, timezone
+from typing import Optional
+from odmantic import Model, Field as ODMField
+from pymongo import IndexModel, ASCENDING
+
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", str(24 * 60 * 60)))
+
+
+class IdempotencyRecord(Model):
+    """
+    Outcome of a request sent with an Idempotency-Key, replayed to retries of
+    the same request until the TTL index removes it.
+    """
+    user_id: str
+    key: str
+    endpoint: str
+    fingerprint: str  # hash of the request body, so a reused key with a new payload is rejected
+    status: str = ODMField(default="in_progress")  # in_progress or completed
+    status_code: Optional[int] = None
+    media_type: Optional[str] = None
+    body: Optional[bytes] = None
+    headers: dict[str, str] = ODMField(default_factory=dict)  # REPLAYED_HEADERS of the stored response
+    created_at: datetime = ODMField(default_factory=lambda: datetime.now(timezone.utc))
+
+    model_config = {
+        "collection": "idempotency_keys",
+        "parse_doc_with_default_factories": True,
+        "indexes": lambda: [
+            IndexModel([("user_id", ASCENDING), ("key", ASCENDING)], unique=True),
+            IndexModel([("created_at", ASCENDING)], expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS),
+        ]
+    }
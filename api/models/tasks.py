@@ -1,7 +1,10 @@
 from datetime import datetime, timezone
-from odmantic import Model, Field as ODMField
-from pydantic import BaseModel, field_validator, Field
+from odmantic import Model, Index, Field as ODMField
+from pydantic import BaseModel, field_validator, model_validator, Field
 from typing import List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import IndexModel, ASCENDING, TEXT
 
 
 class TaskStep(BaseModel):
@@ -62,6 +65,106 @@ class TaskRequest(BaseModel):
         return v.lower()
 
 
+class TaskListFilter(BaseModel):
+    status: Optional[str] = None
+    priority: Optional[int] = Field(default=None, ge=1, le=3)
+    energy_level: Optional[int] = Field(default=None, ge=1, le=3)
+    environment: Optional[str] = None
+    time_of_day: Optional[str] = None
+    sort: Optional[str] = None
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, v: Optional[str]) -> Optional[str]:
+        return TaskRequest.validate_status(v) if v is not None else v
+
+    @field_validator('environment')
+    @classmethod
+    def validate_environment(cls, v: Optional[str]) -> Optional[str]:
+        return TaskContext.validate_environment(v) if v is not None else v
+
+    @field_validator('time_of_day')
+    @classmethod
+    def validate_time_of_day(cls, v: Optional[str]) -> Optional[str]:
+        return TaskContext.validate_time_of_day(v) if v is not None else v
+
+    @field_validator('sort')
+    @classmethod
+    def validate_sort(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return v
+        valid_sorts = ["priority", "status", "title", "updated_at"]
+        if v.lower().lstrip("-") not in valid_sorts:
+            raise ValueError(f"Sort must be one of: {', '.join(valid_sorts)} (prefix with - for descending)")
+        return v.lower()
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.model_dump(exclude_none=True)
+
+
+class TaskBulkOperation(BaseModel):
+    op: str
+    task_id: Optional[str] = None
+    task: Optional[TaskRequest] = None
+    status: Optional[str] = None
+
+    @field_validator('op')
+    @classmethod
+    def validate_op(cls, v: str) -> str:
+        valid_ops = ["create", "update", "status", "delete"]
+        if v.lower() not in valid_ops:
+            raise ValueError(f"Operation must be one of: {', '.join(valid_ops)}")
+        return v.lower()
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return v
+        return TaskRequest.validate_status(v)
+
+    @model_validator(mode='after')
+    def validate_operation_fields(self) -> 'TaskBulkOperation':
+        if self.op == "create":
+            if not self.task:
+                raise ValueError("create operations require a task")
+            return self
+
+        if not self.task_id:
+            raise ValueError(f"{self.op} operations require a task_id")
+        try:
+            ObjectId(self.task_id)
+        except (InvalidId, TypeError):
+            raise ValueError("Invalid MongoDB ObjectId format")
+
+        if self.op == "update" and not self.task:
+            raise ValueError("update operations require a task")
+        if self.op == "status" and not self.status:
+            raise ValueError("status operations require a status")
+        return self
+
+
+class TaskBulkRequest(BaseModel):
+    operations: List[TaskBulkOperation] = Field(min_length=1, max_length=500)
+    ordered: bool = Field(default=True)
+
+
+class TaskBulkResult(BaseModel):
+    index: int
+    op: str
+    status: str  # "ok", "not_found", "failed" or "skipped"
+    task_id: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class TaskBulkResponse(BaseModel):
+    results: List[TaskBulkResult]
+    inserted: int
+    modified: int
+    deleted: int
+
+
 class Task(Model):
     title: str
     description: str
@@ -69,11 +172,83 @@ class Task(Model):
     status: str
     user_id: str
     context: Optional[TaskContext] = None
-    breakdown: Optional[TaskBreakdown] = None
+    breakdown: Optional[TaskBreakdown] = None  # legacy embedded copy, see breakdown_key
+    breakdown_key: Optional[str] = None  # StoredBreakdown.key, loaded on demand
+    breakdown_text: Optional[str] = None  # step descriptions of the breakdown, for text search
     last_analyzed: Optional[bool] = ODMField(default=False)
+    revision: int = ODMField(default=0)
+    updated_at: datetime = ODMField(default_factory=lambda: datetime.now(timezone.utc))
+    sync_version: int = ODMField(default=0)  # collection version this task was last written at
+    completed_at: Optional[datetime] = None
 
     model_config = {
-        "collection": "tasks"
+        "collection": "tasks",
+        "parse_doc_with_default_factories": True,
+        "indexes": lambda: [
+            Index(Task.user_id, Task.sync_version),
+            Index(Task.user_id, Task.status, Task.priority),
+            Index(Task.user_id, Task.priority),
+            Index(Task.user_id, Task.updated_at),
+            IndexModel([("user_id", ASCENDING), ("context.energy_level", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("context.environment", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("context.time_of_day", ASCENDING)]),
+            IndexModel(
+                [("status", ASCENDING), ("completed_at", ASCENDING)],
+                partialFilterExpression={"status": "completed"},
+                name="completed_tasks_for_archive"
+            ),
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("title", TEXT),
+                    ("description", TEXT),
+                    ("breakdown_text", TEXT),
+                ],
+                weights={"title": 10, "description": 5, "breakdown_text": 1},
+                name="task_text_search"
+            ),
+        ]
+    }
+
+
+# Completed tasks past the retention window, moved out of the hot tasks
+# collection. Documents keep the Task shape plus an archived_at timestamp.
+TASK_ARCHIVE_COLLECTION = "tasks_archive"
+
+# One document per periodic job, held by the worker currently allowed to
+# run it; see utils.task_archive.acquire_lease.
+JOB_LEASE_COLLECTION = "job_leases"
+
+
+class TaskTombstone(Model):
+    """Marker left behind by a deleted task so delta sync can report it"""
+    task_id: str
+    user_id: str
+    sync_version: int
+    deleted_at: datetime = ODMField(default_factory=lambda: datetime.now(timezone.utc))
+
+    model_config = {
+        "collection": "task_tombstones",
+        "indexes": lambda: [
+            Index(TaskTombstone.user_id, TaskTombstone.sync_version),
+        ]
+    }
+
+
+class TaskVersion(Model):
+    """
+    Per-user task collection counters. Every write is handed the next
+    version before it lands; committed catches up with version only once no
+    write is in flight, and is what ETags and sync tokens are derived from.
+    """
+    user_id: str = ODMField(unique=True)
+    version: int = ODMField(default=0)
+    committed: int = ODMField(default=0)
+    in_flight: int = ODMField(default=0)
+    allocated_at: Optional[datetime] = None
+
+    model_config = {
+        "collection": "task_versions"
     }
 
 class TaskResponse(BaseModel):
@@ -85,12 +260,17 @@ class TaskResponse(BaseModel):
     user_id: str
     context: Optional[TaskContext] = None
     breakdown: Optional[TaskBreakdown] = None
+    breakdown_key: Optional[str] = None
     last_analyzed: Optional[bool] = None
+    revision: int = 0
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
 
     @classmethod
-    def from_mongo(cls, task: Task) -> "TaskResponse":
+    def from_mongo(cls, task: Task, breakdown: Optional[TaskBreakdown] = None) -> "TaskResponse":
         """
-        Convert from MongoDB model to response model
+        Convert from MongoDB model to response model. Breakdowns stored apart
+        from the task are only included when loaded and passed in.
         """
         return cls(
             id=str(task.id),
@@ -100,13 +280,85 @@ class TaskResponse(BaseModel):
             status=task.status,
             user_id=task.user_id,
             context=task.context,
-            breakdown=task.breakdown,
-            last_analyzed=task.last_analyzed
+            breakdown=breakdown or task.breakdown,
+            breakdown_key=task.breakdown_key,
+            last_analyzed=task.last_analyzed,
+            revision=task.revision,
+            updated_at=task.updated_at,
+            completed_at=task.completed_at
         )
 
+class ArchivedTaskResponse(TaskResponse):
+    archived_at: datetime
+
+    @classmethod
+    def from_archive(
+        cls,
+        task: Task,
+        archived_at: datetime,
+        breakdown: Optional[TaskBreakdown] = None
+    ) -> "ArchivedTaskResponse":
+        return cls(**TaskResponse.from_mongo(task, breakdown).model_dump(), archived_at=archived_at)
+
+
+class TaskArchiveResponse(BaseModel):
+    results: List[ArchivedTaskResponse]
+    total: int
+    page: int
+    page_size: int
+
+
+class TaskSyncResponse(BaseModel):
+    upserts: List[TaskResponse]
+    deletions: List[str]
+    sync_token: int
+
+
+class TaskSearchHit(BaseModel):
+    task: TaskResponse
+    score: float
+
+
+class TaskSearchResponse(BaseModel):
+    results: List[TaskSearchHit]
+    total: int
+    page: int
+    page_size: int
+
+
+class TaskImportRecord(TaskRequest):
+    breakdown: Optional[TaskBreakdown] = None
+
+
+class TaskImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class TaskImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TaskImportError]
+
+
+class StoredBreakdown(Model):
+    """A breakdown shared by every task and cache entry with the same content hash"""
+    key: str = ODMField(unique=True)
+    payload: Optional[bytes] = None  # canonical JSON compressed with `encoding`
+    encoding: str = "zlib"
+    size: int = 0  # uncompressed payload bytes
+    breakdown: Optional[TaskBreakdown] = None  # uncompressed entries from before payload
+    created_at: datetime = ODMField(default_factory=lambda: datetime.now(timezone.utc))
+
+    model_config = {
+        "collection": "task_breakdowns"
+    }
+
+
 class TaskCache(Model):
     task_key: str
-    breakdown: str
+    breakdown: Optional[str] = None  # legacy JSON copy, superseded by breakdown_key
+    breakdown_key: Optional[str] = None
     created_at: datetime = datetime.now(timezone.utc)
 
     model_config = {
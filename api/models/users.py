@@ -1,4 +1,6 @@
+from datetime import datetime
 from odmantic import Model, Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from pydantic import BaseModel, Field as PydanticField, field_validator
 import re
 
@@ -35,6 +37,20 @@ class User(Model):
         "collection": "users"
     }
 
+class LoginAttempt(Model):
+    """One signin attempt against a throttle key, used by the shared login throttle backend"""
+    key: str
+    at: float  # epoch seconds, for the sliding window
+    expires_at: datetime
+
+    model_config = {
+        "collection": "login_attempts",
+        "indexes": lambda: [
+            IndexModel([("key", ASCENDING), ("at", DESCENDING)]),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
+    }
+
 class UserResponse(BaseModel):
     id: str
     username: str
@@ -7,6 +7,7 @@ from typing import Optional
 
 from models.usage import UserAPIUsage
 from models.tasks import Task, TaskBreakdown, TaskCache
+from queries.breakdowns import breakdown_store
 from config.database import engine
 
 
@@ -66,7 +67,7 @@ class TaskAnalyzer:
         )
         return True
 
-    async def _get_cached_breakdown(self, task_key: str) -> Optional[str]:
+    async def _get_cached_breakdown(self, task_key: str) -> Optional[TaskBreakdown]:
         """Get breakdown from MongoDB cache"""
         logger.debug("checking_cache", task_key=task_key)
         try:
@@ -76,19 +77,22 @@ class TaskAnalyzer:
             )
             if cache_entry:
                 logger.info("cache_hit", task_key=task_key)
-                return cache_entry.breakdown
+                if cache_entry.breakdown_key:
+                    return await breakdown_store.get(cache_entry.breakdown_key)
+                if cache_entry.breakdown:
+                    return TaskBreakdown(**json.loads(cache_entry.breakdown))
             logger.info("cache_miss", task_key=task_key)
         except Exception as e:
             logger.error("cache_access_error", error=str(e), task_key=task_key)
         return None
     
-    async def _save_to_cache(self, task_key: str, breakdown_str: str) -> None:
+    async def _save_to_cache(self, task_key: str, breakdown: TaskBreakdown) -> None:
         """Save breakdown to MongoDB cache"""
         logger.debug("saving_to_cache", task_key=task_key)
         try:
             cache_entry = TaskCache(
                 task_key=task_key,
-                breakdown=breakdown_str
+                breakdown_key=await breakdown_store.put(breakdown)
             )
             await engine.save(cache_entry)
             logger.info("saved_to_cache", task_key=task_key)
@@ -109,20 +113,15 @@ class TaskAnalyzer:
         
         task_key = f"{task.title.lower().strip()}:{task.description.lower().strip()}"
         
-        cached_data = await self._get_cached_breakdown(task_key)
-        if cached_data:
-            try:
-                log.info("using_cached_breakdown")
-                return TaskBreakdown(**json.loads(cached_data))
-            except json.JSONDecodeError as e:
-                log.error("cache_decode_error", error=str(e))
-                return None
+        cached = await self._get_cached_breakdown(task_key)
+        if cached:
+            log.info("using_cached_breakdown")
+            return cached
 
         try:
             breakdown = await self._generate_breakdown(task)
             if breakdown:
-                    cached_str = json.dumps(breakdown.model_dump())
-                    await self._save_to_cache(task_key, cached_str)
+                    await self._save_to_cache(task_key, breakdown)
                     log.info("generated_new_breakdown")
             return breakdown
         except Exception as e:
@@ -1,52 +1,55 @@
 import structlog
-from utils.authentication import hash_password
+from utils.authentication import hash_password_async
 from models.users import UserRequest, User
 from config.database import engine
 from typing import Optional
+from pymongo.errors import DuplicateKeyError
 from utils.exceptions import UserExceptions, handle_database_operation
 
 logger = structlog.get_logger()
 
-class UserQueries:
-    @handle_database_operation("checking existing user")
-    async def check_existing_user(self, username: str, email: str) -> Optional[str]:
-        log = logger.bind(username=username, email=email)
-        log.info("checking_existing_user")
+UNIQUE_USER_FIELDS = ("username", "email")
 
-        existing_username = await engine.find_one(User, User.username == username)
-        if existing_username:
-            log.info("username_exists")
-            return "username"
-        
-        existing_email = await engine.find_one(User, User.email == email)
-        if existing_email:
-            log.info("email_exists")
-            return "email"
-            
-        log.info("no_existing_user")
-        return None
-    
+
+def duplicate_key_field(error: DuplicateKeyError) -> Optional[str]:
+    """The unique user field a DuplicateKeyError was raised for, if any"""
+    details = error.details or {}
+    key_pattern = details.get("keyPattern") or details.get("keyValue") or {}
+    for field in UNIQUE_USER_FIELDS:
+        if field in key_pattern:
+            return field
+    message = str(error)
+    for field in UNIQUE_USER_FIELDS:
+        if f"index: {field}_" in message:
+            return field
+    return None
+
+
+class UserQueries:
     @handle_database_operation("creating user")
     async def create_user(self, user: UserRequest) -> User:
+        """
+        Insert the user in one round trip. Uniqueness of username and email is
+        left to the unique indexes, which unlike a read-then-insert check stays
+        correct under concurrent signups.
+        """
         log = logger.bind(username=user.username)
         log.info("creating_user")
 
-        duplicate_field = await self.check_existing_user(
-            username=user.username,
-            email=user.email,
-        )
-        
-        if duplicate_field:
-            log.warning("duplicate_user_field", field=duplicate_field)
-            raise UserExceptions.duplicate_field(duplicate_field)
-            
         user_model = User(
             username=user.username,
             name=user.name,
             email=user.email,
             password=user.password
         )
-        await engine.save(user_model)
+        try:
+            await engine.get_collection(User).insert_one(user_model.model_dump_doc())
+        except DuplicateKeyError as e:
+            field = duplicate_key_field(e)
+            if not field:
+                raise
+            log.warning("duplicate_user_field", field=field)
+            raise UserExceptions.duplicate_field(field)
         log.info("user_created", user_id=str(user_model.id))
         return user_model
     
@@ -57,6 +60,13 @@ class UserQueries:
             raise UserExceptions.not_found()
         return user_model
     
+    @handle_database_operation("retrieving user")
+    async def find_by_username(self, username: str) -> Optional[User]:
+        """Like get_by_username, but None for an unknown username instead of a 404"""
+        if not username or not isinstance(username, str):
+            raise UserExceptions.invalid_format("username")
+        return await engine.find_one(User, User.username == username)
+
     @handle_database_operation("retrieving user")
     async def get_by_username(self, username: str) -> User:
         if not username or not isinstance(username, str):
@@ -67,6 +77,18 @@ class UserQueries:
             raise UserExceptions.not_found()
         return user_model
     
+    @handle_database_operation("updating password")
+    async def replace_password_hash(self, user: User, new_hash: str) -> bool:
+        """
+        Swap in a rehashed password, unless the password changed since user was
+        read. Returns whether the stored hash was replaced.
+        """
+        result = await engine.get_collection(User).update_one(
+            {"_id": user.id, "password": user.password},
+            {"$set": {"password": new_hash}}
+        )
+        return result.modified_count == 1
+
     @handle_database_operation("updating password")
     async def update_password(self, username: str, new_password: str) -> None:
         if not new_password or len(new_password) < 8:
@@ -87,5 +109,5 @@ class UserQueries:
         except ValueError as e:
             raise UserExceptions.invalid_format("password", str(e))
 
-        user.password = hash_password(new_password)
+        user.password = await hash_password_async(new_password)
         await engine.save(user)
\ No newline at end of file
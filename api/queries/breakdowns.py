@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import structlog
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Optional
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from models.tasks import TaskBreakdown, StoredBreakdown
+from config.database import engine
+
+logger = structlog.get_logger()
+
+COMPRESSION_LEVEL = 6
+DUPLICATE_KEY = 11000
+
+
+class BreakdownStore:
+    """
+    Content-addressed storage for task breakdowns in task_breakdowns.
+
+    A breakdown is keyed by the hash of its canonical JSON, so tasks and
+    analyzer cache entries with identical breakdowns share one document and
+    only carry the key. The canonical JSON is stored zlib-compressed rather
+    than as a BSON subdocument, which drops the repeated field names. Stored
+    breakdowns never change, which lets recently used ones be kept decoded
+    in a bounded in-process LRU without invalidation.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._recent: OrderedDict[str, TaskBreakdown] = OrderedDict()
+
+    @staticmethod
+    def canonical(breakdown: TaskBreakdown) -> bytes:
+        return json.dumps(breakdown.model_dump(mode="json"), sort_keys=True, separators=(",", ":")).encode()
+
+    @staticmethod
+    def key_for(breakdown: TaskBreakdown) -> str:
+        return hashlib.sha256(BreakdownStore.canonical(breakdown)).hexdigest()
+
+    @staticmethod
+    def encode(canonical: bytes) -> bytes:
+        return zlib.compress(canonical, COMPRESSION_LEVEL)
+
+    @staticmethod
+    def decode(stored: StoredBreakdown) -> TaskBreakdown:
+        if stored.payload is None:
+            return stored.breakdown
+        return TaskBreakdown.model_validate_json(zlib.decompress(stored.payload))
+
+    def _remember(self, key: str, breakdown: TaskBreakdown) -> None:
+        self._recent[key] = breakdown
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+    async def put(self, breakdown: TaskBreakdown) -> str:
+        """Store a breakdown if its content is new and return its key"""
+        canonical = self.canonical(breakdown)
+        key = hashlib.sha256(canonical).hexdigest()
+        if key in self._recent:
+            return key
+
+        document = StoredBreakdown(
+            key=key,
+            payload=self.encode(canonical),
+            size=len(canonical)
+        ).model_dump_doc()
+        try:
+            await engine.get_collection(StoredBreakdown).update_one(
+                {"key": key},
+                {"$setOnInsert": document},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # a concurrent writer stored the same content first
+        self._remember(key, breakdown)
+        logger.info(
+            "breakdown_stored",
+            breakdown_key=key,
+            size=len(canonical),
+            stored_size=len(document["payload"])
+        )
+        return key
+
+    async def put_many(self, breakdowns: list[Optional[TaskBreakdown]]) -> list[Optional[str]]:
+        """
+        Store a batch of breakdowns in one unordered bulk_write and return
+        their keys in order, None for missing breakdowns. Content already
+        stored or repeated within the batch is written once.
+        """
+        keys = []
+        new = {}
+        for breakdown in breakdowns:
+            if breakdown is None:
+                keys.append(None)
+                continue
+            canonical = self.canonical(breakdown)
+            key = hashlib.sha256(canonical).hexdigest()
+            keys.append(key)
+            if key not in self._recent and key not in new:
+                new[key] = (breakdown, canonical)
+
+        if new:
+            requests = [
+                UpdateOne(
+                    {"key": key},
+                    {"$setOnInsert": StoredBreakdown(
+                        key=key,
+                        payload=self.encode(canonical),
+                        size=len(canonical)
+                    ).model_dump_doc()},
+                    upsert=True
+                )
+                for key, (_, canonical) in new.items()
+            ]
+            try:
+                await engine.get_collection(StoredBreakdown).bulk_write(requests, ordered=False)
+            except BulkWriteError as e:
+                # concurrent writers storing the same content first are fine
+                if any(error["code"] != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                    raise
+            for key, (breakdown, _) in new.items():
+                self._remember(key, breakdown)
+            logger.info("breakdowns_stored", count=len(new))
+        return keys
+
+    async def get(self, key: str) -> Optional[TaskBreakdown]:
+        return (await self.get_many([key])).get(key)
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, TaskBreakdown]:
+        """Load breakdowns by key in one query, skipping keys that are not stored"""
+        found = {}
+        missing = set()
+        for key in keys:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                found[key] = self._recent[key]
+            else:
+                missing.add(key)
+
+        if missing:
+            cursor = engine.get_collection(StoredBreakdown).find({"key": {"$in": list(missing)}})
+            async for doc in cursor:
+                stored = StoredBreakdown.model_validate_doc(doc)
+                breakdown = self.decode(stored)
+                self._remember(stored.key, breakdown)
+                found[stored.key] = breakdown
+        return found
+
+    async def load(self, task) -> Optional[TaskBreakdown]:
+        """A task's breakdown, from its legacy embedded copy or the store"""
+        if task.breakdown is not None:
+            return task.breakdown
+        if task.breakdown_key:
+            return await self.get(task.breakdown_key)
+        return None
+
+
+breakdown_store = BreakdownStore(
+    max_entries=int(os.environ.get("BREAKDOWN_CACHE_MAX_ENTRIES", "1024")),
+)
@@ -1,16 +1,26 @@
+import asyncio
+import os
+import structlog
 from datetime import datetime
+from uuid import uuid4
 from typing import Optional
+from google.oauth2.credentials import Credentials
 
-from models.calendar import GoogleCredentials, CalendarEventRequest, CalendarEventResponse
+from models.calendar import GoogleCredentials, CalendarEventRequest, CalendarEventResponse, CalendarBatchResult
 from models.tasks import Task
-from config.calendar_mgr import GoogleService
+from config.calendar_client import CalendarAPIError, calendar_client
+from config.calendar_mgr import calendar_events, credentials_cache, get_google_service
 from utils.exceptions import CalendarExceptions
 from config.database import engine
 from utils.exceptions import handle_database_operation
 
+logger = structlog.get_logger()
+
+CALENDAR_BATCH_CONCURRENCY = int(os.environ.get("CALENDAR_BATCH_CONCURRENCY", "5"))
+
 class CalendarQueries:
     def __init__(self):
-        self.google_service = GoogleService()
+        self.google_service = get_google_service()
 
     @handle_database_operation("saving google credentials")
     async def save_google_credentials(
@@ -20,13 +30,16 @@ class CalendarQueries:
         refresh_token: str,
         expiry: datetime
     ) -> None:
-        credentials = GoogleCredentials(
-            user_id=user_id,
-            encrypted_access_token=self.google_service.encrypt_token(access_token),
-            encrypted_refresh_token=self.google_service.encrypt_token(refresh_token),
-            token_expiry=expiry
+        await engine.get_collection(GoogleCredentials).update_one(
+            {"user_id": user_id},
+            {"$set": {
+                "encrypted_access_token": self.google_service.encrypt_token(access_token),
+                "encrypted_refresh_token": self.google_service.encrypt_token(refresh_token),
+                "token_expiry": expiry,
+            }},
+            upsert=True
         )
-        await engine.save(credentials)
+        credentials_cache.invalidate(user_id)
 
     @handle_database_operation("retrieving google credentials")
     async def get_google_credentials(self, user_id: str) -> Optional[GoogleCredentials]:
@@ -35,12 +48,12 @@ class CalendarQueries:
             GoogleCredentials.user_id == user_id
         )
 
-    async def add_event_to_calendar(
-        self,
-        user_id: str,
-        task: Task,
-        event_request: CalendarEventRequest
-    ) -> CalendarEventResponse:
+    async def get_user_credentials(self, user_id: str) -> Credentials:
+        """Decrypted Credentials for the user, from the short-lived cache when possible"""
+        credentials = credentials_cache.get(user_id)
+        if credentials:
+            return credentials
+
         credentials_doc = await self.get_google_credentials(user_id)
         if not credentials_doc:
             raise CalendarExceptions.not_connected()
@@ -50,32 +63,98 @@ class CalendarQueries:
                 credentials_doc.encrypted_access_token,
                 credentials_doc.encrypted_refresh_token
             )
-            service = self.google_service.create_calendar_service(credentials)
-            
-            event = {
-                'summary': task.title,
-                'description': task.description,
-                'start': {
-                    'dateTime': event_request.start_time.isoformat(),
-                    'timeZone': 'UTC',
-                },
-                'end': {
-                    'dateTime': event_request.end_time.isoformat(),
-                    'timeZone': 'UTC',
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'popup', 'minutes': event_request.notification_minutes}
-                    ]
-                }
+        except Exception as e:
+            raise CalendarExceptions.operation_failed(str(e))
+        credentials_cache.set(user_id, credentials)
+        return credentials
+
+    async def add_event_to_calendar(
+        self,
+        user_id: str,
+        task: Task,
+        event_request: CalendarEventRequest
+    ) -> CalendarEventResponse:
+        credentials = await self.get_user_credentials(user_id)
+        try:
+            return await self._insert_event(credentials, task, event_request)
+        except Exception as e:
+            raise CalendarExceptions.operation_failed(str(e))
+
+    async def add_events_to_calendar(
+        self,
+        user_id: str,
+        tasks: dict[str, Task],
+        event_requests: list[CalendarEventRequest]
+    ) -> list[CalendarBatchResult]:
+        """
+        Insert one event per request with at most CALENDAR_BATCH_CONCURRENCY
+        in flight, sharing one credentials lookup. Failures are reported per
+        item; requests whose task is not in tasks are not sent.
+        """
+        credentials = await self.get_user_credentials(user_id)
+        semaphore = asyncio.Semaphore(CALENDAR_BATCH_CONCURRENCY)
+
+        async def insert(index: int, event_request: CalendarEventRequest) -> CalendarBatchResult:
+            task = tasks.get(event_request.task_id)
+            if not task:
+                return CalendarBatchResult(index=index, task_id=event_request.task_id, status="not_found")
+            try:
+                async with semaphore:
+                    created = await self._insert_event(credentials, task, event_request)
+            except Exception as e:
+                logger.warning("calendar_batch_item_failed", user_id=user_id, task_id=event_request.task_id, error=str(e))
+                return CalendarBatchResult(index=index, task_id=event_request.task_id, status="failed", detail=str(e))
+            return CalendarBatchResult(
+                index=index,
+                task_id=event_request.task_id,
+                status="ok",
+                event_id=created.event_id,
+                calendar_link=created.calendar_link
+            )
+
+        return list(await asyncio.gather(*(
+            insert(index, event_request) for index, event_request in enumerate(event_requests)
+        )))
+
+    async def _insert_event(
+        self,
+        credentials: Credentials,
+        task: Task,
+        event_request: CalendarEventRequest
+    ) -> CalendarEventResponse:
+        event = {
+            # Chosen here so a retried insert cannot create a second event
+            'id': uuid4().hex,
+            'summary': task.title,
+            'description': task.description,
+            'start': {
+                'dateTime': event_request.start_time.isoformat(),
+                'timeZone': 'UTC',
+            },
+            'end': {
+                'dateTime': event_request.end_time.isoformat(),
+                'timeZone': 'UTC',
+            },
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'popup', 'minutes': event_request.notification_minutes}
+                ]
             }
-            
-            created_event = service.events().insert(calendarId='primary', body=event).execute()
-            return CalendarEventResponse(
-                event_id=created_event['id'],
-                task_id=str(task.id),
-                calendar_link=created_event.get('htmlLink', '')
+        }
+
+        events = calendar_events()
+        try:
+            created_event = await calendar_client.execute(
+                events.insert(calendarId='primary', body=event),
+                credentials
             )
-        except Exception as e:
-            raise CalendarExceptions.operation_failed(str(e))
\ No newline at end of file
+        except CalendarAPIError as e:
+            if e.status_code != 409:
+                raise
+            # an earlier attempt of this insert already went through
+            created_event = await calendar_client.execute(
+                events.get(calendarId='primary', eventId=event['id']),
+                credentials
+            )
+        return CalendarEventResponse.from_google_event(created_event, str(task.id))
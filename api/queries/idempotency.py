@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import structlog
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from bson import ObjectId
+from fastapi import Response
+from pymongo.errors import DuplicateKeyError
+
+from models.idempotency import IdempotencyRecord
+from utils.exceptions import IdempotencyExceptions
+from config.database import engine
+
+logger = structlog.get_logger()
+
+# A claim older than this belongs to a worker that died mid-request and may be taken over
+IN_FLIGHT_TIMEOUT_SECONDS = 120
+WAIT_TIMEOUT_SECONDS = 30
+POLL_INTERVAL_SECONDS = 0.25
+# Representation headers a replay must repeat for caches and conditional requests
+REPLAYED_HEADERS = ("vary", "etag", "cache-control", "location")
+
+
+class IdempotencyQueries:
+    """
+    Run a request at most once per (user, Idempotency-Key). The first request
+    claims the key with an in_progress record; retries replay the stored
+    response once it completes, or wait for it while it is still running.
+    Failed attempts (exceptions and 5xx) release the key so the client can
+    retry for real.
+    """
+
+    # Per-process wake-ups for retries waiting on a request in this worker;
+    # retries landing on another worker fall back to polling
+    _in_flight: dict[tuple[str, str], asyncio.Event] = {}
+
+    @staticmethod
+    def fingerprint(endpoint: str, payload: bytes) -> str:
+        return hashlib.sha256(endpoint.encode() + b"\n" + payload).hexdigest()
+
+    async def run(
+        self,
+        user_id: str,
+        key: str,
+        endpoint: str,
+        fingerprint: str,
+        produce: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        log = logger.bind(user_id=user_id, idempotency_key=key, endpoint=endpoint)
+        deadline = time.monotonic() + WAIT_TIMEOUT_SECONDS
+
+        while True:
+            record = IdempotencyRecord(user_id=user_id, key=key, endpoint=endpoint, fingerprint=fingerprint)
+            claimed_id, existing = await self._claim(record)
+            if claimed_id is not None:
+                break
+            if existing.endpoint != endpoint or existing.fingerprint != fingerprint:
+                log.warning("idempotency_key_reused")
+                raise IdempotencyExceptions.key_reused()
+            if existing.status != "completed":
+                existing = await self._wait(existing, deadline)
+                if existing is None:
+                    continue  # the original attempt failed and released the key
+                if existing.status != "completed":
+                    log.warning("idempotent_request_still_in_progress")
+                    raise IdempotencyExceptions.in_progress(retry_after=1)
+            log.info("idempotent_response_replayed", status_code=existing.status_code)
+            return Response(
+                content=existing.body,
+                status_code=existing.status_code,
+                media_type=existing.media_type,
+                headers={**existing.headers, "Idempotent-Replayed": "true"}
+            )
+
+        collection = engine.get_collection(IdempotencyRecord)
+        event = asyncio.Event()
+        self._in_flight[(user_id, key)] = event
+        try:
+            response = await produce()
+            if response.status_code < 500:
+                await collection.update_one(
+                    {"_id": claimed_id},
+                    {"$set": {
+                        "status": "completed",
+                        "status_code": response.status_code,
+                        "media_type": response.media_type,
+                        "body": bytes(response.body),
+                        "headers": {
+                            name: response.headers[name]
+                            for name in REPLAYED_HEADERS
+                            if name in response.headers
+                        },
+                    }}
+                )
+                log.info("idempotent_response_stored", status_code=response.status_code)
+            else:
+                await collection.delete_one({"_id": claimed_id, "status": "in_progress"})
+            return response
+        except BaseException:
+            await collection.delete_one({"_id": claimed_id, "status": "in_progress"})
+            raise
+        finally:
+            self._in_flight.pop((user_id, key), None)
+            event.set()
+
+    async def _claim(self, record: IdempotencyRecord) -> tuple[Optional[ObjectId], Optional[IdempotencyRecord]]:
+        """
+        Insert the in_progress record. Returns the id of the claimed record, or
+        None and the record already holding the key.
+        """
+        collection = engine.get_collection(IdempotencyRecord)
+        try:
+            await collection.insert_one(record.model_dump_doc())
+            return record.id, None
+        except DuplicateKeyError:
+            pass
+
+        doc = await collection.find_one({"user_id": record.user_id, "key": record.key})
+        if doc is None:
+            return await self._claim(record)
+        existing = IdempotencyRecord.model_validate_doc(doc)
+
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=IN_FLIGHT_TIMEOUT_SECONDS)
+        if existing.status == "in_progress" and existing.fingerprint == record.fingerprint:
+            taken = await collection.find_one_and_update(
+                {"_id": existing.id, "status": "in_progress", "created_at": {"$lt": stale_before}},
+                {"$set": {"created_at": record.created_at}}
+            )
+            if taken:
+                logger.warning("stale_idempotency_claim_taken_over", idempotency_key=record.key)
+                return existing.id, None
+        return None, existing
+
+    async def _wait(self, record: IdempotencyRecord, deadline: float) -> Optional[IdempotencyRecord]:
+        """Wait for an in-flight request to finish; None if it released the key"""
+        collection = engine.get_collection(IdempotencyRecord)
+        while time.monotonic() < deadline:
+            event = self._in_flight.get((record.user_id, record.key))
+            try:
+                if event is not None:
+                    await asyncio.wait_for(event.wait(), timeout=deadline - time.monotonic())
+                else:
+                    await asyncio.sleep(POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+            doc = await collection.find_one({"_id": record.id})
+            if doc is None:
+                return None
+            record = IdempotencyRecord.model_validate_doc(doc)
+            if record.status == "completed":
+                return record
+        return record
@@ -1,15 +1,152 @@
 from queries.analyzer import TaskAnalyzer
-from models.tasks import Task, TaskRequest
-from utils.exceptions import handle_database_operation
+from queries.breakdowns import breakdown_store
+from models.tasks import (
+    Task,
+    TaskVersion,
+    TaskTombstone,
+    TASK_ARCHIVE_COLLECTION,
+    TaskRequest,
+    TaskResponse,
+    TaskBreakdown,
+    TaskImportRecord,
+    TaskImportError,
+    TaskImportResponse,
+    TaskListFilter,
+    TaskBulkOperation,
+    TaskBulkResult,
+    TaskBulkResponse,
+)
+from utils.exceptions import handle_database_operation, TaskExceptions
+from utils.task_cache import task_cache
+from utils.ndjson import iter_lines
+from utils.task_events import task_events, TASK_CREATED, TASK_UPDATED, TASK_DELETED
 from config.database import engine
 from bson import ObjectId
+from fastapi import HTTPException
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+from pymongo import InsertOne, UpdateOne, ReplaceOne, DeleteOne, ReturnDocument, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from pydantic import ValidationError
 import structlog
 
 logger = structlog.get_logger()
 
+EXPORT_BATCH_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+MAX_IMPORT_ERRORS = 100
+ARCHIVE_BATCH_SIZE = 500
+BACKFILL_BATCH_SIZE = 500
+WRITE_TIMEOUT = timedelta(minutes=5)
+
+
+def completion_time(status: str, completed_at: Optional[datetime], now: datetime) -> Optional[datetime]:
+    """When a task in the given status was completed, keeping an existing timestamp"""
+    if status != "completed":
+        return None
+    return completed_at or now
+
+def breakdown_text(breakdown: Optional[TaskBreakdown]) -> Optional[str]:
+    """Step descriptions copied onto a task so the text index can search them"""
+    if breakdown is None:
+        return None
+    return "\n".join(step.description for step in breakdown.steps)
+
 class TaskQueries:
     def __init__(self):
         self.analyzer = TaskAnalyzer()
+        self.cache = task_cache
+        self.events = task_events
+        self.breakdowns = breakdown_store
+
+    async def get_collection_version(self, user_id: str) -> int:
+        """
+        Committed version of the user's task collection, without touching
+        task documents. Every write stamped at or below it has landed.
+        """
+        version = await engine.find_one(TaskVersion, TaskVersion.user_id == user_id)
+        return version.committed if version else 0
+
+    async def _next_version(self, user_id: str) -> int:
+        """
+        Allocate the next collection version for a write about to land. A
+        write in flight for longer than WRITE_TIMEOUT is presumed lost with
+        its worker and stops holding the committed version back.
+        """
+        now = datetime.now(timezone.utc)
+        doc = await engine.get_collection(TaskVersion).find_one_and_update(
+            {"user_id": user_id},
+            [{"$set": {
+                "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+                "committed": {"$ifNull": ["$committed", 0]},
+                "in_flight": {"$cond": [
+                    {"$lt": ["$allocated_at", now - WRITE_TIMEOUT]},
+                    1,
+                    {"$add": [{"$ifNull": ["$in_flight", 0]}, 1]}
+                ]},
+                "allocated_at": now,
+            }}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc["version"]
+
+    async def _commit_version(self, user_id: str) -> None:
+        """Finish a write, moving committed up to version once none is in flight"""
+        await engine.get_collection(TaskVersion).update_one(
+            {"user_id": user_id},
+            [
+                {"$set": {"in_flight": {"$max": [{"$subtract": ["$in_flight", 1]}, 0]}}},
+                {"$set": {"committed": {"$cond": [{"$eq": ["$in_flight", 0]}, "$version", "$committed"]}}},
+            ]
+        )
+
+    @asynccontextmanager
+    async def _versioned_write(self, user_id: str) -> AsyncIterator[int]:
+        """
+        Version for the writes made inside the block. Readers only see it as
+        the collection version once the block exits, so no ETag or sync token
+        is handed out for a write that has not landed. A failed write is
+        committed too; it simply left nothing stamped with its version.
+        """
+        version = await self._next_version(user_id)
+        try:
+            yield version
+        finally:
+            await self._commit_version(user_id)
+
+    def _touch(self, task: Task, version: int) -> None:
+        """Stamp a task with a new revision and the collection version it is written at"""
+        task.revision += 1
+        task.updated_at = datetime.now(timezone.utc)
+        task.completed_at = completion_time(task.status, task.completed_at, task.updated_at)
+        task.sync_version = version
+
+    async def _attach_breakdown(self, task: Task, breakdown: TaskBreakdown) -> None:
+        """Point a task at a stored breakdown instead of embedding it"""
+        task.breakdown_key = await self.breakdowns.put(breakdown)
+        task.breakdown_text = breakdown_text(breakdown)
+        task.breakdown = None
+        task.last_analyzed = True
+
+    async def load_breakdown(self, task: Task) -> Optional[TaskBreakdown]:
+        """Fetch a task's breakdown for detail views; list paths never load it"""
+        return await self.breakdowns.load(task)
+
+    def _written(
+        self,
+        user_id: str,
+        event_type: str,
+        task_id: str,
+        sync_version: int,
+        task: Optional[Task] = None
+    ) -> None:
+        """Post-write hook: drop cached reads and notify connected clients"""
+        self.cache.invalidate(user_id)
+        self.events.publish_local(user_id, event_type, task_id, sync_version, task)
         
     @handle_database_operation("creating task")
     async def create_task(self, task: TaskRequest, user_id: str) -> Task:
@@ -29,11 +166,13 @@ class TaskQueries:
         try:
             breakdown = await self.analyzer.get_task_breakdown(new_task)
             if breakdown:
-                new_task.breakdown = breakdown
-                new_task.last_analyzed = True
+                await self._attach_breakdown(new_task, breakdown)
                 log.info("task_breakdown_added")
-        
-            await engine.save(new_task)
+
+            async with self._versioned_write(user_id) as version:
+                self._touch(new_task, version)
+                await engine.save(new_task)
+            self._written(user_id, TASK_CREATED, str(new_task.id), new_task.sync_version, new_task)
             log.info("task_created", task_id=str(new_task.id))
             return new_task
         except Exception as e:
@@ -41,38 +180,143 @@ class TaskQueries:
             raise
 
     @handle_database_operation("retrieving tasks")
-    async def get_tasks(self, user_id: str) -> list[Task]:
+    async def get_tasks(self, user_id: str, version: Optional[int] = None) -> list[Task]:
+        """
+        Read-through the per-user cache. Pass the collection version when it
+        is already known so a stale entry from before another worker's write
+        is never served under a newer ETag.
+        """
         log = logger.bind(user_id=user_id)
         log.info("retrieving_all_tasks")
         
         try:
+            cached = self.cache.get_tasks(user_id, version)
+            if cached is not None:
+                log.info("tasks_cache_hit", count=len(cached))
+                return cached
+
+            epoch = self.cache.epoch
             tasks = await engine.find(Task, Task.user_id == user_id)
+            self.cache.set_tasks(user_id, tasks, epoch, version)
             log.info("tasks_retrieved", count=len(tasks))
             return tasks
         except Exception as e:
             log.error("task_retrieval_failed", error=str(e))
             raise
     
+    @staticmethod
+    def build_list_query(user_id: str, filters: TaskListFilter) -> tuple[dict, list]:
+        """Translate list filters into a Mongo query and sort covered by the Task indexes"""
+        query = {"user_id": user_id}
+        if filters.status:
+            query["status"] = filters.status
+        if filters.priority:
+            query["priority"] = filters.priority
+        if filters.energy_level:
+            query["context.energy_level"] = filters.energy_level
+        if filters.environment:
+            query["context.environment"] = filters.environment
+        if filters.time_of_day:
+            query["context.time_of_day"] = filters.time_of_day
+
+        sort = []
+        if filters.sort:
+            direction = DESCENDING if filters.sort.startswith("-") else ASCENDING
+            sort.append((filters.sort.lstrip("-"), direction))
+        return query, sort
+
+    @handle_database_operation("retrieving tasks")
+    async def find_tasks(self, user_id: str, filters: TaskListFilter) -> list[Task]:
+        """Filtered and sorted task listing, served by Mongo rather than the cache"""
+        log = logger.bind(user_id=user_id, **filters.model_dump(exclude_none=True))
+        log.info("finding_tasks")
+
+        query, sort = self.build_list_query(user_id, filters)
+        cursor = engine.get_collection(Task).find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+
+        tasks = [Task.model_validate_doc(doc) async for doc in cursor]
+        log.info("tasks_found", count=len(tasks))
+        return tasks
+
+    @handle_database_operation("searching tasks")
+    async def search_tasks(
+        self,
+        user_id: str,
+        text: str,
+        page: int = 1,
+        page_size: int = 20
+    ) -> tuple[list[tuple[Task, float]], int]:
+        """
+        Ranked full-text search over title, description and breakdown step
+        descriptions using the task_text_search index. Returns one page of
+        (task, score) pairs and the total number of matches.
+        """
+        log = logger.bind(user_id=user_id, page=page, page_size=page_size)
+        log.info("searching_tasks")
+
+        collection = engine.get_collection(Task)
+        query = {"user_id": user_id, "$text": {"$search": text}}
+        score = {"$meta": "textScore"}
+
+        cursor = (
+            collection.find(query, {"score": score})
+            .sort([("score", score)])
+            .skip((page - 1) * page_size)
+            .limit(page_size)
+        )
+        docs, total = await asyncio.gather(
+            cursor.to_list(length=page_size),
+            collection.count_documents(query)
+        )
+
+        hits = []
+        for doc in docs:
+            doc_score = doc.pop("score")
+            hits.append((Task.model_validate_doc(doc), doc_score))
+
+        log.info("tasks_searched", count=len(hits), total=total)
+        return hits, total
+
     @handle_database_operation("retrieving task")
-    async def get_task(self, task_id: str, user_id: str) -> Task:
+    async def get_task(self, task_id: str, user_id: str, version: Optional[int] = None) -> Task:
         log = logger.bind(user_id=user_id, task_id=task_id)
         log.info("retrieving_task")
         
         try:
+            cached = self.cache.get_task(user_id, task_id, version)
+            if cached is not None:
+                log.info("task_cache_hit")
+                return cached
+
+            epoch = self.cache.epoch
             task = await engine.find_one(Task, 
                 Task.id == ObjectId(task_id), 
                 Task.user_id == user_id
             )
             if not task:
                 log.warning("task_not_found")
-                raise ValueError("Task not found")
+                raise TaskExceptions.not_found()
             
+            self.cache.set_task(user_id, task, epoch, version)
             log.info("task_retrieved")
             return task
+        except HTTPException:
+            raise
         except Exception as e:
             log.error("task_retrieval_failed", error=str(e))
             raise ValueError("Task not found")
     
+    @handle_database_operation("retrieving tasks")
+    async def get_tasks_by_ids(self, task_ids: list[str], user_id: str) -> dict[str, Task]:
+        """The user's tasks among task_ids, keyed by id, in one $in query; missing ids are left out"""
+        log = logger.bind(user_id=user_id, requested=len(task_ids))
+        ids = list({ObjectId(task_id) for task_id in task_ids})
+        tasks = await engine.find(Task, {"_id": {"$in": ids}, "user_id": user_id})
+        log.info("tasks_retrieved_by_ids", found=len(tasks))
+        return {str(task.id): task for task in tasks}
+
     @handle_database_operation("updating task")
     async def update_task(self, task_id: str, task: TaskRequest, user_id: str) -> Task:
         log = logger.bind(user_id=user_id, task_id=task_id)
@@ -101,11 +345,13 @@ class TaskQueries:
                 log.info("task_content_changed", task_id=task_id)
                 breakdown = await self.analyzer.get_task_breakdown(existing_task)
                 if breakdown:
-                    existing_task.breakdown = breakdown
-                    existing_task.last_analyzed = True
+                    await self._attach_breakdown(existing_task, breakdown)
                     log.info("task_breakdown_updated")
 
-            await engine.save(existing_task)
+            async with self._versioned_write(user_id) as version:
+                self._touch(existing_task, version)
+                await engine.save(existing_task)
+            self._written(user_id, TASK_UPDATED, task_id, existing_task.sync_version, existing_task)
             log.info("task_updated")
             return existing_task
         
@@ -127,7 +373,14 @@ class TaskQueries:
                 log.warning("task_not_found")
                 raise ValueError("Task not found")
 
-            await engine.delete(existing_task)
+            async with self._versioned_write(user_id) as version:
+                await engine.delete(existing_task)
+                await engine.save(TaskTombstone(
+                    task_id=task_id,
+                    user_id=user_id,
+                    sync_version=version
+                ))
+            self._written(user_id, TASK_DELETED, task_id, version)
             log.info("task_deleted")
         except Exception as e:
             log.error("task_deletion_failed", error=str(e))
@@ -150,12 +403,532 @@ class TaskQueries:
 
             breakdown = await self.analyzer.get_task_breakdown(existing_task)
             if breakdown:
-                existing_task.breakdown = breakdown
-                existing_task.last_analyzed = True
-                await engine.save(existing_task)
+                await self._attach_breakdown(existing_task, breakdown)
+                async with self._versioned_write(user_id) as version:
+                    self._touch(existing_task, version)
+                    await engine.save(existing_task)
+                self._written(user_id, TASK_UPDATED, task_id, existing_task.sync_version, existing_task)
                 log.info("task_breakdown_regenerated")
             
             return existing_task
         except Exception as e:
             log.error("breakdown_regeneration_failed", error=str(e))
-            raise ValueError("Task not found")
\ No newline at end of file
+            raise ValueError("Task not found")
+
+    @staticmethod
+    def _bulk_stamp(version: int) -> dict:
+        return {
+            "sync_version": version,
+            "updated_at": datetime.now(timezone.utc),
+        }
+
+    @handle_database_operation("applying bulk task operations")
+    async def bulk_write_tasks(
+        self,
+        operations: list[TaskBulkOperation],
+        user_id: str,
+        ordered: bool = True
+    ) -> TaskBulkResponse:
+        """
+        Apply a batch of create/update/status/delete operations in a single
+        bulk_write. Created tasks are saved without a breakdown so a batch
+        never spends generation quota; content updates drop the breakdown
+        that described the old content instead of regenerating inline, and
+        the task gets a new one the next time it is updated or regenerated.
+        """
+        log = logger.bind(user_id=user_id, operation_count=len(operations), ordered=ordered)
+        log.info("bulk_writing_tasks")
+
+        collection = engine.get_collection(Task)
+
+        target_ids = list({ObjectId(op.task_id) for op in operations if op.task_id})
+        existing = {}
+        if target_ids:
+            cursor = collection.find(
+                {"_id": {"$in": target_ids}, "user_id": user_id},
+                {"title": 1, "description": 1, "status": 1, "completed_at": 1}
+            )
+            async for doc in cursor:
+                existing[str(doc["_id"])] = doc
+
+        results: list[TaskBulkResult | None] = [None] * len(operations)
+        requests = []
+        request_indexes = []
+        deleted_indexes = []
+        stamp = None
+        halted = False
+
+        inserted = modified = deleted = 0
+        try:
+            for index, operation in enumerate(operations):
+                if halted:
+                    results[index] = TaskBulkResult(index=index, op=operation.op, status="skipped", task_id=operation.task_id)
+                    continue
+
+                if operation.op == "create":
+                    if not stamp:
+                        stamp = self._bulk_stamp(await self._next_version(user_id))
+                    new_task = Task(
+                        revision=1,
+                        completed_at=completion_time(operation.task.status, None, stamp["updated_at"]),
+                        **stamp,
+                        title=operation.task.title,
+                        description=operation.task.description,
+                        priority=operation.task.priority,
+                        status=operation.task.status,
+                        user_id=user_id,
+                        context=operation.task.context,
+                        last_analyzed=False
+                    )
+                    requests.append(InsertOne(new_task.model_dump_doc()))
+                    request_indexes.append(index)
+                    results[index] = TaskBulkResult(index=index, op=operation.op, status="ok", task_id=str(new_task.id))
+                    continue
+
+                current = existing.get(operation.task_id)
+                if not current:
+                    results[index] = TaskBulkResult(
+                        index=index,
+                        op=operation.op,
+                        status="not_found",
+                        task_id=operation.task_id,
+                        detail="Task not found"
+                    )
+                    halted = ordered
+                    continue
+
+                if not stamp:
+                    stamp = self._bulk_stamp(await self._next_version(user_id))
+                task_filter = {"_id": ObjectId(operation.task_id), "user_id": user_id}
+                if operation.op == "update":
+                    changes = {
+                        "title": operation.task.title,
+                        "description": operation.task.description,
+                        "priority": operation.task.priority,
+                        "status": operation.task.status,
+                    }
+                    if operation.task.context:
+                        changes["context"] = operation.task.context.model_dump()
+                    if (
+                        current.get("title") != operation.task.title or
+                        current.get("description") != operation.task.description
+                    ):
+                        changes.update(
+                            breakdown=None,
+                            breakdown_key=None,
+                            breakdown_text=None,
+                            last_analyzed=False
+                        )
+                    changes["completed_at"] = completion_time(
+                        operation.task.status,
+                        current.get("completed_at"),
+                        stamp["updated_at"]
+                    )
+                    current.update(
+                        title=operation.task.title,
+                        description=operation.task.description,
+                        completed_at=changes["completed_at"]
+                    )
+                    requests.append(UpdateOne(task_filter, {"$set": {**changes, **stamp}, "$inc": {"revision": 1}}))
+                elif operation.op == "status":
+                    completed_at = completion_time(operation.status, current.get("completed_at"), stamp["updated_at"])
+                    current["completed_at"] = completed_at
+                    requests.append(UpdateOne(
+                        task_filter,
+                        {
+                            "$set": {"status": operation.status, "completed_at": completed_at, **stamp},
+                            "$inc": {"revision": 1}
+                        }
+                    ))
+                else:
+                    requests.append(DeleteOne(task_filter))
+                    deleted_indexes.append(index)
+                    existing.pop(operation.task_id)
+
+                request_indexes.append(index)
+                results[index] = TaskBulkResult(index=index, op=operation.op, status="ok", task_id=operation.task_id)
+
+            if requests:
+                try:
+                    outcome = await collection.bulk_write(requests, ordered=ordered)
+                    inserted = outcome.inserted_count
+                    modified = outcome.modified_count
+                    deleted = outcome.deleted_count
+                except BulkWriteError as e:
+                    details = e.details
+                    inserted = details.get("nInserted", 0)
+                    modified = details.get("nModified", 0)
+                    deleted = details.get("nRemoved", 0)
+
+                    write_errors = details.get("writeErrors", [])
+                    for error in write_errors:
+                        result = results[request_indexes[error["index"]]]
+                        result.status = "failed"
+                        result.detail = error.get("errmsg")
+
+                    if ordered and write_errors:
+                        first_failed = min(error["index"] for error in write_errors)
+                        for request_index in request_indexes[first_failed + 1:]:
+                            results[request_index].status = "skipped"
+
+                    log.warning("bulk_write_partial_failure", error_count=len(write_errors))
+
+                tombstones = [
+                    TaskTombstone(
+                        task_id=results[index].task_id,
+                        user_id=user_id,
+                        sync_version=stamp["sync_version"]
+                    )
+                    for index in deleted_indexes
+                    if results[index].status == "ok"
+                ]
+                if tombstones:
+                    await engine.save_all(tombstones)
+        finally:
+            # the version is only readable once the batch and its tombstones have landed
+            if stamp:
+                await self._commit_version(user_id)
+
+        if requests:
+            self.cache.invalidate(user_id)
+            event_types = {"create": TASK_CREATED, "delete": TASK_DELETED}
+            for index in request_indexes:
+                result = results[index]
+                if result.status == "ok":
+                    self.events.publish_local(
+                        user_id,
+                        event_types.get(result.op, TASK_UPDATED),
+                        result.task_id,
+                        stamp["sync_version"]
+                    )
+
+        log.info("bulk_write_completed", inserted=inserted, modified=modified, deleted=deleted)
+        return TaskBulkResponse(
+            results=results,
+            inserted=inserted,
+            modified=modified,
+            deleted=deleted
+        )
+
+
+    @handle_database_operation("retrieving task changes")
+    async def get_changes_since(self, user_id: str, since: int) -> tuple[list[Task], list[str], int]:
+        """
+        Tasks written and task ids deleted after the given sync token. Both
+        lookups walk the (user_id, sync_version) indexes, so the cost tracks
+        the number of changes rather than the size of the task list. The
+        returned token is the committed version, so a write still in flight
+        is reported again under the next token rather than skipped. A first
+        sync (token 0) is a full snapshot, since tasks written before sync
+        versions existed carry no sync_version for the index to match.
+        """
+        log = logger.bind(user_id=user_id, since=since)
+        log.info("retrieving_task_changes")
+
+        version = await self.get_collection_version(user_id)
+        if since == 0:
+            upserts = await engine.find(Task, Task.user_id == user_id)
+            log.info("task_snapshot_retrieved", upserts=len(upserts), version=version)
+            return upserts, [], version
+        if since >= version:
+            log.info("task_changes_empty", version=version)
+            return [], [], version
+
+        upserts = await engine.find(
+            Task,
+            Task.user_id == user_id,
+            Task.sync_version > since
+        )
+        tombstones = await engine.find(
+            TaskTombstone,
+            TaskTombstone.user_id == user_id,
+            TaskTombstone.sync_version > since
+        )
+        deletions = [tombstone.task_id for tombstone in tombstones]
+
+        log.info("task_changes_retrieved", upserts=len(upserts), deletions=len(deletions), version=version)
+        return upserts, deletions, version
+
+
+    async def export_tasks(self, user_id: str) -> AsyncIterator[bytes]:
+        """Stream the user's tasks, breakdowns included, as NDJSON straight off a cursor"""
+        log = logger.bind(user_id=user_id)
+        log.info("exporting_tasks")
+
+        cursor = engine.get_collection(Task).find({"user_id": user_id}).batch_size(EXPORT_BATCH_SIZE)
+        count = 0
+        batch = []
+        async for doc in cursor:
+            batch.append(Task.model_validate_doc(doc))
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                for line in await self._export_lines(batch):
+                    yield line
+                count += len(batch)
+                batch = []
+        for line in await self._export_lines(batch):
+            yield line
+        count += len(batch)
+
+        log.info("tasks_exported", count=count)
+
+    async def _export_lines(self, tasks: list[Task]) -> list[bytes]:
+        """NDJSON lines for a batch of tasks, resolving their breakdowns in one query"""
+        breakdowns = await self.breakdowns.get_many(
+            {task.breakdown_key for task in tasks if task.breakdown_key}
+        )
+        return [
+            TaskResponse.from_mongo(task, breakdowns.get(task.breakdown_key)).model_dump_json().encode() + b"\n"
+            for task in tasks
+        ]
+
+    @handle_database_operation("importing tasks")
+    async def import_tasks(
+        self,
+        user_id: str,
+        chunks: AsyncIterator[bytes],
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> TaskImportResponse:
+        """
+        Parse an NDJSON stream line by line, validate each record as a task
+        with an optional breakdown and insert valid ones in bulk_write batches.
+        Invalid lines are skipped and reported instead of failing the import.
+        """
+        log = logger.bind(user_id=user_id)
+        log.info("importing_tasks")
+
+        imported = failed = 0
+        errors = []
+        batch = []
+
+        def record_error(line: int, detail: str) -> None:
+            nonlocal failed
+            failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append(TaskImportError(line=line, detail=detail))
+
+        async for line_number, line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            try:
+                record = TaskImportRecord.model_validate_json(line)
+            except ValidationError as e:
+                record_error(line_number, "; ".join(error["msg"] for error in e.errors()))
+                continue
+
+            batch.append((line_number, record))
+            if len(batch) >= batch_size:
+                imported += await self._insert_import_batch(user_id, batch, record_error)
+                batch = []
+
+        if batch:
+            imported += await self._insert_import_batch(user_id, batch, record_error)
+
+        if imported:
+            self.cache.invalidate(user_id)
+            if self.events.local_publish:
+                self.events.resync(user_id)
+
+        log.info("tasks_imported", imported=imported, failed=failed)
+        return TaskImportResponse(imported=imported, failed=failed, errors=errors)
+
+    async def _insert_import_batch(self, user_id: str, batch: list, record_error) -> int:
+        breakdown_keys = await self.breakdowns.put_many([record.breakdown for _, record in batch])
+        async with self._versioned_write(user_id) as version:
+            stamp = self._bulk_stamp(version)
+            requests = []
+            for (_, record), breakdown_key in zip(batch, breakdown_keys):
+                requests.append(InsertOne(Task(
+                    title=record.title,
+                    description=record.description,
+                    priority=record.priority,
+                    status=record.status,
+                    user_id=user_id,
+                    context=record.context,
+                    breakdown_key=breakdown_key,
+                    breakdown_text=breakdown_text(record.breakdown),
+                    last_analyzed=record.breakdown is not None,
+                    completed_at=completion_time(record.status, None, stamp["updated_at"]),
+                    revision=1,
+                    **stamp
+                ).model_dump_doc()))
+            try:
+                result = await engine.get_collection(Task).bulk_write(requests, ordered=False)
+                return result.inserted_count
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    record_error(batch[error["index"]][0], error.get("errmsg", "Insert failed"))
+                return e.details.get("nInserted", 0)
+
+
+    async def backfill_breakdown_text(self, batch_size: int = BACKFILL_BATCH_SIZE) -> None:
+        """
+        Give tasks analyzed before breakdown_text existed their step text, so
+        task_text_search matches them on breakdown steps. Only tasks missing
+        the field are read, so once every task has it this is a single empty
+        query, and an interrupted run is picked up again on the next start.
+        """
+        log = logger.bind(batch_size=batch_size)
+        cursor = engine.get_collection(Task).find(
+            {
+                "breakdown_text": {"$exists": False},
+                "$or": [{"breakdown_key": {"$ne": None}}, {"breakdown": {"$ne": None}}],
+            },
+            {"breakdown": 1, "breakdown_key": 1}
+        ).batch_size(batch_size)
+
+        backfilled = 0
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                backfilled += await self._backfill_breakdown_text(batch)
+                batch = []
+        if batch:
+            backfilled += await self._backfill_breakdown_text(batch)
+
+        if backfilled:
+            log.info("breakdown_text_backfilled", backfilled=backfilled)
+
+    async def _backfill_breakdown_text(self, docs: list[dict]) -> int:
+        stored = await self.breakdowns.get_many(
+            {doc["breakdown_key"] for doc in docs if doc.get("breakdown_key")}
+        )
+        requests = []
+        for doc in docs:
+            if doc.get("breakdown"):
+                breakdown = TaskBreakdown.model_validate(doc["breakdown"])
+            else:
+                breakdown = stored.get(doc["breakdown_key"])
+            requests.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"breakdown_text": breakdown_text(breakdown)}}
+            ))
+        await engine.get_collection(Task).bulk_write(requests, ordered=False)
+        return len(requests)
+
+    async def _record_removals(self, user_id: str, task_ids: list[str]) -> None:
+        """
+        Bookkeeping for tasks removed outside delete_task: tombstones for
+        delta sync, a version bump, cache invalidation and delete events.
+        """
+        async with self._versioned_write(user_id) as version:
+            await engine.save_all([
+                TaskTombstone(task_id=task_id, user_id=user_id, sync_version=version)
+                for task_id in task_ids
+            ])
+        self.cache.invalidate(user_id)
+        for task_id in task_ids:
+            self.events.publish_local(user_id, TASK_DELETED, task_id, version)
+
+    async def archive_completed_tasks(
+        self,
+        older_than: timedelta,
+        batch_size: int = ARCHIVE_BATCH_SIZE
+    ) -> int:
+        """
+        Move tasks completed before now - older_than into tasks_archive, one
+        batch at a time. Each batch is copied first and removed from tasks
+        only if its revision is unchanged, so a task edited mid-run stays hot
+        and its archive copy is dropped. Returns the number of tasks moved.
+        """
+        now = datetime.now(timezone.utc)
+        cutoff = now - older_than
+        log = logger.bind(cutoff=cutoff.isoformat(), batch_size=batch_size)
+        log.info("archiving_completed_tasks")
+
+        collection = engine.get_collection(Task)
+        archive = engine.database[TASK_ARCHIVE_COLLECTION]
+
+        # Tasks completed before completed_at existed start their retention clock now
+        await collection.update_many(
+            {"status": "completed", "completed_at": None},
+            {"$set": {"completed_at": now}}
+        )
+
+        archived = 0
+        while True:
+            docs = await (
+                collection.find({"status": "completed", "completed_at": {"$lt": cutoff}})
+                .sort([("completed_at", ASCENDING)])
+                .limit(batch_size)
+                .to_list(length=batch_size)
+            )
+            if not docs:
+                break
+
+            await archive.bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": now}, upsert=True) for doc in docs],
+                ordered=False
+            )
+            # Tasks last written before revisions existed have no field to compare
+            await collection.bulk_write(
+                [
+                    DeleteOne({
+                        "_id": doc["_id"],
+                        "revision": doc["revision"] if "revision" in doc else {"$exists": False}
+                    })
+                    for doc in docs
+                ],
+                ordered=False
+            )
+
+            ids = [doc["_id"] for doc in docs]
+            kept = {doc["_id"] async for doc in collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+            if kept:
+                await archive.delete_many({"_id": {"$in": list(kept)}})
+
+            removed = defaultdict(list)
+            for doc in docs:
+                if doc["_id"] not in kept:
+                    removed[doc["user_id"]].append(str(doc["_id"]))
+            for user_id, task_ids in removed.items():
+                await self._record_removals(user_id, task_ids)
+
+            moved = len(docs) - len(kept)
+            archived += moved
+            log.info("task_archive_batch", moved=moved, kept=len(kept))
+            if not moved:
+                break
+
+        log.info("completed_tasks_archived", archived=archived)
+        return archived
+
+    async def get_archived_tasks(
+        self,
+        user_id: str,
+        page: int = 1,
+        page_size: int = 20
+    ) -> tuple[list[tuple[Task, datetime]], int]:
+        """One page of a user's archived tasks, most recently completed first"""
+        log = logger.bind(user_id=user_id, page=page, page_size=page_size)
+        log.info("retrieving_archived_tasks")
+
+        archive = engine.database[TASK_ARCHIVE_COLLECTION]
+        cursor = (
+            archive.find({"user_id": user_id})
+            .sort([("completed_at", DESCENDING), ("_id", DESCENDING)])
+            .skip((page - 1) * page_size)
+            .limit(page_size)
+        )
+        docs, total = await asyncio.gather(
+            cursor.to_list(length=page_size),
+            archive.count_documents({"user_id": user_id})
+        )
+
+        tasks = [(Task.model_validate_doc(doc), doc["archived_at"]) for doc in docs]
+        log.info("archived_tasks_retrieved", count=len(tasks), total=total)
+        return tasks, total
+
+    async def get_archived_task(self, task_id: str, user_id: str) -> tuple[Task, datetime]:
+        log = logger.bind(user_id=user_id, task_id=task_id)
+        log.info("retrieving_archived_task")
+
+        doc = await engine.database[TASK_ARCHIVE_COLLECTION].find_one(
+            {"_id": ObjectId(task_id), "user_id": user_id}
+        )
+        if not doc:
+            log.warning("archived_task_not_found")
+            raise ValueError("Task not found")
+
+        log.info("archived_task_retrieved")
+        return Task.model_validate_doc(doc), doc["archived_at"]
@@ -9,14 +9,17 @@ from fastapi import (
 from pymongo.errors import DuplicateKeyError
 from utils.authentication import (
     try_get_jwt_user_data,
-    hash_password,
+    hash_password_async,
     generate_jwt,
-    verify_password,
+    verify_password_async,
+    password_needs_rehash,
+    BCRYPT_ROUNDS,
 )
 from config.database import engine
 from models.users import UserRequest, UserResponse, SignInRequest, PasswordChangeRequest
-from queries.auth import UserQueries
+from queries.auth import UserQueries, duplicate_key_field
 from utils.exceptions import AuthExceptions, UserExceptions
+from utils.login_throttle import login_throttle
 
 logger = structlog.get_logger()
 
@@ -33,7 +36,7 @@ async def create_user(
     log.info("signup_attempt")
 
     try:
-        hashed_password = hash_password(user.password)
+        hashed_password = await hash_password_async(user.password)
         user_new = await queries.create_user(UserRequest(
             username=user.username,
             name=user.name,
@@ -54,10 +57,9 @@ async def create_user(
         log.info("signup_successful", user_id=str(user_new.id))
         return UserResponse.from_mongo(user_new)
     except DuplicateKeyError as e:
-        error_message = str(e)
-        for field in ["username", "email"]:
-            if field in error_message:
-                raise UserExceptions.duplicate_field(field)
+        field = duplicate_key_field(e)
+        if field:
+            raise UserExceptions.duplicate_field(field)
         raise UserExceptions.database_error("creating user")
     except Exception as e:
         log.error("signup_failed", error=str(e))
@@ -74,12 +76,25 @@ async def signin(
     log.info("signin_attempt")
 
     try:
-        user = await queries.get_by_username(user_req.username)
+        client_ip = request.client.host if request.client else None
+        await login_throttle.check(user_req.username, client_ip)
+
+        user = await queries.find_by_username(user_req.username)
         
-        if not user or not verify_password(user_req.password, user.password):
+        if not user or not await verify_password_async(user_req.password, user.password):
             log.warning("invalid_credentials")
             raise AuthExceptions.invalid_credentials()
         
+        await login_throttle.succeeded(user_req.username)
+
+        if password_needs_rehash(user.password):
+            try:
+                new_hash = await hash_password_async(user_req.password)
+                if await queries.replace_password_hash(user, new_hash):
+                    log.info("password_rehashed", rounds=BCRYPT_ROUNDS)
+            except Exception as e:
+                log.warning("password_rehash_failed", error=str(e))
+
         token = generate_jwt(user)
 
         secure = False if request.headers.get("origin", "").startswith("http://localhost") else True
@@ -120,10 +135,10 @@ async def change_password(
         if not user:
             raise UserExceptions.not_found()
         
-        if not verify_password(password_change.current_password, user.password):
+        if not await verify_password_async(password_change.current_password, user.password):
             raise AuthExceptions.unauthorized("Current password is incorrect")
         
-        new_hashed_password = hash_password(password_change.new_password)
+        new_hashed_password = await hash_password_async(password_change.new_password)
         user.password = new_hashed_password
         await engine.save(user)
         
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends
 from datetime import datetime, timezone, timedelta
 
-from models.calendar import CalendarEventRequest, CalendarEventResponse
+from models.calendar import (
+    CalendarEventRequest,
+    CalendarEventResponse,
+    CalendarBatchRequest,
+    CalendarBatchResponse,
+)
 from models.users import UserResponse
 from queries.calendar import CalendarQueries
 from queries.tasks import TaskQueries
-from config.calendar_mgr import GoogleService
 from utils.authentication import try_get_jwt_user_data
 from utils.exceptions import TaskExceptions, CalendarExceptions, AuthExceptions
 
@@ -23,15 +27,10 @@ async def handle_google_auth(
         raise AuthExceptions.unauthorized()
 
     try:
-        service = GoogleService()
-        
-        encrypted_access = service.encrypt_token(google_token["access_token"])
-        encrypted_refresh = service.encrypt_token(google_token["refresh_token"])
-
         await queries.save_google_credentials(
             user_id=current_user.id,
-            access_token=encrypted_access,
-            refresh_token=encrypted_refresh,
+            access_token=google_token["access_token"],
+            refresh_token=google_token["refresh_token"],
             expiry=datetime.now(timezone.utc) + timedelta(hours=1)
         )
         
@@ -58,4 +57,29 @@ async def add_task_to_calendar(
         current_user.id,
         task,
         event_request
-    )
\ No newline at end of file
+    )
+
+@router.post("/events/batch")
+async def add_tasks_to_calendar(
+    batch_request: CalendarBatchRequest,
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    calendar_queries: CalendarQueries = Depends(),
+    task_queries: TaskQueries = Depends()
+) -> CalendarBatchResponse:
+    """Add several tasks to Google Calendar, reporting the outcome of each"""
+    if not current_user:
+        raise AuthExceptions.unauthorized()
+
+    tasks = await task_queries.get_tasks_by_ids(
+        [event_request.task_id for event_request in batch_request.events],
+        current_user.id
+    )
+    results = await calendar_queries.add_events_to_calendar(
+        current_user.id,
+        tasks,
+        batch_request.events
+    )
+    return CalendarBatchResponse(
+        results=results,
+        created=sum(1 for result in results if result.status == "ok")
+    )
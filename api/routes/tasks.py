@@ -1,26 +1,48 @@
+import asyncio
+import json
 import structlog
 from datetime import datetime, timezone
+from typing import Annotated, Optional
 from models.usage import UsageResponse, UserAPIUsage
-from fastapi import Depends, HTTPException, APIRouter
+from fastapi import Depends, HTTPException, APIRouter, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from bson import ObjectId
-from models.tasks import Task, TaskRequest, TaskResponse
+from models.tasks import (
+    Task,
+    TaskRequest,
+    TaskResponse,
+    TaskListFilter,
+    TaskBulkRequest,
+    TaskBulkResponse,
+    TaskSyncResponse,
+    TaskSearchResponse,
+    TaskImportResponse,
+    ArchivedTaskResponse,
+    TaskArchiveResponse,
+)
 from models.users import UserResponse
 from queries.tasks import TaskQueries
 from queries.analyzer import TaskAnalyzer
+from queries.idempotency import IdempotencyQueries
 from utils.authentication import try_get_jwt_user_data
 from utils.exceptions import AuthExceptions, UserExceptions, TaskExceptions
+from utils.etags import collection_etag, task_etag, etag_matches, representation_etag
+from utils.responses import encode_response, preferred_media_type, task_document, archived_task_document
 from config.database import engine
 
 logger = structlog.get_logger()
 router = APIRouter(tags=["Tasks"], prefix="/api/tasks")
 
-router = APIRouter(tags=["Tasks"], prefix="/api/tasks")
+CACHE_CONTROL = "private, no-cache"
+HEARTBEAT_SECONDS = 15
 
 @router.get("/usage", response_model=UsageResponse)
 async def get_task_generation_usage(
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     queries: TaskQueries = Depends(),
-) -> dict:
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
     log = logger.bind(user_id=current_user.id if current_user else None)
     log.info("checking_task_generation_usage")
     
@@ -46,22 +68,25 @@ async def get_task_generation_usage(
         displayed_usage = actual_usage // 2
         
         
-        return {
+        return encode_response({
                     "daily_limit": queries.analyzer.displayed_daily_limit,
                     "generations_used": displayed_usage,
                     "generations_remaining": queries.analyzer.displayed_daily_limit - displayed_usage
-                }
+                }, preferred_media_type(accept))
         
     except Exception as e:
         log.error("usage_check_failed", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to get usage information")
 
-@router.post("/create")
+@router.post("/create", response_model=TaskResponse)
 async def create_task(
     task: TaskRequest,
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     queries: TaskQueries = Depends(),
-) -> TaskResponse:
+    accept: Annotated[Optional[str], Header()] = None,
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
+    idempotency: IdempotencyQueries = Depends(),
+) -> Response:
     log = logger.bind(
         user_id=current_user.id if current_user else None,
         task_title=task.title
@@ -71,15 +96,29 @@ async def create_task(
     if not current_user:
         log.warning("unauthorized_task_creation")
         raise AuthExceptions.unauthorized()
-    
-    try:
-        new_task = await queries.create_task(task, current_user.id)
-        log.info("task_created", task_id=str(new_task.id))
-        return TaskResponse.from_mongo(new_task)
-    
-    except Exception as e:
-        log.error("task_creation_failed", error=str(e))
-        raise UserExceptions.database_error("creating task")
+
+    async def create() -> Response:
+        try:
+            new_task = await queries.create_task(task, current_user.id)
+            log.info("task_created", task_id=str(new_task.id))
+            return encode_response(
+                task_document(new_task, await queries.load_breakdown(new_task)),
+                preferred_media_type(accept)
+            )
+        except Exception as e:
+            log.error("task_creation_failed", error=str(e))
+            raise UserExceptions.database_error("creating task")
+
+    if idempotency_key is None:
+        return await create()
+    endpoint = "/api/tasks/create"
+    return await idempotency.run(
+        current_user.id,
+        idempotency_key,
+        endpoint,
+        IdempotencyQueries.fingerprint(endpoint, task.model_dump_json().encode()),
+        create
+    )
 
 
 @router.post("/generate")
@@ -87,7 +126,10 @@ async def generate_task_breakdown(
     task_request: TaskRequest,
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     queries: TaskQueries = Depends(),
-) -> dict:
+    accept: Annotated[Optional[str], Header()] = None,
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
+    idempotency: IdempotencyQueries = Depends(),
+) -> Response:
     log = logger.bind(
         user_id=current_user.id if current_user else None,
         task_title=task_request.title
@@ -97,37 +139,88 @@ async def generate_task_breakdown(
     if not current_user:
         log.warning("unauthorized_breakdown_generation")
         raise AuthExceptions.unauthorized()
-    
+
+    async def generate() -> Response:
+        try:
+            temp_task = Task(
+                title=task_request.title,
+                description=task_request.description,
+                priority=task_request.priority,
+                status=task_request.status,
+                user_id=current_user.id,
+                context=task_request.context
+            )
+            
+            analyzer = TaskAnalyzer()
+            breakdown = await analyzer.get_task_breakdown(temp_task)
+            
+            if not breakdown:
+                log.error("breakdown_generation_failed")
+                raise HTTPException(status_code=500, detail="Failed to generate task breakdown")
+                
+            log.info("breakdown_generated_successfully")
+            return encode_response({"breakdown": breakdown}, preferred_media_type(accept))
+            
+        except Exception as e:
+            log.error("breakdown_generation_error", error=str(e))
+            raise HTTPException(status_code=500, detail=str(e))
+
+    if idempotency_key is None:
+        return await generate()
+    endpoint = "/api/tasks/generate"
+    return await idempotency.run(
+        current_user.id,
+        idempotency_key,
+        endpoint,
+        IdempotencyQueries.fingerprint(endpoint, task_request.model_dump_json().encode()),
+        generate
+    )
+
+
+@router.post("/bulk")
+async def bulk_task_operations(
+    bulk_request: TaskBulkRequest,
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    queries: TaskQueries = Depends(),
+) -> TaskBulkResponse:
+    log = logger.bind(
+        user_id=current_user.id if current_user else None,
+        operation_count=len(bulk_request.operations)
+    )
+    log.info("applying_bulk_task_operations")
+
+    if not current_user:
+        log.warning("unauthorized_bulk_task_operations")
+        raise AuthExceptions.unauthorized()
+
     try:
-        temp_task = Task(
-            title=task_request.title,
-            description=task_request.description,
-            priority=task_request.priority,
-            status=task_request.status,
-            user_id=current_user.id,
-            context=task_request.context
+        result = await queries.bulk_write_tasks(
+            bulk_request.operations,
+            current_user.id,
+            ordered=bulk_request.ordered
         )
-        
-        analyzer = TaskAnalyzer()
-        breakdown = await analyzer.get_task_breakdown(temp_task)
-        
-        if not breakdown:
-            log.error("breakdown_generation_failed")
-            raise HTTPException(status_code=500, detail="Failed to generate task breakdown")
-            
-        log.info("breakdown_generated_successfully")
-        return {"breakdown": breakdown.dict()}
-        
+        log.info("bulk_task_operations_applied")
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
-        log.error("breakdown_generation_error", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        log.error("bulk_task_operations_failed", error=str(e))
+        raise UserExceptions.database_error("applying bulk task operations")
 
 
-@router.get("/all")
+@router.get("/all", response_model=list[TaskResponse])
 async def get_tasks(
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     queries: TaskQueries = Depends(),
-) -> list[TaskResponse]:
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    status_filter: Annotated[Optional[str], Query(alias="status")] = None,
+    priority: Annotated[Optional[int], Query()] = None,
+    energy_level: Annotated[Optional[int], Query()] = None,
+    environment: Annotated[Optional[str], Query()] = None,
+    time_of_day: Annotated[Optional[str], Query()] = None,
+    sort: Annotated[Optional[str], Query()] = None,
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
     log = logger.bind(user_id=current_user.id if current_user else None)
     log.info("retrieving_all_tasks")
 
@@ -136,19 +229,270 @@ async def get_tasks(
         raise AuthExceptions.unauthorized()
 
     try:
-        tasks = await queries.get_tasks(current_user.id)
+        filters = TaskListFilter(
+            status=status_filter,
+            priority=priority,
+            energy_level=energy_level,
+            environment=environment,
+            time_of_day=time_of_day,
+            sort=sort
+        )
+    except ValidationError as e:
+        log.warning("invalid_task_filter", error=str(e))
+        raise UserExceptions.invalid_format("filter", "; ".join(error["msg"] for error in e.errors()))
+
+    try:
+        version = await queries.get_collection_version(current_user.id)
+        variant = "" if filters.is_empty else filters.model_dump_json(exclude_none=True)
+        media_type = preferred_media_type(accept)
+        etag = representation_etag(collection_etag(current_user.id, version, variant), media_type)
+        if etag_matches(if_none_match, etag):
+            log.info("tasks_not_modified", version=version)
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept"}
+            )
+
+        if filters.is_empty:
+            tasks = await queries.get_tasks(current_user.id, version=version)
+        else:
+            tasks = await queries.find_tasks(current_user.id, filters)
         log.info("tasks_retrieved", count=len(tasks))
-        return [TaskResponse.from_mongo(task) for task in tasks]
+        return encode_response(
+            [task_document(task) for task in tasks],
+            media_type,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
     except Exception as e:
         log.error("tasks_retrieval_failed", error=str(e))
         raise UserExceptions.database_error("retrieving tasks")
 
-@router.get("/{task_id}")
+@router.get("/events")
+async def stream_task_events(
+    request: Request,
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    queries: TaskQueries = Depends(),
+) -> StreamingResponse:
+    """Server-sent events for task created, updated and deleted changes"""
+    log = logger.bind(user_id=current_user.id if current_user else None)
+    log.info("opening_task_event_stream")
+
+    if not current_user:
+        log.warning("unauthorized_task_event_stream")
+        raise AuthExceptions.unauthorized()
+
+    events = queries.events
+    if not events.can_subscribe(current_user.id):
+        log.warning("too_many_task_event_streams")
+        raise TaskExceptions.too_many_streams()
+
+    async def event_stream():
+        queue = events.subscribe(current_user.id)
+        if queue is None:
+            return
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            events.unsubscribe(current_user.id, queue)
+            log.info("task_event_stream_closed")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/export")
+async def export_tasks(
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    queries: TaskQueries = Depends(),
+) -> StreamingResponse:
+    """Stream all of the user's tasks as NDJSON"""
+    log = logger.bind(user_id=current_user.id if current_user else None)
+    log.info("exporting_tasks")
+
+    if not current_user:
+        log.warning("unauthorized_task_export")
+        raise AuthExceptions.unauthorized()
+
+    return StreamingResponse(
+        queries.export_tasks(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tasks.ndjson"'}
+    )
+
+@router.post("/import")
+async def import_tasks(
+    request: Request,
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    queries: TaskQueries = Depends(),
+) -> TaskImportResponse:
+    """Import tasks from an NDJSON request body, one task per line"""
+    log = logger.bind(user_id=current_user.id if current_user else None)
+    log.info("importing_tasks")
+
+    if not current_user:
+        log.warning("unauthorized_task_import")
+        raise AuthExceptions.unauthorized()
+
+    try:
+        result = await queries.import_tasks(current_user.id, request.stream())
+        log.info("tasks_imported", imported=result.imported, failed=result.failed)
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("task_import_failed", error=str(e))
+        raise UserExceptions.database_error("importing tasks")
+
+@router.get("/sync", response_model=TaskSyncResponse)
+async def sync_tasks(
+    since: Annotated[int, Query(ge=0)] = 0,
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    queries: TaskQueries = Depends(),
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    log = logger.bind(
+        user_id=current_user.id if current_user else None,
+        since=since
+    )
+    log.info("syncing_tasks")
+
+    if not current_user:
+        log.warning("unauthorized_task_sync")
+        raise AuthExceptions.unauthorized()
+
+    try:
+        upserts, deletions, version = await queries.get_changes_since(current_user.id, since)
+        log.info("tasks_synced", upserts=len(upserts), deletions=len(deletions), sync_token=version)
+        return encode_response({
+            "upserts": [task_document(task) for task in upserts],
+            "deletions": deletions,
+            "sync_token": version,
+        }, preferred_media_type(accept))
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("task_sync_failed", error=str(e))
+        raise UserExceptions.database_error("syncing tasks")
+
+@router.get("/search", response_model=TaskSearchResponse)
+async def search_tasks(
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    page_size: Annotated[int, Query(ge=1, le=100)] = 20,
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    queries: TaskQueries = Depends(),
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    log = logger.bind(
+        user_id=current_user.id if current_user else None,
+        page=page
+    )
+    log.info("searching_tasks")
+
+    if not current_user:
+        log.warning("unauthorized_task_search")
+        raise AuthExceptions.unauthorized()
+
+    try:
+        hits, total = await queries.search_tasks(current_user.id, q, page, page_size)
+        log.info("tasks_searched", count=len(hits), total=total)
+        return encode_response({
+            "results": [{"task": task_document(task), "score": score} for task, score in hits],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        }, preferred_media_type(accept))
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("task_search_failed", error=str(e))
+        raise UserExceptions.database_error("searching tasks")
+
+@router.get("/archive", response_model=TaskArchiveResponse)
+async def get_archived_tasks(
+    page: Annotated[int, Query(ge=1)] = 1,
+    page_size: Annotated[int, Query(ge=1, le=100)] = 20,
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    queries: TaskQueries = Depends(),
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    log = logger.bind(
+        user_id=current_user.id if current_user else None,
+        page=page
+    )
+    log.info("retrieving_archived_tasks")
+
+    if not current_user:
+        log.warning("unauthorized_archive_retrieval")
+        raise AuthExceptions.unauthorized()
+
+    try:
+        tasks, total = await queries.get_archived_tasks(current_user.id, page, page_size)
+        log.info("archived_tasks_retrieved", count=len(tasks), total=total)
+        return encode_response({
+            "results": [archived_task_document(task, archived_at) for task, archived_at in tasks],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        }, preferred_media_type(accept))
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("archive_retrieval_failed", error=str(e))
+        raise UserExceptions.database_error("retrieving archived tasks")
+
+@router.get("/archive/{task_id}", response_model=ArchivedTaskResponse)
+async def get_archived_task(
+    task_id: str,
+    current_user: UserResponse = Depends(try_get_jwt_user_data),
+    queries: TaskQueries = Depends(),
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    log = logger.bind(
+        user_id=current_user.id if current_user else None,
+        task_id=task_id
+    )
+    log.info("retrieving_archived_task")
+
+    if not current_user:
+        log.warning("unauthorized_archive_retrieval")
+        raise AuthExceptions.unauthorized()
+
+    if not ObjectId.is_valid(task_id):
+        log.warning("invalid_task_id_format")
+        raise UserExceptions.invalid_format("task_id", "Invalid task ID format")
+
+    try:
+        task, archived_at = await queries.get_archived_task(task_id, current_user.id)
+        log.info("archived_task_retrieved")
+        return encode_response(
+            archived_task_document(task, archived_at, await queries.load_breakdown(task)),
+            preferred_media_type(accept)
+        )
+    except ValueError:
+        log.warning("archived_task_not_found")
+        raise TaskExceptions.not_found()
+    except Exception as e:
+        log.error("archived_task_retrieval_failed", error=str(e))
+        raise UserExceptions.database_error("retrieving archived task")
+
+@router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     queries: TaskQueries = Depends(),
-) -> TaskResponse:
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
     log = logger.bind(
         user_id=current_user.id if current_user else None,
         task_id=task_id
@@ -166,26 +510,37 @@ async def get_task(
             log.warning("invalid_task_id_format", error=str(e))
             raise UserExceptions.invalid_format("task_id", "Invalid task ID format")
 
-        task = await queries.get_task(task_id, current_user.id)
+        version = await queries.get_collection_version(current_user.id)
+        media_type = preferred_media_type(accept)
+        etag = representation_etag(task_etag(task_id, version), media_type)
+        if etag_matches(if_none_match, etag):
+            log.info("task_not_modified", version=version)
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept"}
+            )
+
+        task = await queries.get_task(task_id, current_user.id, version=version)
         log.info("task_retrieved")
-        return TaskResponse.from_mongo(task)
-    except ValueError as e:
-        if "not found" in str(e).lower():
-            log.warning("task_not_found")
-            raise TaskExceptions.not_found()
-        log.error("task_retrieval_validation_error", error=str(e))
-        raise UserExceptions.invalid_format("task", str(e))
+        return encode_response(
+            task_document(task, await queries.load_breakdown(task)),
+            media_type,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         log.error("task_retrieval_failed", error=str(e))
         raise UserExceptions.database_error("retrieving task")
 
-@router.put("/{task_id}")
+@router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: str,
     task: TaskRequest,
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     queries: TaskQueries = Depends(),
-) -> TaskResponse:
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
     log = logger.bind(
         user_id=current_user.id if current_user else None,
         task_id=task_id,
@@ -200,7 +555,10 @@ async def update_task(
     try:
         updated_task = await queries.update_task(task_id, task, current_user.id)
         log.info("task_updated")
-        return TaskResponse.from_mongo(updated_task)
+        return encode_response(
+            task_document(updated_task, await queries.load_breakdown(updated_task)),
+            preferred_media_type(accept)
+        )
     except ValueError as e:
         if "not found" in str(e).lower():
             log.warning("task_not_found")
@@ -238,12 +596,13 @@ async def delete_task(
         log.error("task_deletion_failed", error=str(e))
         raise UserExceptions.database_error("deleting task")
     
-@router.post("/{task_id}/regenerate-breakdown")
+@router.post("/{task_id}/regenerate-breakdown", response_model=TaskResponse)
 async def regenerate_task_breakdown(
     task_id: str,
     current_user: UserResponse = Depends(try_get_jwt_user_data),
     queries: TaskQueries = Depends(),
-) -> TaskResponse:
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
     """Endpoint to manually regenerate task breakdown"""
     log = logger.bind(
         user_id=current_user.id if current_user else None,
@@ -258,7 +617,10 @@ async def regenerate_task_breakdown(
     try:
         updated_task = await queries.regenerate_breakdown(task_id, current_user.id)
         log.info("breakdown_regenerated")
-        return TaskResponse.from_mongo(updated_task)
+        return encode_response(
+            task_document(updated_task, await queries.load_breakdown(updated_task)),
+            preferred_media_type(accept)
+        )
     except ValueError:
         log.warning("task_not_found")
         raise TaskExceptions.not_found()
@@ -1,8 +1,15 @@
+import asyncio
+import json
+import httpx
 import pytest
 import jwt
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from bson import ObjectId
 from datetime import UTC, datetime, timedelta
+from typing import Optional
+from pydantic import TypeAdapter
+from starlette.datastructures import Address, State
+from pymongo.errors import DuplicateKeyError
 
 from models.users import User
 from models.jwt import JWTPayload, JWTUserData
@@ -10,8 +17,11 @@ from models.tasks import Task
 from models.calendar import GoogleCredentials
 from utils.authentication import ALGORITHM, SIGNING_KEY, hash_password
 from queries.auth import UserQueries
+from utils.login_throttle import login_throttle
 from queries.tasks import TaskQueries
 from queries.calendar import CalendarQueries
+from config.calendar_client import AsyncCalendarClient
+from config.calendar_mgr import credentials_cache, get_google_service
 
 VALID_USER_DATA = {
     "username": "testuser",
@@ -27,6 +37,20 @@ VALID_TASK_DATA = {
     "status": "pending"
 }
 
+BREAKDOWN_DATA = {
+    "steps": [{
+        "description": "Open the document",
+        "time_estimate": 5,
+        "initiation_tip": "Just open it",
+        "completion_signal": "Document is open",
+        "dopamine_hook": "Tick it off"
+    }],
+    "suggested_breaks": [25],
+    "initiation_strategy": "Start small",
+    "energy_level_needed": 2,
+    "materials_needed": ["laptop"],
+    "environment_setup": "Quiet desk"
+}
 
 MOCK_GOOGLE_TOKEN = {
     "access_token": "mock_google_access_token",
@@ -51,6 +75,10 @@ def get_mock_task(user_id: str, overrides=None):
         **data
     )
 
+def parse_response(response, model):
+    """Validate a rendered response body against the route's declared response model"""
+    return TypeAdapter(model).validate_json(response.body)
+
 def get_mock_user(overrides=None):
     """Helper function to create a mock user"""
     data = VALID_USER_DATA.copy()
@@ -80,15 +108,34 @@ def get_mock_calendar_credentials(user_id: str, overrides=None):
     )
 
 
+class MockCursor:
+    """Mock Motor cursor supporting async iteration"""
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
 class MockRequest:
     """Mock FastAPI request object"""
     def __init__(self):
         self.headers = {"origin": "http://localhost:8000"}
+        self.state = State()
+        self.client = Address("127.0.0.1", 50000)
 
 class MockResponse:
     """Mock FastAPI response object"""
     def __init__(self):
         self.cookies = {}
+        self.headers = {}
         self.status_code = 200
     
     def set_cookie(self, key, value, **kwargs):
@@ -105,6 +152,11 @@ async def mock_db():
     mock.save = AsyncMock()
     return mock
 
+@pytest.fixture(autouse=True)
+def reset_login_throttle():
+    """Signin attempts from one test must not count against the next"""
+    login_throttle.backend.clear()
+
 @pytest.fixture
 async def mock_request():
     return MockRequest()
@@ -116,7 +168,9 @@ async def mock_response():
 @pytest.fixture
 def task_queries():
     """Create a TaskQueries instance for testing"""
-    return TaskQueries()
+    task_queries = TaskQueries()
+    task_queries.get_collection_version = AsyncMock(return_value=0)
+    return task_queries
 
 @pytest.fixture
 def queries():
@@ -144,3 +198,115 @@ def create_token(mock_user: User, expired: bool = False) -> str:
         user=JWTUserData(id=str(mock_user.id), username=mock_user.username)
     )
     return jwt.encode(payload.model_dump(), SIGNING_KEY, algorithm=ALGORITHM)
+
+
+class InMemoryIdempotencyCollection:
+    """Just enough of a Motor collection for IdempotencyQueries, enforcing the (user_id, key) unique index"""
+    def __init__(self):
+        self.docs = {}
+
+    def _match(self, doc, query):
+        return all(doc.get(field) == value for field, value in query.items())
+
+    async def insert_one(self, doc):
+        if any(d["user_id"] == doc["user_id"] and d["key"] == doc["key"] for d in self.docs.values()):
+            raise DuplicateKeyError("duplicate key")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def find_one(self, query):
+        return next((dict(d) for d in self.docs.values() if self._match(d, query)), None)
+
+    async def update_one(self, query, update):
+        doc = await self.find_one(query)
+        if doc:
+            self.docs[doc["_id"]].update(update["$set"])
+
+    async def delete_one(self, query):
+        doc = await self.find_one(query)
+        if doc:
+            del self.docs[doc["_id"]]
+
+    async def find_one_and_update(self, query, update):
+        return None
+
+
+class InMemoryLeaseCollection:
+    """Just enough of a Motor collection for acquire_lease, enforcing the unique _id"""
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        await asyncio.sleep(0)
+        doc = self.docs.get(query["_id"])
+        if doc is None or doc["expires_at"] <= query["expires_at"]["$lte"]:
+            self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+        elif upsert:
+            raise DuplicateKeyError("duplicate key")
+
+
+class MockCalendarServer:
+    """
+    Local stand-in for the Google Calendar and OAuth token endpoints, served
+    through httpx.MockTransport. Queued (status, json) responses are returned
+    in order for calendar requests; once the queue is empty an insert echoes
+    the posted event back, as Google does. With commit_failed_inserts an
+    insert answered with a queued error is stored anyway, like a response
+    lost after the write. With valid_token set, calendar requests carrying
+    any other bearer token get a 401.
+    """
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.responses: list[tuple[int, dict]] = []
+        self.events: dict[str, dict] = {}
+        self.commit_failed_inserts = False
+        self.valid_token: Optional[str] = None
+        self.refreshed_token = "refreshed_access_token"
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.host == "oauth2.googleapis.com":
+            return httpx.Response(200, json={"access_token": self.refreshed_token, "expires_in": 3600})
+        if self.valid_token and request.headers["authorization"] != f"Bearer {self.valid_token}":
+            return httpx.Response(401, json={"error": {"code": 401, "message": "Invalid Credentials"}})
+
+        if request.method == "POST":
+            event = json.loads(request.content)
+            if self.responses:
+                status_code, body = self.responses.pop(0)
+                if status_code < 300 or self.commit_failed_inserts:
+                    self.events[event["id"]] = event
+                return httpx.Response(status_code, json=body)
+            if event["id"] in self.events:
+                return httpx.Response(409, json={"error": {"code": 409, "message": "The requested identifier already exists."}})
+            self.events[event["id"]] = event
+            return httpx.Response(200, json={**event, "htmlLink": f"https://calendar.google.com/event?eid={event['id']}"})
+
+        event_id = request.url.path.rsplit("/", 1)[-1]
+        if event_id in self.events:
+            event = self.events[event_id]
+            return httpx.Response(200, json={**event, "htmlLink": f"https://calendar.google.com/event?eid={event_id}"})
+        return httpx.Response(404, json={"error": {"code": 404, "message": "Not Found"}})
+
+    def calendar_requests(self) -> list[httpx.Request]:
+        return [request for request in self.requests if request.url.host == "www.googleapis.com"]
+
+
+@pytest.fixture
+def mock_calendar_server():
+    """Route calendar API calls to a MockCalendarServer, with retries that do not sleep"""
+    server = MockCalendarServer()
+    client = AsyncCalendarClient(transport=httpx.MockTransport(server.handle), backoff_seconds=0)
+    with patch("queries.calendar.calendar_client", client):
+        yield server
+
+
+@pytest.fixture
+def connected_calendar_user():
+    """A user whose decrypted calendar credentials are already cached"""
+    user = get_mock_user()
+    credentials_cache.set(str(user.id), get_google_service().create_credentials(
+        get_google_service().encrypt_token("user_access_token"),
+        get_google_service().encrypt_token("user_refresh_token")
+    ))
+    yield user
+    credentials_cache.invalidate(str(user.id))
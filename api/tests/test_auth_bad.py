@@ -1,11 +1,16 @@
+import asyncio
+import threading
+import bcrypt
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import HTTPException, status
 from pymongo.errors import DuplicateKeyError
 
 from models.users import UserRequest, SignInRequest
 from routes.auth import signin, create_user
 from queries.auth import UserQueries
+from utils.password_hashing import PasswordHashingPool, password_pool
+from utils.exceptions import UserExceptions
 from conftest import get_mock_user, VALID_USER_DATA
 
 class TestAuthenticationBadPath:
@@ -42,7 +47,7 @@ class TestAuthenticationBadPath:
         mock_response,
         queries
     ):
-        with patch.object(UserQueries, 'get_by_username', new_callable=AsyncMock) as mock_get:
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = None
             
             signin_request = SignInRequest(
@@ -71,7 +76,7 @@ class TestAuthenticationBadPath:
     ):
         mock_user = get_mock_user()
         
-        with patch.object(UserQueries, 'get_by_username', new_callable=AsyncMock) as mock_get:
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_user
             
             signin_request = SignInRequest(
@@ -113,4 +118,127 @@ class TestAuthenticationBadPath:
             
             assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
             assert exc_info.value.detail == "User with this email already exists"
-            mock_create.assert_called_once()
\ No newline at end of file
+            mock_create.assert_called_once()
+    @pytest.mark.asyncio
+    async def test_signin_shed_when_hashing_pool_saturated(
+        self,
+        mock_request,
+        mock_response,
+        queries
+    ):
+        mock_user = get_mock_user()
+
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_get, \
+             patch.object(password_pool, '_pending', password_pool.max_workers + password_pool.max_queue):
+            mock_get.return_value = mock_user
+
+            signin_request = SignInRequest(
+                username=VALID_USER_DATA["username"],
+                password=VALID_USER_DATA["password"]
+            )
+
+            with pytest.raises(HTTPException) as exc_info:
+                await signin(
+                    user_req=signin_request,
+                    request=mock_request,
+                    response=mock_response,
+                    queries=queries
+                )
+
+            assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert exc_info.value.headers["Retry-After"] == str(password_pool.retry_after)
+            assert "fast_api_token" not in mock_response.cookies
+
+    @pytest.mark.asyncio
+    async def test_hashing_pool_sheds_beyond_queue_depth(self):
+        pool = PasswordHashingPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        first = asyncio.create_task(pool.run(release.wait))
+        second = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(release.wait)
+        assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+        release.set()
+        assert await asyncio.gather(first, second) == [True, True]
+        assert pool.stats()["shed"] == 1
+        assert pool.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_create_user_maps_duplicate_key_pattern(self, queries):
+        collection = MagicMock()
+        collection.insert_one = AsyncMock(side_effect=DuplicateKeyError(
+            "E11000 duplicate key error",
+            code=11000,
+            details={"keyPattern": {"email": 1}, "keyValue": {"email": VALID_USER_DATA["email"]}}
+        ))
+
+        with patch("queries.auth.engine.get_collection", return_value=collection):
+            with pytest.raises(HTTPException) as exc_info:
+                await queries.create_user(UserRequest(**VALID_USER_DATA))
+
+        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+        assert exc_info.value.detail == "User with this email already exists"
+        collection.insert_one.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_signups_same_username(self, queries):
+        inserted = []
+
+        async def insert_one(doc):
+            await asyncio.sleep(0)
+            if any(existing["username"] == doc["username"] for existing in inserted):
+                raise DuplicateKeyError(
+                    "E11000 duplicate key error",
+                    code=11000,
+                    details={"keyPattern": {"username": 1}}
+                )
+            inserted.append(doc)
+
+        collection = MagicMock()
+        collection.insert_one = insert_one
+        user_request = UserRequest(**VALID_USER_DATA)
+
+        with patch("queries.auth.engine.get_collection", return_value=collection):
+            results = await asyncio.gather(
+                queries.create_user(user_request),
+                queries.create_user(user_request),
+                return_exceptions=True
+            )
+
+        created = [result for result in results if not isinstance(result, Exception)]
+        rejected = [result for result in results if isinstance(result, HTTPException)]
+        assert len(created) == 1 and len(rejected) == 1
+        assert rejected[0].detail == "User with this username already exists"
+
+    @pytest.mark.asyncio
+    async def test_signin_succeeds_when_rehash_fails(
+        self,
+        mock_request,
+        mock_response,
+        queries
+    ):
+        mock_user = get_mock_user()
+        mock_user.password = bcrypt.hashpw(VALID_USER_DATA["password"].encode(), bcrypt.gensalt(rounds=4)).decode()
+
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_find, \
+             patch.object(UserQueries, 'replace_password_hash', new_callable=AsyncMock) as mock_replace:
+            mock_find.return_value = mock_user
+            mock_replace.side_effect = UserExceptions.database_error("updating password")
+
+            signin_request = SignInRequest(
+                username=VALID_USER_DATA["username"],
+                password=VALID_USER_DATA["password"]
+            )
+            result = await signin(
+                user_req=signin_request,
+                request=mock_request,
+                response=mock_response,
+                queries=queries
+            )
+
+        assert result.username == VALID_USER_DATA["username"]
+        assert "fast_api_token" in mock_response.cookies
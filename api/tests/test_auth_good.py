@@ -1,11 +1,19 @@
+import asyncio
+import bcrypt
 import pytest
 from unittest.mock import AsyncMock, patch
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from structlog.testing import capture_logs
 
 from models.users import PasswordChangeRequest, UserRequest, SignInRequest, UserResponse
 from routes.auth import change_password, signin, create_user, signout
 from queries.auth import UserQueries
-from conftest import get_mock_user, VALID_USER_DATA
+from middleware.logging import logging_middleware
+from utils.authentication import decode_jwt, password_needs_rehash, try_get_jwt_user_data, verify_password
+from utils.login_throttle import LoginThrottle, MemoryThrottleBackend
+from utils.stats import log_stats
+from conftest import get_mock_user, create_token, VALID_USER_DATA
 
 class TestAuthenticationGoodPath:
     """Test suite for successful authentication flows."""
@@ -43,7 +51,7 @@ class TestAuthenticationGoodPath:
     ):
         mock_user = get_mock_user()
         
-        with patch.object(UserQueries, 'get_by_username', new_callable=AsyncMock) as mock_get:
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_user
             
             signin_request = SignInRequest(
@@ -70,7 +78,7 @@ class TestAuthenticationGoodPath:
     ):
         mock_user = get_mock_user()
         
-        with patch.object(UserQueries, 'get_by_username', new_callable=AsyncMock) as mock_get:
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_user
             
             signin_request = SignInRequest(
@@ -157,4 +165,129 @@ class TestAuthenticationGoodPath:
             request=mock_request
         )
         
-        assert result["message"] == "Signed out successfully"
\ No newline at end of file
+        assert result["message"] == "Signed out successfully"
+    @pytest.mark.asyncio
+    async def test_token_decoded_once_per_request(self):
+        mock_user = get_mock_user()
+        token = create_token(mock_user)
+        request = Request({
+            "type": "http",
+            "method": "GET",
+            "path": "/api/auth/authenticate",
+            "headers": [(b"cookie", f"fast_api_token={token}".encode())],
+        })
+
+        async def call_next(request):
+            user = await try_get_jwt_user_data(request, request.cookies["fast_api_token"])
+            assert user.id == str(mock_user.id)
+            return PlainTextResponse("ok")
+
+        with patch("utils.authentication.decode_jwt", wraps=decode_jwt) as mock_decode:
+            response = await logging_middleware(request, call_next)
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_decode.assert_called_once_with(token)
+
+    @pytest.mark.asyncio
+    async def test_verified_token_served_from_cache(self):
+        mock_user = get_mock_user()
+        token = create_token(mock_user)
+        first = await decode_jwt(token)
+
+        with patch("utils.authentication.jwt.decode") as mock_decode:
+            second = await decode_jwt(token)
+
+        mock_decode.assert_not_called()
+        assert second == first
+        assert second.user.id == str(mock_user.id)
+
+    @pytest.mark.asyncio
+    async def test_successful_signin_clears_username_window(self):
+        throttle = LoginThrottle(username_limit=2, ip_limit=100, window_seconds=60)
+        await throttle.check("testuser", "127.0.0.1")
+        await throttle.check("testuser", "127.0.0.1")
+        await throttle.succeeded("testuser")
+
+        await throttle.check("testuser", "127.0.0.1")
+        assert throttle.stats()["allowed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_throttle_stats_logged_periodically(self):
+        throttle = LoginThrottle(username_limit=2, ip_limit=100, window_seconds=60)
+        await throttle.check("testuser", "127.0.0.1")
+
+        with capture_logs() as logs:
+            reporter = asyncio.create_task(log_stats({"login_throttle": throttle.stats}, 0.01))
+            await asyncio.sleep(0.03)
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+
+        assert logs[0] == {
+            "event": "component_stats",
+            "log_level": "info",
+            "component": "login_throttle",
+            **throttle.stats(),
+        }
+
+    @pytest.mark.asyncio
+    async def test_throttle_window_slides(self):
+        backend = MemoryThrottleBackend()
+        assert await backend.hit("user:testuser", 2, 60, now=1000.0) == 0
+        assert await backend.hit("user:testuser", 2, 60, now=1030.0) == 0
+        assert await backend.hit("user:testuser", 2, 60, now=1050.0) == 10.0
+        assert await backend.hit("user:testuser", 2, 60, now=1061.0) == 0
+
+    @pytest.mark.asyncio
+    async def test_signin_rehashes_password_at_target_cost(
+        self,
+        mock_request,
+        mock_response,
+        queries
+    ):
+        mock_user = get_mock_user()
+        mock_user.password = bcrypt.hashpw(VALID_USER_DATA["password"].encode(), bcrypt.gensalt(rounds=4)).decode()
+
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_find, \
+             patch.object(UserQueries, 'replace_password_hash', new_callable=AsyncMock) as mock_replace:
+            mock_find.return_value = mock_user
+            mock_replace.return_value = True
+
+            signin_request = SignInRequest(
+                username=VALID_USER_DATA["username"],
+                password=VALID_USER_DATA["password"]
+            )
+            result = await signin(
+                user_req=signin_request,
+                request=mock_request,
+                response=mock_response,
+                queries=queries
+            )
+
+        assert result.username == VALID_USER_DATA["username"]
+        new_hash = mock_replace.await_args.args[1]
+        assert not password_needs_rehash(new_hash)
+        assert verify_password(VALID_USER_DATA["password"], new_hash)
+
+    @pytest.mark.asyncio
+    async def test_signin_at_target_cost_skips_rehash(
+        self,
+        mock_request,
+        mock_response,
+        queries
+    ):
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_find, \
+             patch.object(UserQueries, 'replace_password_hash', new_callable=AsyncMock) as mock_replace:
+            mock_find.return_value = get_mock_user()
+
+            signin_request = SignInRequest(
+                username=VALID_USER_DATA["username"],
+                password=VALID_USER_DATA["password"]
+            )
+            await signin(
+                user_req=signin_request,
+                request=mock_request,
+                response=mock_response,
+                queries=queries
+            )
+
+        mock_replace.assert_not_called()
@@ -1,3 +1,4 @@
+import time
 import pytest
 from pydantic import ValidationError
 from unittest.mock import AsyncMock, patch
@@ -5,26 +6,39 @@ from fastapi import HTTPException, status
 
 from models.users import UserRequest, SignInRequest
 from routes.auth import authenticate, signin, create_user
-from utils.authentication import try_get_jwt_user_data
+from models.jwt import JWTPayload, JWTUserData
+from utils.authentication import decode_jwt, try_get_jwt_user_data
+from utils.token_cache import VerifiedTokenCache, token_cache
 from queries.auth import UserQueries
+from utils.login_throttle import LoginThrottle, login_throttle
 from conftest import VALID_USER_DATA, get_mock_user, create_token
 
 class TestAuthenticationUglyPath:
     """Test suite for security edge cases and potential attack vectors."""
 
     @pytest.mark.asyncio
-    async def test_expired_jwt_token(self):
+    async def test_expired_jwt_token(self, mock_request):
         mock_user = get_mock_user()
         token = create_token(mock_user, expired=True)
         
-        user_data = await try_get_jwt_user_data(token)
+        user_data = await try_get_jwt_user_data(mock_request, token)
         assert user_data is None
 
     @pytest.mark.asyncio
-    async def test_malformed_jwt_token(self):
-        user_data = await try_get_jwt_user_data("malformed.jwt.token")
+    async def test_malformed_jwt_token(self, mock_request):
+        user_data = await try_get_jwt_user_data(mock_request, "malformed.jwt.token")
         assert user_data is None
 
+    @pytest.mark.asyncio
+    async def test_request_state_not_reused_for_other_token(self, mock_request):
+        mock_user = get_mock_user()
+        other_user = get_mock_user({"username": "otheruser"})
+
+        assert (await try_get_jwt_user_data(mock_request, create_token(mock_user))).username == mock_user.username
+        user_data = await try_get_jwt_user_data(mock_request, create_token(other_user))
+        assert user_data.username == "otheruser"
+        assert await try_get_jwt_user_data(mock_request, "malformed.jwt.token") is None
+
     @pytest.mark.asyncio
     async def test_sql_injection_attempt(
         self,
@@ -32,7 +46,7 @@ class TestAuthenticationUglyPath:
         mock_response,
         queries
     ):
-        with patch.object(UserQueries, 'get_by_username', new_callable=AsyncMock) as mock_get:
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = None
             
             signin_request = SignInRequest(
@@ -109,7 +123,7 @@ class TestAuthenticationUglyPath:
         mock_response,
         queries
     ):
-        with patch.object(UserQueries, 'get_by_username', new_callable=AsyncMock) as mock_get:
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = None
             
             signin_request = SignInRequest(
@@ -157,4 +171,83 @@ class TestAuthenticationUglyPath:
                 queries=queries
             )
         
-        assert "password" in str(exc_info.value)
\ No newline at end of file
+        assert "password" in str(exc_info.value)
+    @pytest.mark.asyncio
+    async def test_tampered_token_misses_verified_cache(self):
+        mock_user = get_mock_user()
+        token = create_token(mock_user)
+        assert await decode_jwt(token) is not None
+
+        header, payload, signature = token.split(".")
+        forged = ".".join([header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")])
+        assert await decode_jwt(forged) is None
+        assert token_cache.get(forged) is None
+
+    @pytest.mark.asyncio
+    async def test_verified_cache_entry_expires_with_token(self):
+        cache = VerifiedTokenCache()
+        payload = JWTPayload(
+            exp=int(time.time()) - 1,
+            sub="testuser",
+            user=JWTUserData(id="1", username="testuser")
+        )
+        cache.put("token", payload)
+
+        assert cache.get("token") is None
+        assert cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_signin_brute_force_throttled_before_lookup(
+        self,
+        mock_request,
+        mock_response,
+        queries
+    ):
+        signin_request = SignInRequest(
+            username=VALID_USER_DATA["username"],
+            password="WrongPass123!"
+        )
+
+        with patch.object(UserQueries, 'find_by_username', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = None
+            for _ in range(login_throttle.username_limit):
+                with pytest.raises(HTTPException) as exc_info:
+                    await signin(user_req=signin_request, request=mock_request, response=mock_response, queries=queries)
+                assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+            with pytest.raises(HTTPException) as exc_info:
+                await signin(user_req=signin_request, request=mock_request, response=mock_response, queries=queries)
+
+        assert exc_info.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(exc_info.value.headers["Retry-After"]) > 0
+        assert mock_get.await_count == login_throttle.username_limit
+
+    @pytest.mark.asyncio
+    async def test_ip_throttle_spans_usernames(self):
+        throttle = LoginThrottle(username_limit=10, ip_limit=3, window_seconds=60)
+        for index in range(3):
+            await throttle.check(f"user{index}", "203.0.113.7")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await throttle.check("another", "203.0.113.7")
+        assert exc_info.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        await throttle.check("another", "198.51.100.1")
+        assert throttle.stats()["rejected_ip"] == 1
+
+    @pytest.mark.asyncio
+    async def test_signin_unknown_username_does_not_reveal_existence(
+        self,
+        mock_request,
+        mock_response,
+        queries
+    ):
+        signin_request = SignInRequest(username="nosuchuser", password="WrongPass123!")
+
+        with patch("queries.auth.engine.find_one", new_callable=AsyncMock) as mock_find:
+            mock_find.return_value = None
+            with pytest.raises(HTTPException) as exc_info:
+                await signin(user_req=signin_request, request=mock_request, response=mock_response, queries=queries)
+
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert exc_info.value.detail == "Incorrect username or password"
@@ -2,9 +2,12 @@ import pytest
 from unittest.mock import AsyncMock, patch
 from fastapi import HTTPException
 
-from models.calendar import CalendarEventRequest
-from routes.calendar import handle_google_auth, add_task_to_calendar
-from conftest import MOCK_GOOGLE_TOKEN, VALID_CALENDAR_EVENT_DATA
+from models.calendar import CalendarEventRequest, CalendarBatchRequest
+from models.jwt import JWTUserData
+from routes.calendar import handle_google_auth, add_task_to_calendar, add_tasks_to_calendar
+from queries.calendar import CalendarQueries
+from queries.tasks import TaskQueries
+from conftest import MOCK_GOOGLE_TOKEN, VALID_CALENDAR_EVENT_DATA, get_mock_task, get_mock_user
 
 class TestCalendarBadPath:
     """Test suite for calendar operation failure scenarios."""
@@ -46,4 +49,92 @@ class TestCalendarBadPath:
                 )
 
             assert exc_info.value.status_code == 404
-            assert "Task not found" in exc_info.value.detail
\ No newline at end of file
+            assert "Task not found" in exc_info.value.detail
+    @pytest.mark.asyncio
+    async def test_add_event_retried_after_insert_went_through(
+        self,
+        connected_calendar_user,
+        calendar_queries,
+        mock_calendar_server
+    ):
+        user = connected_calendar_user
+        mock_calendar_server.responses = [(500, {"error": {"code": 500, "message": "Backend Error"}})]
+        mock_calendar_server.commit_failed_inserts = True
+
+        result = await calendar_queries.add_event_to_calendar(
+            str(user.id),
+            get_mock_task(str(user.id)),
+            CalendarEventRequest(**VALID_CALENDAR_EVENT_DATA)
+        )
+
+        methods = [request.method for request in mock_calendar_server.calendar_requests()]
+        assert methods == ["POST", "POST", "GET"]
+        assert list(mock_calendar_server.events) == [result.event_id]
+
+    @pytest.mark.asyncio
+    async def test_add_event_client_error_not_retried(
+        self,
+        connected_calendar_user,
+        calendar_queries,
+        mock_calendar_server
+    ):
+        user = connected_calendar_user
+        mock_calendar_server.responses = [(400, {"error": {"code": 400, "message": "Invalid start time."}})]
+
+        with pytest.raises(HTTPException) as exc_info:
+            await calendar_queries.add_event_to_calendar(
+                str(user.id),
+                get_mock_task(str(user.id)),
+                CalendarEventRequest(**VALID_CALENDAR_EVENT_DATA)
+            )
+
+        assert exc_info.value.status_code == 500
+        assert "Invalid start time." in exc_info.value.detail
+        assert len(mock_calendar_server.calendar_requests()) == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_failed_items(
+        self,
+        connected_calendar_user,
+        calendar_queries,
+        mock_calendar_server
+    ):
+        user = connected_calendar_user
+        tasks = [get_mock_task(str(user.id)) for _ in range(2)]
+        mock_calendar_server.responses = [(400, {"error": {"code": 400, "message": "Invalid start time."}})]
+
+        results = await calendar_queries.add_events_to_calendar(
+            str(user.id),
+            {str(task.id): task for task in tasks},
+            [CalendarEventRequest(**{**VALID_CALENDAR_EVENT_DATA, "task_id": str(task.id)}) for task in tasks]
+        )
+
+        assert sorted(result.status for result in results) == ["failed", "ok"]
+        failed = next(result for result in results if result.status == "failed")
+        assert failed.detail == "Invalid start time."
+        assert failed.event_id is None
+
+    @pytest.mark.asyncio
+    async def test_batch_calendar_not_connected(
+        self,
+        calendar_queries,
+        task_queries
+    ):
+        user = get_mock_user()
+        current_user = JWTUserData(id=str(user.id), username=user.username)
+        batch_request = CalendarBatchRequest(events=[VALID_CALENDAR_EVENT_DATA])
+
+        with patch.object(TaskQueries, 'get_tasks_by_ids', new_callable=AsyncMock) as mock_get_tasks, \
+             patch.object(CalendarQueries, 'get_google_credentials', new_callable=AsyncMock) as mock_get_credentials:
+            mock_get_tasks.return_value = {}
+            mock_get_credentials.return_value = None
+
+            with pytest.raises(HTTPException) as exc_info:
+                await add_tasks_to_calendar(
+                    batch_request=batch_request,
+                    current_user=current_user,
+                    calendar_queries=calendar_queries,
+                    task_queries=task_queries
+                )
+
+        assert exc_info.value.status_code == 401
@@ -1,10 +1,18 @@
+import asyncio
+import httpx
+import json
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock, ANY, call
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, patch, MagicMock, ANY
+from google.oauth2.credentials import Credentials
 
-from models.calendar import CalendarEventRequest, CalendarEventResponse
-from routes.calendar import handle_google_auth, add_task_to_calendar
+from models.calendar import CalendarEventRequest, CalendarEventResponse, CalendarBatchRequest
+from models.jwt import JWTUserData
+from routes.calendar import handle_google_auth, add_task_to_calendar, add_tasks_to_calendar
 from queries.calendar import CalendarQueries
-from config.calendar_mgr import GoogleService
+from queries.tasks import TaskQueries
+from config.calendar_client import AsyncCalendarClient
+from config.calendar_mgr import calendar_discovery_document, calendar_events, credentials_cache, get_google_service
 from conftest import MOCK_GOOGLE_TOKEN, VALID_CALENDAR_EVENT_DATA, get_mock_task
 
 class TestCalendarGoodPath:
@@ -18,32 +26,67 @@ class TestCalendarGoodPath:
     ):
         user, _ = mock_user_with_calendar
 
-        mock_service = MagicMock(spec=GoogleService)
-        mock_service.encrypt_token = MagicMock(side_effect=lambda x: f"encrypted_{x}")
-        
-        with patch('routes.calendar.GoogleService', return_value=mock_service) as MockService:
-            with patch.object(CalendarQueries, 'save_google_credentials', new_callable=AsyncMock) as mock_save:
-                result = await handle_google_auth(
-                    google_token=MOCK_GOOGLE_TOKEN,
-                    current_user=user,
-                    queries=calendar_queries
-                )
-                
-                assert result["message"] == "Google Calendar connected successfully"
-                
-                expected_calls = [
-                    call(MOCK_GOOGLE_TOKEN["access_token"]),
-                    call(MOCK_GOOGLE_TOKEN["refresh_token"])
-                ]
-                mock_service.encrypt_token.assert_has_calls(expected_calls, any_order=True)
-                assert mock_service.encrypt_token.call_count == 2
-
-                mock_save.assert_called_once_with(
-                    user_id=user.id,
-                    access_token=f"encrypted_{MOCK_GOOGLE_TOKEN['access_token']}",
-                    refresh_token=f"encrypted_{MOCK_GOOGLE_TOKEN['refresh_token']}",
-                    expiry=ANY
-                )
+        with patch.object(CalendarQueries, 'save_google_credentials', new_callable=AsyncMock) as mock_save:
+            result = await handle_google_auth(
+                google_token=MOCK_GOOGLE_TOKEN,
+                current_user=user,
+                queries=calendar_queries
+            )
+            
+            assert result["message"] == "Google Calendar connected successfully"
+
+            mock_save.assert_called_once_with(
+                user_id=user.id,
+                access_token=MOCK_GOOGLE_TOKEN["access_token"],
+                refresh_token=MOCK_GOOGLE_TOKEN["refresh_token"],
+                expiry=ANY
+            )
+
+    @pytest.mark.asyncio
+    async def test_save_credentials_encrypts_once_and_invalidates_cache(
+        self,
+        mock_user_with_calendar,
+        calendar_queries
+    ):
+        user, _ = mock_user_with_calendar
+        collection = MagicMock()
+        collection.update_one = AsyncMock()
+        credentials_cache.set(user.id, MagicMock())
+
+        with patch('queries.calendar.engine.get_collection', return_value=collection):
+            await calendar_queries.save_google_credentials(
+                user_id=user.id,
+                access_token=MOCK_GOOGLE_TOKEN["access_token"],
+                refresh_token=MOCK_GOOGLE_TOKEN["refresh_token"],
+                expiry=datetime.now(UTC)
+            )
+
+        stored = collection.update_one.await_args.args[1]["$set"]
+        service = get_google_service()
+        assert service.decrypt_token(stored["encrypted_access_token"]) == MOCK_GOOGLE_TOKEN["access_token"]
+        assert service.decrypt_token(stored["encrypted_refresh_token"]) == MOCK_GOOGLE_TOKEN["refresh_token"]
+        assert credentials_cache.get(user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_decrypted_credentials_cached_per_user(
+        self,
+        mock_user_with_calendar,
+        calendar_queries
+    ):
+        user, credentials = mock_user_with_calendar
+        service = get_google_service()
+        credentials.encrypted_access_token = service.encrypt_token("access")
+        credentials.encrypted_refresh_token = service.encrypt_token("refresh")
+
+        with patch.object(CalendarQueries, 'get_google_credentials', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = credentials
+            first = await calendar_queries.get_user_credentials(user.id)
+            second = await CalendarQueries().get_user_credentials(user.id)
+
+        assert first is second
+        assert first.token == "access" and first.refresh_token == "refresh"
+        mock_get.assert_awaited_once_with(user.id)
+        assert CalendarQueries().google_service is service
 
     @pytest.mark.asyncio
     async def test_successful_add_event(
@@ -86,4 +129,195 @@ class TestCalendarGoodPath:
                     user.id,
                     mock_task,
                     event_request
-                )
\ No newline at end of file
+                )
+    @pytest.mark.asyncio
+    async def test_calendar_request_builder_shared(self):
+        assert calendar_events() is calendar_events()
+
+        request = calendar_events().insert(calendarId="primary", body={"summary": "Task"})
+        assert request.uri.startswith("https://www.googleapis.com/calendar/v3/calendars/primary/events")
+        assert request.method == "POST"
+        assert "authorization" not in request.headers
+
+    @pytest.mark.asyncio
+    async def test_discovery_document_loaded_once(self):
+        calendar_discovery_document()
+        misses = calendar_discovery_document.cache_info().misses
+
+        get_google_service().create_calendar_service(Credentials(token="a"))
+        get_google_service().create_calendar_service(Credentials(token="b"))
+
+        assert calendar_discovery_document.cache_info().misses == misses
+        assert calendar_discovery_document()["name"] == "calendar"
+
+    @pytest.mark.asyncio
+    async def test_add_event_through_async_client(
+        self,
+        connected_calendar_user,
+        calendar_queries,
+        mock_calendar_server
+    ):
+        user = connected_calendar_user
+        mock_task = get_mock_task(str(user.id))
+        event_request = CalendarEventRequest(**VALID_CALENDAR_EVENT_DATA)
+
+        result = await calendar_queries.add_event_to_calendar(str(user.id), mock_task, event_request)
+
+        [request] = mock_calendar_server.calendar_requests()
+        sent = json.loads(request.content)
+        assert request.headers["authorization"] == "Bearer user_access_token"
+        assert sent["summary"] == mock_task.title
+        assert sent["reminders"]["overrides"][0]["minutes"] == event_request.notification_minutes
+        assert result.event_id == sent["id"]
+        assert result.task_id == str(mock_task.id)
+        assert result.calendar_link.endswith(sent["id"])
+
+    @pytest.mark.asyncio
+    async def test_add_event_retries_transient_errors(
+        self,
+        connected_calendar_user,
+        calendar_queries,
+        mock_calendar_server
+    ):
+        user = connected_calendar_user
+        mock_calendar_server.responses = [
+            (503, {"error": {"code": 503, "message": "Backend Error"}}),
+            (403, {"error": {"code": 403, "message": "Rate Limit Exceeded", "errors": [{"reason": "rateLimitExceeded"}]}}),
+        ]
+
+        result = await calendar_queries.add_event_to_calendar(
+            str(user.id),
+            get_mock_task(str(user.id)),
+            CalendarEventRequest(**VALID_CALENDAR_EVENT_DATA)
+        )
+
+        requests = mock_calendar_server.calendar_requests()
+        assert len(requests) == 3
+        assert len({json.loads(request.content)["id"] for request in requests}) == 1
+        assert result.event_id == json.loads(requests[0].content)["id"]
+
+    @pytest.mark.asyncio
+    async def test_add_event_refreshes_expired_token(
+        self,
+        connected_calendar_user,
+        calendar_queries,
+        mock_calendar_server
+    ):
+        user = connected_calendar_user
+        mock_calendar_server.valid_token = mock_calendar_server.refreshed_token
+
+        await calendar_queries.add_event_to_calendar(
+            str(user.id),
+            get_mock_task(str(user.id)),
+            CalendarEventRequest(**VALID_CALENDAR_EVENT_DATA)
+        )
+
+        first, second = mock_calendar_server.calendar_requests()
+        assert first.headers["authorization"] == "Bearer user_access_token"
+        assert second.headers["authorization"] == f"Bearer {mock_calendar_server.refreshed_token}"
+        assert credentials_cache.get(str(user.id)).token == mock_calendar_server.refreshed_token
+
+    @pytest.mark.asyncio
+    async def test_batch_add_events(
+        self,
+        connected_calendar_user,
+        calendar_queries,
+        task_queries,
+        mock_calendar_server
+    ):
+        user = connected_calendar_user
+        current_user = JWTUserData(id=str(user.id), username=user.username)
+        tasks = [get_mock_task(str(user.id)), get_mock_task(str(user.id), {"title": "Second task"})]
+        missing_task_id = "507f1f77bcf86cd799439099"
+        batch_request = CalendarBatchRequest(events=[
+            {**VALID_CALENDAR_EVENT_DATA, "task_id": str(tasks[0].id)},
+            {**VALID_CALENDAR_EVENT_DATA, "task_id": missing_task_id},
+            {**VALID_CALENDAR_EVENT_DATA, "task_id": str(tasks[1].id)},
+        ])
+
+        with patch.object(TaskQueries, 'get_tasks_by_ids', new_callable=AsyncMock) as mock_get_tasks:
+            mock_get_tasks.return_value = {str(task.id): task for task in tasks}
+            result = await add_tasks_to_calendar(
+                batch_request=batch_request,
+                current_user=current_user,
+                calendar_queries=calendar_queries,
+                task_queries=task_queries
+            )
+
+        mock_get_tasks.assert_awaited_once_with(
+            [str(tasks[0].id), missing_task_id, str(tasks[1].id)],
+            current_user.id
+        )
+        assert result.created == 2
+        assert [item.status for item in result.results] == ["ok", "not_found", "ok"]
+        assert [item.index for item in result.results] == [0, 1, 2]
+        assert result.results[2].event_id in mock_calendar_server.events
+        assert mock_calendar_server.events[result.results[2].event_id]["summary"] == "Second task"
+        assert len(mock_calendar_server.calendar_requests()) == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_inserts_bounded_concurrency(
+        self,
+        connected_calendar_user,
+        calendar_queries
+    ):
+        user = connected_calendar_user
+        tasks = [get_mock_task(str(user.id)) for _ in range(6)]
+        in_flight = 0
+        peak = 0
+
+        async def handle(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json=json.loads(request.content))
+
+        client = AsyncCalendarClient(transport=httpx.MockTransport(handle))
+        with patch("queries.calendar.calendar_client", client), \
+             patch("queries.calendar.CALENDAR_BATCH_CONCURRENCY", 2):
+            results = await calendar_queries.add_events_to_calendar(
+                str(user.id),
+                {str(task.id): task for task in tasks},
+                [CalendarEventRequest(**{**VALID_CALENDAR_EVENT_DATA, "task_id": str(task.id)}) for task in tasks]
+            )
+
+        assert [result.status for result in results] == ["ok"] * 6
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_by_ids_single_query(self, task_queries):
+        user_id = "507f1f77bcf86cd799439012"
+        tasks = [get_mock_task(user_id) for _ in range(3)]
+
+        with patch("queries.tasks.engine.find", new_callable=AsyncMock) as mock_find:
+            mock_find.return_value = tasks
+            found = await task_queries.get_tasks_by_ids([str(task.id) for task in tasks] + [str(tasks[0].id)], user_id)
+
+        mock_find.assert_awaited_once()
+        query = mock_find.await_args.args[1]
+        assert query["user_id"] == user_id
+        assert sorted(query["_id"]["$in"]) == sorted(task.id for task in tasks)
+        assert set(found) == {str(task.id) for task in tasks}
+
+    @pytest.mark.asyncio
+    async def test_batch_refreshes_expired_token_once(
+        self,
+        connected_calendar_user,
+        calendar_queries,
+        mock_calendar_server
+    ):
+        user = connected_calendar_user
+        tasks = [get_mock_task(str(user.id)) for _ in range(3)]
+        mock_calendar_server.valid_token = mock_calendar_server.refreshed_token
+
+        results = await calendar_queries.add_events_to_calendar(
+            str(user.id),
+            {str(task.id): task for task in tasks},
+            [CalendarEventRequest(**{**VALID_CALENDAR_EVENT_DATA, "task_id": str(task.id)}) for task in tasks]
+        )
+
+        assert [result.status for result in results] == ["ok"] * 3
+        token_requests = [r for r in mock_calendar_server.requests if r.url.host == "oauth2.googleapis.com"]
+        assert len(token_requests) == 1
@@ -2,7 +2,7 @@ import pytest
 from datetime import timedelta
 from pydantic import ValidationError
 
-from models.calendar import CalendarEventRequest
+from models.calendar import CalendarEventRequest, CalendarBatchRequest
 from tests.conftest import VALID_CALENDAR_EVENT_DATA
 
 class TestCalendarSecurity:
@@ -39,4 +39,19 @@ class TestCalendarSecurity:
             CalendarEventRequest(**invalid_event_data)
         
         error_msg = str(exc_info.value)
-        assert "end_time must be after start_time" in error_msg
\ No newline at end of file
+        assert "end_time must be after start_time" in error_msg
+    @pytest.mark.asyncio
+    async def test_batch_size_limited(self):
+        with pytest.raises(ValidationError):
+            CalendarBatchRequest(events=[VALID_CALENDAR_EVENT_DATA] * 51)
+        with pytest.raises(ValidationError):
+            CalendarBatchRequest(events=[])
+
+    @pytest.mark.asyncio
+    async def test_batch_validates_each_event(self):
+        invalid_event_data = VALID_CALENDAR_EVENT_DATA.copy()
+        invalid_event_data["task_id"] = "x" * 24
+
+        with pytest.raises(ValidationError) as exc_info:
+            CalendarBatchRequest(events=[VALID_CALENDAR_EVENT_DATA, invalid_event_data])
+        assert "Invalid MongoDB ObjectId format" in str(exc_info.value)
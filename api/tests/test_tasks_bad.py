@@ -1,14 +1,15 @@
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import HTTPException, status
 from pydantic import ValidationError
 from bson import ObjectId
 
-from conftest import get_mock_task, get_mock_user, VALID_TASK_DATA
-from models.tasks import TaskRequest, TaskResponse
+from conftest import get_mock_task, get_mock_user, parse_response, VALID_TASK_DATA, MockCursor, InMemoryIdempotencyCollection
+from models.tasks import TaskRequest, TaskResponse, TaskBulkOperation, TaskBulkRequest
 from models.users import UserResponse
 from queries.tasks import TaskQueries
-from routes.tasks import create_task, delete_task, get_task, update_task
+from queries.idempotency import IdempotencyQueries
+from routes.tasks import create_task, delete_task, get_task, get_tasks, update_task, get_archived_task
 
 
 class TestTasksBadPath:
@@ -34,8 +35,8 @@ class TestTasksBadPath:
         current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
         task_id = str(ObjectId())
         
-        with patch('queries.tasks.TaskQueries.get_task', new_callable=AsyncMock) as mock_get:
-            mock_get.side_effect = ValueError("Task not found")
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.find_one = AsyncMock(return_value=None)
 
             with pytest.raises(HTTPException) as exc_info:
                 await get_task(
@@ -45,8 +46,8 @@ class TestTasksBadPath:
                 )
 
             assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
-            assert "not found" in str(exc_info.value.detail).lower()
-            mock_get.assert_called_once_with(task_id, current_user.id)
+            assert exc_info.value.detail == "Task not found"
+            mock_engine.find_one.assert_called_once()
 
     @pytest.mark.asyncio 
     async def test_update_task_invalid_priority(self):
@@ -167,12 +168,110 @@ class TestTasksBadPath:
         with patch.object(TaskQueries, 'update_task', new_callable=AsyncMock) as mock_update:
             mock_update.return_value = mock_task
             
-            result = await update_task(
+            response = await update_task(
                 task_id=str(mock_task.id),
                 task=TaskRequest(**VALID_TASK_DATA),
                 current_user=current_user,
                 queries=task_queries
             )
             
-            assert isinstance(result, TaskResponse)
+            assert parse_response(response, TaskResponse).id == str(mock_task.id)
             mock_update.assert_called_once()
+
+
+    @pytest.mark.asyncio
+    async def test_bulk_operation_requires_task_id(self):
+        with pytest.raises(ValidationError) as exc_info:
+            TaskBulkOperation(op="delete")
+        assert "require a task_id" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_bulk_ordered_stops_at_missing_task(self, task_queries):
+        mock_user = get_mock_user()
+        user_id = str(mock_user.id)
+        bulk_request = TaskBulkRequest(operations=[
+            {"op": "create", "task": VALID_TASK_DATA},
+            {"op": "delete", "task_id": str(ObjectId())},
+            {"op": "create", "task": VALID_TASK_DATA},
+        ])
+
+        collection = MagicMock()
+        collection.find = MagicMock(return_value=MockCursor([]))
+        collection.find_one_and_update = AsyncMock(return_value={"version": 1})
+        collection.update_one = AsyncMock()
+        collection.bulk_write = AsyncMock(return_value=MagicMock(
+            inserted_count=1, modified_count=0, deleted_count=0
+        ))
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            result = await task_queries.bulk_write_tasks(bulk_request.operations, user_id, ordered=True)
+
+        assert len(collection.bulk_write.call_args.args[0]) == 1
+        assert [r.status for r in result.results] == ["ok", "not_found", "skipped"]
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_invalid_sort(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_tasks(
+                current_user=current_user,
+                queries=task_queries,
+                sort="password"
+            )
+
+        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Sort must be one of" in exc_info.value.detail
+
+    @pytest.mark.asyncio
+    async def test_get_archived_task_not_found(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+
+        with patch.object(TaskQueries, 'get_archived_task', new_callable=AsyncMock) as mock_get:
+            mock_get.side_effect = ValueError("Task not found")
+
+            with pytest.raises(HTTPException) as exc_info:
+                await get_archived_task(
+                    task_id=str(ObjectId()),
+                    current_user=current_user,
+                    queries=task_queries
+                )
+
+        assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_idempotency_key_reused_or_released(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        collection = InMemoryIdempotencyCollection()
+
+        async def attempt(data):
+            return await create_task(
+                task=TaskRequest(**data),
+                current_user=current_user,
+                queries=task_queries,
+                idempotency_key="retry-2",
+                idempotency=IdempotencyQueries()
+            )
+
+        with patch('queries.idempotency.engine') as mock_engine, \
+             patch.object(TaskQueries, 'create_task', new_callable=AsyncMock) as mock_create:
+            mock_engine.get_collection.return_value = collection
+            mock_create.side_effect = [Exception("database down"), get_mock_task(current_user.id)]
+
+            with pytest.raises(HTTPException) as failed:
+                await attempt(VALID_TASK_DATA)
+            assert failed.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+            assert collection.docs == {}
+
+            await attempt(VALID_TASK_DATA)
+
+            with pytest.raises(HTTPException) as reused:
+                await attempt({**VALID_TASK_DATA, "title": "Another Task"})
+
+        assert reused.value.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert mock_create.call_count == 2
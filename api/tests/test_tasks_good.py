@@ -1,11 +1,68 @@
+import os
+import asyncio
+import itertools
 import pytest
-from unittest.mock import AsyncMock, patch
+import msgpack
+import orjson
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from odmantic import AIOEngine
+from structlog.testing import capture_logs
 
-from conftest import get_mock_user, get_mock_task, VALID_TASK_DATA
-from models.tasks import TaskRequest, TaskResponse
+from conftest import (
+    get_mock_user,
+    get_mock_task,
+    parse_response,
+    VALID_TASK_DATA,
+    BREAKDOWN_DATA,
+    MockCursor,
+    InMemoryIdempotencyCollection,
+    InMemoryLeaseCollection,
+)
+from models.tasks import (
+    Task,
+    TaskVersion,
+    TaskRequest,
+    TaskResponse,
+    TaskListFilter,
+    TaskBulkRequest,
+    TaskBulkResponse,
+    TaskBreakdown,
+    TaskImportRecord,
+    StoredBreakdown,
+    TaskSyncResponse,
+    TaskSearchResponse,
+    TaskArchiveResponse,
+)
+from queries.breakdowns import BreakdownStore
+from queries.idempotency import IdempotencyQueries
 from models.users import UserResponse
 from queries.tasks import TaskQueries
-from routes.tasks import create_task, get_tasks, get_task, update_task, delete_task
+from utils.task_cache import TaskReadCache
+from utils.stats import log_stats
+from utils.etags import etag_matches
+from utils.task_archive import run_task_archiver, acquire_lease, ARCHIVER_LEASE
+from utils.responses import preferred_media_type, encode_response, task_document
+from middleware.compression import ResponseCompressor, preferred_encoding
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from utils.task_events import TaskEventBroker, watch_task_changes, TASK_CREATED, TASK_DELETED, RESYNC
+from routes.tasks import (
+    create_task,
+    get_tasks,
+    get_task,
+    update_task,
+    delete_task,
+    bulk_task_operations,
+    sync_tasks,
+    search_tasks,
+    stream_task_events,
+    export_tasks,
+    get_archived_tasks,
+)
 
 
 class TestTasksGoodPath:
@@ -21,14 +78,14 @@ class TestTasksGoodPath:
         with patch.object(TaskQueries, 'create_task', new_callable=AsyncMock) as mock_create:
             mock_create.return_value = mock_task
             
-            result = await create_task(
+            response = await create_task(
                 task=task_request,
                 current_user=current_user,
                 queries=task_queries
             )
             
             mock_create.assert_called_once_with(task_request, current_user.id)
-            assert isinstance(result, TaskResponse)
+            result = parse_response(response, TaskResponse)
             assert result.title == VALID_TASK_DATA["title"]
             assert result.user_id == current_user.id
 
@@ -44,14 +101,14 @@ class TestTasksGoodPath:
         with patch.object(TaskQueries, 'get_tasks', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_tasks
 
-            result = await get_tasks(
+            response = await get_tasks(
                 current_user=current_user,
                 queries=task_queries
             )
 
-            mock_get.assert_called_once_with(current_user.id)
+            mock_get.assert_called_once_with(current_user.id, version=0)
 
-            assert isinstance(result, list)
+            result = parse_response(response, list[TaskResponse])
             assert len(result) == 2
             assert all(isinstance(task, TaskResponse) for task in result)
             assert all(task.user_id == current_user.id for task in result)
@@ -67,15 +124,16 @@ class TestTasksGoodPath:
         with patch.object(TaskQueries, 'get_task', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_task
 
-            result = await get_task(
+            response = await get_task(
                 task_id=task_id,
                 current_user=current_user,
                 queries=task_queries
             )
 
-            mock_get.assert_called_once_with(task_id, current_user.id)
+            mock_get.assert_called_once_with(task_id, current_user.id, version=0)
 
-            assert isinstance(result, TaskResponse)
+            result = parse_response(response, TaskResponse)
+            assert result == TaskResponse.from_mongo(mock_task)
             assert result.id == task_id
             assert result.user_id == current_user.id
             assert result.title == mock_task.title
@@ -95,7 +153,7 @@ class TestTasksGoodPath:
         with patch.object(TaskQueries, 'update_task', new_callable=AsyncMock) as mock_update:
             mock_update.return_value = get_mock_task(current_user.id, updated_data)
 
-            result = await update_task(
+            response = await update_task(
                 task_id=task_id,
                 task=task_request,
                 current_user=current_user, 
@@ -104,7 +162,7 @@ class TestTasksGoodPath:
 
             mock_update.assert_called_once_with(task_id, task_request, current_user.id)
 
-            assert isinstance(result, TaskResponse)
+            result = parse_response(response, TaskResponse)
             assert result.title == "Updated Title"
             assert result.user_id == current_user.id
 
@@ -134,11 +192,1029 @@ class TestTasksGoodPath:
         with patch.object(TaskQueries, 'get_tasks', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = []
             
-            result = await get_tasks(
+            response = await get_tasks(
                 current_user=current_user,
                 queries=task_queries
             )
             
-            assert isinstance(result, list)
-            assert len(result) == 0
-            mock_get.assert_called_once_with(current_user.id)
\ No newline at end of file
+            assert parse_response(response, list[TaskResponse]) == []
+            mock_get.assert_called_once_with(current_user.id, version=0)
+
+    @pytest.mark.asyncio
+    async def test_bulk_task_operations(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        mock_task = get_mock_task(current_user.id)
+        bulk_request = TaskBulkRequest(operations=[
+            {"op": "create", "task": VALID_TASK_DATA},
+            {"op": "status", "task_id": str(mock_task.id), "status": "completed"},
+        ])
+
+        with patch.object(TaskQueries, 'bulk_write_tasks', new_callable=AsyncMock) as mock_bulk:
+            mock_bulk.return_value = TaskBulkResponse(results=[], inserted=1, modified=1, deleted=0)
+
+            result = await bulk_task_operations(
+                bulk_request=bulk_request,
+                current_user=current_user,
+                queries=task_queries
+            )
+
+            mock_bulk.assert_called_once_with(bulk_request.operations, current_user.id, ordered=True)
+            assert result.inserted == 1
+            assert result.modified == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_write_tasks_single_round_trip(self, task_queries):
+        mock_user = get_mock_user()
+        user_id = str(mock_user.id)
+        mock_task = get_mock_task(user_id)
+        task_id = str(mock_task.id)
+        bulk_request = TaskBulkRequest(operations=[
+            {"op": "create", "task": VALID_TASK_DATA},
+            {"op": "update", "task_id": task_id, "task": {**VALID_TASK_DATA, "title": "Renamed Task"}},
+            {"op": "delete", "task_id": task_id},
+        ])
+
+        collection = MagicMock()
+        collection.find = MagicMock(return_value=MockCursor([
+            {"_id": mock_task.id, "title": mock_task.title, "description": mock_task.description}
+        ]))
+        collection.find_one_and_update = AsyncMock(return_value={"version": 1})
+        collection.update_one = AsyncMock()
+        collection.bulk_write = AsyncMock(return_value=MagicMock(
+            inserted_count=1, modified_count=1, deleted_count=1
+        ))
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+            mock_engine.save_all = AsyncMock()
+
+            result = await task_queries.bulk_write_tasks(bulk_request.operations, user_id)
+
+        collection.bulk_write.assert_called_once()
+        requests = collection.bulk_write.call_args.args[0]
+        assert len(requests) == 3
+        changes = requests[1]._doc["$set"]
+        assert changes["last_analyzed"] is False
+        assert changes["breakdown"] is changes["breakdown_key"] is changes["breakdown_text"] is None
+        assert [r.status for r in result.results] == ["ok", "ok", "ok"]
+        assert result.results[1].task_id == task_id
+        assert (result.inserted, result.modified, result.deleted) == (1, 1, 1)
+        collection.find_one_and_update.assert_called_once()
+        collection.update_one.assert_called_once()
+        tombstones = mock_engine.save_all.call_args.args[0]
+        assert [t.task_id for t in tombstones] == [task_id]
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_sets_etag(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        task_queries.get_collection_version.return_value = 7
+
+        with patch.object(TaskQueries, 'get_tasks', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = [get_mock_task(current_user.id)]
+
+            response = await get_tasks(
+                current_user=current_user,
+                queries=task_queries
+            )
+
+        assert response.headers["ETag"] == f'"tasks-{current_user.id}-7"'
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_not_modified(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        task_queries.get_collection_version.return_value = 7
+        etag = f'"tasks-{current_user.id}-7"'
+
+        with patch.object(TaskQueries, 'get_tasks', new_callable=AsyncMock) as mock_get:
+            result = await get_tasks(
+                current_user=current_user,
+                queries=task_queries,
+                if_none_match=etag
+            )
+
+            mock_get.assert_not_called()
+
+        assert result.status_code == 304
+        assert result.headers["ETag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_sync_tasks_returns_changes(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        changed_task = get_mock_task(current_user.id, {"sync_version": 5})
+        deleted_id = "507f1f77bcf86cd799439011"
+
+        with patch.object(TaskQueries, 'get_changes_since', new_callable=AsyncMock) as mock_changes:
+            mock_changes.return_value = ([changed_task], [deleted_id], 6)
+
+            response = await sync_tasks(
+                since=4,
+                current_user=current_user,
+                queries=task_queries
+            )
+
+            mock_changes.assert_called_once_with(current_user.id, 4)
+
+        result = parse_response(response, TaskSyncResponse)
+        assert [task.id for task in result.upserts] == [str(changed_task.id)]
+        assert result.deletions == [deleted_id]
+        assert result.sync_token == 6
+
+    @pytest.mark.asyncio
+    async def test_changes_since_current_version_is_empty(self, task_queries):
+        task_queries.get_collection_version.return_value = 6
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.find = AsyncMock()
+
+            upserts, deletions, version = await task_queries.get_changes_since("user", 6)
+
+            mock_engine.find.assert_not_called()
+
+        assert (upserts, deletions, version) == ([], [], 6)
+
+    @pytest.mark.asyncio
+    async def test_first_sync_is_a_full_snapshot(self, task_queries):
+        legacy_task = Task.model_validate_doc({"_id": ObjectId(), "user_id": "user", **VALID_TASK_DATA})
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.find = AsyncMock(return_value=[legacy_task])
+
+            upserts, deletions, version = await task_queries.get_changes_since("user", 0)
+
+            mock_engine.find.assert_awaited_once()
+            assert len(mock_engine.find.call_args.args) == 2
+
+        assert (upserts, deletions, version) == ([legacy_task], [], 0)
+
+    @pytest.mark.asyncio
+    async def test_first_sync_includes_tasks_without_sync_version(self):
+        """Against MongoDB: tasks written before sync versions existed are part of the first sync"""
+        client = AsyncIOMotorClient(os.environ["MONGO_DB_URI"], serverSelectionTimeoutMS=500)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            pytest.skip("MongoDB is not available")
+
+        test_engine = AIOEngine(client=client, database="audhd_task_sync_test")
+        task_queries = TaskQueries()
+        task_queries.analyzer.get_task_breakdown = AsyncMock(return_value=None)
+        try:
+            legacy = {"user_id": "user", **VALID_TASK_DATA}
+            legacy_id = (await test_engine.get_collection(Task).insert_one(legacy)).inserted_id
+
+            with patch('queries.tasks.engine', test_engine):
+                upserts, deletions, version = await task_queries.get_changes_since("user", 0)
+                assert [task.id for task in upserts] == [legacy_id]
+                assert (deletions, version) == ([], 0)
+
+                created = await task_queries.create_task(TaskRequest(**VALID_TASK_DATA), "user")
+                upserts, _, version = await task_queries.get_changes_since("user", 0)
+                assert {task.id for task in upserts} == {legacy_id, created.id}
+                assert version == 1
+        finally:
+            await client.drop_database("audhd_task_sync_test")
+            client.close()
+
+    @pytest.mark.asyncio
+    async def test_sync_during_write_does_not_skip_it(self):
+        """A sync that runs between a write's stamp and its save must not hand out that write's version"""
+        user_id = str(get_mock_user().id)
+        task_queries = TaskQueries()
+        task_queries.analyzer.get_task_breakdown = AsyncMock(return_value=None)
+        counter = {"version": 0, "committed": 0, "in_flight": 0}
+        saved = []
+
+        async def next_version(user_id):
+            counter["version"] += 1
+            counter["in_flight"] += 1
+            return counter["version"]
+
+        async def commit_version(user_id):
+            counter["in_flight"] -= 1
+            if not counter["in_flight"]:
+                counter["committed"] = counter["version"]
+
+        async def collection_version(user_id):
+            return counter["committed"]
+
+        mid_write = {}
+
+        async def save(task):
+            mid_write["sync"] = await task_queries.get_changes_since(user_id, 0)
+            saved.append(task)
+
+        task_queries._next_version = next_version
+        task_queries._commit_version = commit_version
+        task_queries.get_collection_version = collection_version
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.save = AsyncMock(side_effect=save)
+            mock_engine.find = AsyncMock(side_effect=lambda model, *query: list(saved) if model is Task else [])
+
+            task = await task_queries.create_task(TaskRequest(**VALID_TASK_DATA), user_id)
+            after = await task_queries.get_changes_since(user_id, mid_write["sync"][2])
+
+        assert task.sync_version == 1
+        assert mid_write["sync"] == ([], [], 0)
+        assert after[0] == [task]
+        assert after[2] == 1
+
+    @pytest.mark.asyncio
+    async def test_collection_version_committed_after_writes_land(self):
+        """Against MongoDB: the committed version waits for every write in flight"""
+        client = AsyncIOMotorClient(os.environ["MONGO_DB_URI"], serverSelectionTimeoutMS=500)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            pytest.skip("MongoDB is not available")
+
+        test_engine = AIOEngine(client=client, database="audhd_task_version_test")
+        task_queries = TaskQueries()
+        try:
+            with patch('queries.tasks.engine', test_engine):
+                first = await task_queries._next_version("user")
+                second = await task_queries._next_version("user")
+                await task_queries._commit_version("user")
+                assert await task_queries.get_collection_version("user") == 0
+
+                await task_queries._commit_version("user")
+                assert await task_queries.get_collection_version("user") == second == first + 1
+
+                # a write abandoned by a dead worker stops holding the version back once stale
+                await task_queries._next_version("user")
+                await test_engine.get_collection(TaskVersion).update_one(
+                    {"user_id": "user"},
+                    {"$set": {"allocated_at": datetime.now(timezone.utc) - timedelta(hours=1)}}
+                )
+                async with task_queries._versioned_write("user") as version:
+                    assert await task_queries.get_collection_version("user") == second
+                assert await task_queries.get_collection_version("user") == version == 4
+        finally:
+            await client.drop_database("audhd_task_version_test")
+            client.close()
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_served_from_cache(self, task_queries):
+        user_id = str(get_mock_user().id)
+        mock_tasks = [get_mock_task(user_id)]
+        task_queries.cache = TaskReadCache()
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.find = AsyncMock(return_value=mock_tasks)
+
+            first = await task_queries.get_tasks(user_id, version=3)
+            second = await task_queries.get_tasks(user_id, version=3)
+            single = await task_queries.get_task(str(mock_tasks[0].id), user_id, version=3)
+
+            mock_engine.find.assert_called_once()
+
+        assert first == second == mock_tasks
+        assert single is mock_tasks[0]
+        assert task_queries.cache.stats()["hit_ratio"] == round(2 / 3, 4)
+
+    @pytest.mark.asyncio
+    async def test_task_cache_invalidation_and_versions(self):
+        cache = TaskReadCache(max_users=1)
+        mock_tasks = [get_mock_task("user-a")]
+
+        epoch = cache.epoch
+        cache.invalidate("user-a")
+        cache.set_tasks("user-a", mock_tasks, epoch, version=1)
+        assert cache.get_tasks("user-a") is None
+
+        cache.set_tasks("user-a", mock_tasks, cache.epoch, version=1)
+        assert cache.get_tasks("user-a", version=1) == mock_tasks
+        assert cache.get_tasks("user-a", version=2) is None
+
+        cache.set_tasks("user-b", [], cache.epoch)
+        assert cache.get_tasks("user-a") is None
+        assert cache.stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_task_cache_stats_logged_periodically(self):
+        cache = TaskReadCache()
+        cache.get_tasks("user-a")
+
+        def broken():
+            raise RuntimeError("unavailable")
+
+        with capture_logs() as logs:
+            reporter = asyncio.create_task(log_stats({"broken": broken, "task_cache": cache.stats}, 0.01))
+            await asyncio.sleep(0.05)
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+
+        lines = [log for log in logs if log.get("component") == "task_cache"]
+        assert lines and lines[0]["event"] == "component_stats"
+        assert lines[0]["misses"] == 1
+        assert any(log["event"] == "component_stats_failed" for log in logs)
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_with_filters(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        mock_tasks = [get_mock_task(current_user.id, {"status": "completed"})]
+
+        with patch.object(TaskQueries, 'find_tasks', new_callable=AsyncMock) as mock_find:
+            mock_find.return_value = mock_tasks
+
+            response = await get_tasks(
+                current_user=current_user,
+                queries=task_queries,
+                status_filter="completed",
+                energy_level=2,
+                sort="-priority"
+            )
+
+            mock_find.assert_called_once_with(
+                current_user.id,
+                TaskListFilter(status="completed", energy_level=2, sort="-priority")
+            )
+
+        assert [task.status for task in parse_response(response, list[TaskResponse])] == ["completed"]
+        assert response.headers["ETag"] != f'"tasks-{current_user.id}-0"'
+
+    @pytest.mark.asyncio
+    async def test_build_list_query(self):
+        filters = TaskListFilter(status="pending", priority=1, environment="Home", sort="-updated_at")
+
+        query, sort = TaskQueries.build_list_query("user", filters)
+
+        assert query == {
+            "user_id": "user",
+            "status": "pending",
+            "priority": 1,
+            "context.environment": "home",
+        }
+        assert sort == [("updated_at", -1)]
+
+    @pytest.mark.asyncio
+    async def test_task_filters_use_index(self):
+        """Query-planner check: every supported filter combination is served by an index"""
+        client = AsyncIOMotorClient(os.environ["MONGO_DB_URI"], serverSelectionTimeoutMS=500)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            pytest.skip("MongoDB is not available")
+
+        test_engine = AIOEngine(client=client, database="audhd_query_planner_test")
+        await test_engine.configure_database([Task])
+        collection = test_engine.get_collection(Task)
+
+        filter_values = {
+            "status": "pending",
+            "priority": 2,
+            "energy_level": 1,
+            "environment": "home",
+            "time_of_day": "morning",
+        }
+        try:
+            for size in range(len(filter_values) + 1):
+                for fields in itertools.combinations(filter_values, size):
+                    for sort in [None, "priority", "-updated_at"]:
+                        filters = TaskListFilter(sort=sort, **{field: filter_values[field] for field in fields})
+                        query, sort_spec = TaskQueries.build_list_query("user", filters)
+                        cursor = collection.find(query)
+                        if sort_spec:
+                            cursor = cursor.sort(sort_spec)
+                        plan = await cursor.explain()
+                        assert "COLLSCAN" not in str(plan["queryPlanner"]["winningPlan"]), filters
+        finally:
+            await client.drop_database("audhd_query_planner_test")
+            client.close()
+
+    @pytest.mark.asyncio
+    async def test_search_tasks(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        dentist_task = get_mock_task(current_user.id, {"title": "Call the dentist"})
+
+        with patch.object(TaskQueries, 'search_tasks', new_callable=AsyncMock) as mock_search:
+            mock_search.return_value = ([(dentist_task, 3.5)], 21)
+
+            response = await search_tasks(
+                q="dentist",
+                page=2,
+                page_size=20,
+                current_user=current_user,
+                queries=task_queries
+            )
+
+            mock_search.assert_called_once_with(current_user.id, "dentist", 2, 20)
+
+        result = parse_response(response, TaskSearchResponse)
+        assert result.total == 21
+        assert result.results[0].task.title == "Call the dentist"
+        assert result.results[0].score == 3.5
+
+    @pytest.mark.asyncio
+    async def test_search_tasks_query(self, task_queries):
+        user_id = str(get_mock_user().id)
+        dentist_task = get_mock_task(user_id, {"title": "Call the dentist"})
+
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.skip.return_value = cursor
+        cursor.limit.return_value = cursor
+        cursor.to_list = AsyncMock(return_value=[{**dentist_task.model_dump_doc(), "score": 2.0}])
+        collection = MagicMock()
+        collection.find.return_value = cursor
+        collection.count_documents = AsyncMock(return_value=1)
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            hits, total = await task_queries.search_tasks(user_id, "dentist", page=3, page_size=10)
+
+        query = collection.find.call_args.args[0]
+        assert query == {"user_id": user_id, "$text": {"$search": "dentist"}}
+        cursor.skip.assert_called_once_with(20)
+        cursor.limit.assert_called_once_with(10)
+        assert total == 1
+        assert hits[0][0].id == dentist_task.id
+        assert hits[0][1] == 2.0
+
+    @pytest.mark.asyncio
+    async def test_breakdown_steps_copied_for_search(self):
+        user_id = str(get_mock_user().id)
+        breakdown = TaskBreakdown(**{
+            **BREAKDOWN_DATA,
+            "steps": [{**BREAKDOWN_DATA["steps"][0], "description": "Call the dentist"}],
+        })
+        task_queries = TaskQueries()
+        task_queries.analyzer.get_task_breakdown = AsyncMock(return_value=breakdown)
+        task_queries.breakdowns = MagicMock()
+        task_queries.breakdowns.put = AsyncMock(return_value="key")
+        task_queries._next_version = AsyncMock(return_value=1)
+        task_queries._commit_version = AsyncMock()
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.save = AsyncMock()
+
+            task = await task_queries.create_task(TaskRequest(**VALID_TASK_DATA), user_id)
+
+        saved = mock_engine.save.call_args.args[0].model_dump_doc()
+        assert saved["breakdown_text"] == task.breakdown_text == "Call the dentist"
+        assert saved["breakdown"] is None
+
+    @pytest.mark.asyncio
+    async def test_breakdown_text_backfilled_for_older_tasks(self):
+        breakdown = TaskBreakdown(**BREAKDOWN_DATA)
+        legacy = {"_id": ObjectId(), "breakdown": breakdown.model_dump(), "breakdown_key": None}
+        keyed = {"_id": ObjectId(), "breakdown": None, "breakdown_key": "key"}
+        cursor = MockCursor([legacy, keyed])
+        cursor.batch_size = MagicMock(return_value=cursor)
+        collection = MagicMock()
+        collection.find.return_value = cursor
+        collection.bulk_write = AsyncMock()
+        task_queries = TaskQueries()
+        task_queries.breakdowns = MagicMock()
+        task_queries.breakdowns.get_many = AsyncMock(return_value={"key": breakdown})
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            await task_queries.backfill_breakdown_text()
+
+        assert collection.find.call_args.args[0]["breakdown_text"] == {"$exists": False}
+        updates = collection.bulk_write.call_args.args[0]
+        assert [update._filter for update in updates] == [{"_id": legacy["_id"]}, {"_id": keyed["_id"]}]
+        assert all(update._doc == {"$set": {"breakdown_text": "Open the document"}} for update in updates)
+
+    @pytest.mark.asyncio
+    async def test_search_finds_task_by_breakdown_step(self):
+        """Against MongoDB: step text of a stored breakdown is searchable through the text index"""
+        client = AsyncIOMotorClient(os.environ["MONGO_DB_URI"], serverSelectionTimeoutMS=500)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            pytest.skip("MongoDB is not available")
+
+        test_engine = AIOEngine(client=client, database="audhd_text_search_test")
+        await test_engine.configure_database([Task])
+        breakdown = TaskBreakdown(**{
+            **BREAKDOWN_DATA,
+            "steps": [{**BREAKDOWN_DATA["steps"][0], "description": "Phone the dentist about the filling"}],
+        })
+        task = get_mock_task("user", {"title": "Health admin", "breakdown_key": "key"})
+        task.breakdown_text = "\n".join(step.description for step in breakdown.steps)
+        try:
+            await test_engine.save_all([task, get_mock_task("user", {"title": "Buy groceries"})])
+            with patch('queries.tasks.engine', test_engine):
+                hits, total = await TaskQueries().search_tasks("user", "dentist")
+        finally:
+            await client.drop_database("audhd_text_search_test")
+            client.close()
+
+        assert total == 1
+        assert hits[0][0].id == task.id
+
+    @pytest.mark.asyncio
+    async def test_task_event_broker_backpressure(self):
+        broker = TaskEventBroker(queue_size=2)
+        queue = broker.subscribe("user")
+        task = get_mock_task("user")
+
+        broker.publish("user", TASK_CREATED, str(task.id), 1, task)
+        assert (await queue.get())["task"]["title"] == task.title
+
+        for version in range(3):
+            broker.publish("user", TASK_DELETED, str(task.id), version)
+
+        assert queue.qsize() == 1
+        assert (await queue.get())["type"] == RESYNC
+        assert broker.overflows == 1
+
+        broker.unsubscribe("user", queue)
+        assert not broker.has_subscribers("user")
+
+    @pytest.mark.asyncio
+    async def test_stream_task_events(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        task_queries.events = TaskEventBroker()
+        request = MagicMock()
+        request.is_disconnected = AsyncMock(return_value=False)
+
+        response = await stream_task_events(
+            request=request,
+            current_user=current_user,
+            queries=task_queries
+        )
+        stream = response.body_iterator
+
+        assert await stream.__anext__() == "retry: 5000\n\n"
+        next_chunk = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        task_queries.events.publish(current_user.id, TASK_DELETED, "abc", 4)
+        chunk = await next_chunk
+
+        assert chunk.startswith("event: task.deleted\n")
+        assert '"sync_version": 4' in chunk
+        await stream.aclose()
+        assert not task_queries.events.has_subscribers(current_user.id)
+
+    @pytest.mark.asyncio
+    async def test_change_stream_task_events(self):
+        """Runs against a local single-node replica set, e.g. mongod --replSet rs0"""
+        uri = os.environ.get("MONGO_REPLICA_SET_URI")
+        if not uri:
+            pytest.skip("MONGO_REPLICA_SET_URI is not set")
+
+        client = AsyncIOMotorClient(uri)
+        database = client["audhd_change_stream_test"]
+        broker = TaskEventBroker()
+        queue = broker.subscribe("user")
+        watcher = asyncio.create_task(watch_task_changes(broker, database))
+        try:
+            await asyncio.sleep(1)
+            task = get_mock_task("user")
+            await database["tasks"].insert_one(task.model_dump_doc())
+
+            event = await asyncio.wait_for(queue.get(), timeout=10)
+            assert event["type"] == TASK_CREATED
+            assert event["task_id"] == str(task.id)
+        finally:
+            watcher.cancel()
+            await client.drop_database("audhd_change_stream_test")
+            client.close()
+
+    @pytest.mark.asyncio
+    async def test_export_tasks_streams_ndjson(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        mock_tasks = [get_mock_task(current_user.id), get_mock_task(current_user.id, {"title": "Second Task"})]
+
+        cursor = MockCursor([task.model_dump_doc() for task in mock_tasks])
+        cursor.batch_size = MagicMock(return_value=cursor)
+        collection = MagicMock()
+        collection.find.return_value = cursor
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            response = await export_tasks(current_user=current_user, queries=task_queries)
+            lines = [line async for line in response.body_iterator]
+
+        assert response.media_type == "application/x-ndjson"
+        assert [TaskResponse.model_validate_json(line).title for line in lines] == ["Test Task", "Second Task"]
+        assert all(line.endswith(b"\n") for line in lines)
+
+    @pytest.mark.asyncio
+    async def test_import_tasks_in_batches(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        body = b"".join(
+            TaskImportRecord(**VALID_TASK_DATA, breakdown=BREAKDOWN_DATA).model_dump_json().encode() + b"\n"
+            for _ in range(5)
+        ) + b'{"title": "bad"}\n'
+
+        async def stream():
+            for start in range(0, len(body), 7):
+                yield body[start:start + 7]
+
+        collection = MagicMock()
+        collection.find_one_and_update = AsyncMock(return_value={"version": 1})
+        collection.update_one = AsyncMock()
+        collection.bulk_write = AsyncMock(side_effect=lambda requests, ordered: MagicMock(inserted_count=len(requests)))
+
+        task_queries.breakdowns = MagicMock()
+        task_queries.breakdowns.put_many = AsyncMock(side_effect=lambda breakdowns: ["key"] * len(breakdowns))
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            result = await task_queries.import_tasks(current_user.id, stream(), batch_size=2)
+
+        assert result.imported == 5
+        assert result.failed == 1
+        assert result.errors[0].line == 6
+        assert [len(call.args[0]) for call in collection.bulk_write.call_args_list] == [2, 2, 1]
+        assert [len(call.args[0]) for call in task_queries.breakdowns.put_many.call_args_list] == [2, 2, 1]
+        inserted = collection.bulk_write.call_args.args[0][0]._doc
+        assert inserted["breakdown_key"] == "key"
+        assert inserted["breakdown_text"] == "Open the document"
+
+    @pytest.mark.asyncio
+    async def test_completed_at_tracks_status(self, task_queries):
+        mock_user = get_mock_user()
+        task = get_mock_task(str(mock_user.id), {"status": "completed"})
+
+        task_queries._touch(task, 1)
+        completed_at = task.completed_at
+        assert completed_at is not None
+
+        task_queries._touch(task, 2)
+        assert task.completed_at == completed_at
+
+        task.status = "in_progress"
+        task_queries._touch(task, 3)
+        assert task.completed_at is None
+
+    @pytest.mark.asyncio
+    async def test_archive_completed_tasks(self, task_queries):
+        user_id = str(get_mock_user().id)
+        completed_at = datetime.now(timezone.utc) - timedelta(days=60)
+        docs = [
+            {**get_mock_task(user_id, {"status": "completed"}).model_dump_doc(), "completed_at": completed_at}
+            for _ in range(3)
+        ]
+        edited = docs[2]["_id"]
+        del docs[0]["revision"]
+
+        batch = MagicMock()
+        batch.sort.return_value.limit.return_value.to_list = AsyncMock(side_effect=[docs, []])
+        collection = MagicMock()
+        collection.update_many = AsyncMock()
+        collection.bulk_write = AsyncMock()
+        collection.find_one_and_update = AsyncMock(return_value={"version": 4})
+        collection.update_one = AsyncMock()
+        collection.find.side_effect = lambda query, projection=None: (
+            MockCursor([{"_id": edited}]) if projection else batch
+        )
+        archive = MagicMock()
+        archive.bulk_write = AsyncMock()
+        archive.delete_many = AsyncMock()
+
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+            mock_engine.database.__getitem__.return_value = archive
+            mock_engine.save_all = AsyncMock()
+
+            archived = await task_queries.archive_completed_tasks(timedelta(days=30))
+
+        assert archived == 2
+        assert len(archive.bulk_write.call_args.args[0]) == 3
+        deletes = collection.bulk_write.call_args.args[0]
+        assert deletes[0]._filter == {"_id": docs[0]["_id"], "revision": {"$exists": False}}
+        assert deletes[1]._filter == {"_id": docs[1]["_id"], "revision": 0}
+        archive.delete_many.assert_called_once_with({"_id": {"$in": [edited]}})
+        tombstones = mock_engine.save_all.call_args.args[0]
+        assert [t.task_id for t in tombstones] == [str(doc["_id"]) for doc in docs[:2]]
+        assert all(t.sync_version == 4 for t in tombstones)
+
+    @pytest.mark.asyncio
+    async def test_task_archiver_runs_once_across_workers(self):
+        leases = InMemoryLeaseCollection()
+        queries = MagicMock()
+        queries.archive_completed_tasks = AsyncMock(return_value=0)
+
+        workers = [
+            asyncio.create_task(run_task_archiver(queries, timedelta(days=30), 3600, leases))
+            for _ in range(4)
+        ]
+        await asyncio.sleep(0.05)
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        queries.archive_completed_tasks.assert_called_once_with(timedelta(days=30))
+        assert leases.docs[ARCHIVER_LEASE]["expires_at"] > datetime.now(timezone.utc) + timedelta(minutes=59)
+
+    @pytest.mark.asyncio
+    async def test_task_archive_lease_taken_over_once_expired(self):
+        leases = InMemoryLeaseCollection()
+        leases.docs[ARCHIVER_LEASE] = {
+            "_id": ARCHIVER_LEASE,
+            "owner": "dead-worker",
+            "expires_at": datetime.now(timezone.utc) - timedelta(seconds=1),
+        }
+
+        assert await acquire_lease(leases, ARCHIVER_LEASE, "worker-1", 60)
+        assert not await acquire_lease(leases, ARCHIVER_LEASE, "worker-2", 60)
+        assert leases.docs[ARCHIVER_LEASE]["owner"] == "worker-1"
+
+    @pytest.mark.asyncio
+    async def test_get_archived_tasks(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        task = get_mock_task(current_user.id, {"status": "completed"})
+        archived_at = datetime.now(timezone.utc)
+
+        with patch.object(TaskQueries, 'get_archived_tasks', new_callable=AsyncMock) as mock_archive:
+            mock_archive.return_value = ([(task, archived_at)], 1)
+
+            response = await get_archived_tasks(
+                page=1,
+                page_size=20,
+                current_user=current_user,
+                queries=task_queries
+            )
+
+        result = parse_response(response, TaskArchiveResponse)
+        assert result.total == 1
+        assert result.results[0].id == str(task.id)
+        assert result.results[0].archived_at == archived_at
+        mock_archive.assert_called_once_with(current_user.id, 1, 20)
+
+    @pytest.mark.asyncio
+    async def test_breakdown_store_shares_identical_breakdowns(self):
+        store = BreakdownStore()
+        breakdown = TaskBreakdown(**BREAKDOWN_DATA)
+        collection = MagicMock()
+        collection.update_one = AsyncMock()
+
+        with patch('queries.breakdowns.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            first = await store.put(breakdown)
+            second = await store.put(TaskBreakdown(**BREAKDOWN_DATA))
+            loaded = await store.get_many([first])
+
+        assert first == second == BreakdownStore.key_for(breakdown)
+        collection.update_one.assert_called_once()
+        assert collection.update_one.call_args.args[0] == {"key": first}
+        stored = collection.update_one.call_args.args[1]["$setOnInsert"]
+        assert len(stored["payload"]) < stored["size"]
+        collection.find.assert_not_called()
+        assert loaded == {first: breakdown}
+
+    @pytest.mark.asyncio
+    async def test_breakdown_store_put_many_single_bulk_write(self):
+        store = BreakdownStore()
+        breakdown = TaskBreakdown(**BREAKDOWN_DATA)
+        other = TaskBreakdown(**{**BREAKDOWN_DATA, "environment_setup": "Kitchen table"})
+        collection = MagicMock()
+        collection.bulk_write = AsyncMock()
+
+        with patch('queries.breakdowns.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            keys = await store.put_many([breakdown, None, other, TaskBreakdown(**BREAKDOWN_DATA)])
+            again = await store.put_many([other])
+
+        assert keys == [BreakdownStore.key_for(breakdown), None, BreakdownStore.key_for(other), keys[0]]
+        assert again == [keys[2]]
+        collection.bulk_write.assert_called_once()
+        requests = collection.bulk_write.call_args.args[0]
+        assert [request._filter for request in requests] == [{"key": keys[0]}, {"key": keys[2]}]
+        assert all(request._upsert for request in requests)
+        assert collection.bulk_write.call_args.kwargs == {"ordered": False}
+
+    @pytest.mark.asyncio
+    async def test_breakdown_loaded_only_for_detail_view(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        breakdown = TaskBreakdown(**BREAKDOWN_DATA)
+        mock_task = get_mock_task(current_user.id, {"breakdown_key": BreakdownStore.key_for(breakdown)})
+        task_queries.breakdowns = MagicMock()
+        task_queries.breakdowns.load = AsyncMock(return_value=breakdown)
+
+        with patch.object(TaskQueries, 'get_tasks', new_callable=AsyncMock) as mock_get_all, \
+             patch.object(TaskQueries, 'get_task', new_callable=AsyncMock) as mock_get:
+            mock_get_all.return_value = [mock_task]
+            mock_get.return_value = mock_task
+
+            listed = await get_tasks(current_user=current_user, queries=task_queries)
+            task_queries.breakdowns.load.assert_not_called()
+
+            detail = await get_task(
+                task_id=str(mock_task.id),
+                current_user=current_user,
+                queries=task_queries
+            )
+
+        listed = parse_response(listed, list[TaskResponse])
+        assert listed[0].breakdown is None
+        assert listed[0].breakdown_key == mock_task.breakdown_key
+        assert parse_response(detail, TaskResponse).breakdown == breakdown
+
+    @pytest.mark.asyncio
+    async def test_breakdown_store_decodes_compressed_and_legacy_entries(self):
+        store = BreakdownStore()
+        breakdown = TaskBreakdown(**BREAKDOWN_DATA)
+        canonical = BreakdownStore.canonical(breakdown)
+        docs = [
+            StoredBreakdown(key="compressed", payload=BreakdownStore.encode(canonical), size=len(canonical)),
+            StoredBreakdown(key="legacy", breakdown=breakdown),
+        ]
+        collection = MagicMock()
+        collection.find.return_value = MockCursor(doc.model_dump_doc() for doc in docs)
+
+        with patch('queries.breakdowns.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            loaded = await store.get_many(["compressed", "legacy", "missing"])
+
+        assert loaded == {"compressed": breakdown, "legacy": breakdown}
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_msgpack(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        mock_tasks = [get_mock_task(current_user.id, {"status": "completed", "completed_at": datetime.now(timezone.utc)})]
+
+        with patch.object(TaskQueries, 'get_tasks', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = mock_tasks
+
+            as_json = await get_tasks(current_user=current_user, queries=task_queries)
+            as_msgpack = await get_tasks(
+                current_user=current_user,
+                queries=task_queries,
+                accept="application/msgpack, application/json;q=0.5"
+            )
+
+        assert as_msgpack.media_type == "application/msgpack"
+        assert as_msgpack.headers["Vary"] == "Accept"
+        assert msgpack.unpackb(as_msgpack.body) == orjson.loads(as_json.body)
+        assert len(as_msgpack.body) < len(as_json.body)
+        assert as_msgpack.headers["ETag"] != as_json.headers["ETag"]
+
+    def test_preferred_media_type(self):
+        assert preferred_media_type(None) == "application/json"
+        assert preferred_media_type("*/*") == "application/json"
+        assert preferred_media_type("application/x-msgpack") == "application/msgpack"
+        assert preferred_media_type("application/json, application/msgpack") == "application/json"
+        assert preferred_media_type("application/json;q=0.8, application/msgpack") == "application/msgpack"
+        assert preferred_media_type("application/msgpack;q=0") == "application/json"
+
+    def test_task_list_response_compression(self):
+        user_id = str(get_mock_user().id)
+        tasks = [task_document(get_mock_task(user_id, {"title": f"Task {index}"})) for index in range(50)]
+        compressor = ResponseCompressor(min_size=1024)
+        app = FastAPI()
+        app.middleware("http")(compressor)
+
+        @app.get("/tasks")
+        async def list_tasks():
+            return encode_response(tasks)
+
+        @app.get("/small")
+        async def small():
+            return encode_response(tasks[:1])
+
+        @app.get("/stream")
+        async def stream():
+            return StreamingResponse(iter([b"x" * 4096]), media_type="application/x-ndjson")
+
+        with TestClient(app) as client:
+            as_br = client.get("/tasks", headers={"Accept-Encoding": "gzip, br"})
+            as_gzip = client.get("/tasks", headers={"Accept-Encoding": "gzip, br;q=0"})
+            small_response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+            streamed = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert as_br.headers["content-encoding"] == "br"
+        assert as_br.headers["vary"] == "Accept, Accept-Encoding"
+        assert as_gzip.headers["content-encoding"] == "gzip"
+        assert as_gzip.json() == as_br.json() == orjson.loads(orjson.dumps(tasks, option=orjson.OPT_UTC_Z))
+        assert "content-encoding" not in small_response.headers
+        assert "content-encoding" not in streamed.headers
+        assert compressor.stats()["compressed"] == 2
+        assert compressor.stats()["bytes_out"] < compressor.stats()["bytes_in"] / 4
+
+    def test_compressed_responses_get_their_own_etag(self):
+        user_id = str(get_mock_user().id)
+        tasks = [task_document(get_mock_task(user_id, {"title": f"Task {index}"})) for index in range(50)]
+        etag = '"tasks-user-7"'
+        app = FastAPI()
+        app.middleware("http")(ResponseCompressor(min_size=1024))
+
+        @app.get("/tasks")
+        async def list_tasks(request: Request):
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            return encode_response(tasks, headers={"ETag": etag})
+
+        with TestClient(app) as client:
+            identity = client.get("/tasks", headers={"Accept-Encoding": "identity"})
+            as_gzip = client.get("/tasks", headers={"Accept-Encoding": "gzip"})
+            as_br = client.get("/tasks", headers={"Accept-Encoding": "br"})
+            revalidated = client.get(
+                "/tasks",
+                headers={"Accept-Encoding": "gzip", "If-None-Match": as_gzip.headers["etag"]}
+            )
+
+        assert identity.headers["etag"] == etag
+        assert as_gzip.headers["etag"] == '"tasks-user-7-gzip"'
+        assert as_br.headers["etag"] == '"tasks-user-7-br"'
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == as_gzip.headers["etag"]
+
+    def test_compression_keeps_repeated_headers(self):
+        app = FastAPI()
+        app.middleware("http")(ResponseCompressor(min_size=16))
+
+        @app.get("/login")
+        async def login():
+            response = Response(content=b"x" * 64, media_type="text/plain", headers={"Vary": "Cookie"})
+            response.set_cookie("session", "abc")
+            response.set_cookie("csrf", "def")
+            return response
+
+        with TestClient(app) as client:
+            response = client.get("/login", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Cookie, Accept-Encoding"
+        assert [cookie.split("=")[0] for cookie in response.headers.get_list("set-cookie")] == ["session", "csrf"]
+        assert response.text == "x" * 64
+
+    def test_preferred_encoding(self):
+        assert preferred_encoding(None) is None
+        assert preferred_encoding("identity") is None
+        assert preferred_encoding("gzip, deflate, br") == "br"
+        assert preferred_encoding("br;q=0, gzip;q=0.5") == "gzip"
+        assert preferred_encoding("*") == "br"
+
+    @pytest.mark.asyncio
+    async def test_create_task_idempotent_retries(self, task_queries):
+        mock_user = get_mock_user()
+        current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
+        mock_task = get_mock_task(current_user.id)
+        task_request = TaskRequest(**VALID_TASK_DATA)
+        collection = InMemoryIdempotencyCollection()
+
+        async def slow_create(*args):
+            await asyncio.sleep(0.05)
+            return mock_task
+
+        with patch('queries.idempotency.engine') as mock_engine, \
+             patch.object(TaskQueries, 'create_task', new_callable=AsyncMock) as mock_create:
+            mock_engine.get_collection.return_value = collection
+            mock_create.side_effect = slow_create
+
+            async def attempt():
+                return await create_task(
+                    task=task_request,
+                    current_user=current_user,
+                    queries=task_queries,
+                    idempotency_key="retry-1",
+                    idempotency=IdempotencyQueries()
+                )
+
+            original, concurrent_retry = await asyncio.gather(attempt(), attempt())
+            late_retry = await attempt()
+
+        mock_create.assert_called_once()
+        assert original.body == concurrent_retry.body == late_retry.body
+        assert "idempotent-replayed" not in original.headers
+        assert concurrent_retry.headers["Idempotent-Replayed"] == "true"
+        assert late_retry.media_type == "application/json"
+        assert late_retry.headers["vary"] == original.headers["vary"] == "Accept"
+        assert parse_response(late_retry, TaskResponse).id == str(mock_task.id)
+
+    @pytest.mark.asyncio
+    async def test_idempotent_replay_keeps_representation_headers(self):
+        collection = InMemoryIdempotencyCollection()
+
+        async def produce():
+            return Response(
+                content=b"{}",
+                media_type="application/json",
+                headers={"ETag": '"task-1-3"', "Vary": "Accept", "X-Request-Id": "first"}
+            )
+
+        with patch('queries.idempotency.engine') as mock_engine:
+            mock_engine.get_collection.return_value = collection
+
+            for _ in range(2):
+                replayed = await IdempotencyQueries().run("user", "retry-3", "create_task", "fingerprint", produce)
+
+        assert replayed.headers["Idempotent-Replayed"] == "true"
+        assert replayed.headers["etag"] == '"task-1-3"'
+        assert replayed.headers["vary"] == "Accept"
+        assert "x-request-id" not in replayed.headers
@@ -4,7 +4,7 @@ from fastapi import HTTPException, status
 from pydantic import ValidationError
 from bson import ObjectId
 
-from conftest import get_mock_user, get_mock_task, VALID_TASK_DATA
+from conftest import get_mock_user, get_mock_task, parse_response, VALID_TASK_DATA
 from models.tasks import TaskRequest, TaskResponse
 from models.users import UserResponse
 from queries.tasks import TaskQueries
@@ -20,8 +20,8 @@ class TestTasksSecurityPath:
         current_user = UserResponse(id=str(mock_user.id), username=mock_user.username)
         task_id = str(ObjectId())
 
-        with patch.object(TaskQueries, 'get_task', new_callable=AsyncMock) as mock_get:
-            mock_get.side_effect = ValueError("Task not found")
+        with patch('queries.tasks.engine') as mock_engine:
+            mock_engine.find_one = AsyncMock(return_value=None)
 
             with pytest.raises(HTTPException) as exc_info:
                 await get_task(
@@ -32,7 +32,7 @@ class TestTasksSecurityPath:
 
             assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
             assert "not found" in str(exc_info.value.detail).lower()
-            mock_get.assert_called_once_with(task_id, current_user.id)
+            mock_engine.find_one.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_invalid_task_id_format(self, task_queries):
@@ -63,7 +63,7 @@ class TestTasksSecurityPath:
             mock_task = get_mock_task(current_user.id, xss_data)
             mock_create.return_value = mock_task
 
-            result = await create_task(
+            response = await create_task(
                 task=task_request,
                 current_user=current_user,
                 queries=task_queries
@@ -71,7 +71,7 @@ class TestTasksSecurityPath:
 
             mock_create.assert_called_once_with(task_request, current_user.id)
             
-            assert result.title == xss_data["title"]
+            assert parse_response(response, TaskResponse).title == xss_data["title"]
 
     @pytest.mark.asyncio
     async def test_extremely_long_description(self):
@@ -107,8 +107,9 @@ class TestTasksSecurityPath:
         other_user_id = str(ObjectId())
         task = get_mock_task(other_user_id)
         
-        with patch.object(TaskQueries, 'get_task', new_callable=AsyncMock) as mock_get:
-            mock_get.side_effect = ValueError("Task not found")
+        with patch('queries.tasks.engine') as mock_engine:
+            # the query filters on user_id, so another user's task is not found
+            mock_engine.find_one = AsyncMock(return_value=None)
             
             with pytest.raises(HTTPException) as exc_info:
                 await get_task(
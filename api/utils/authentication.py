@@ -1,7 +1,7 @@
 import os
 import bcrypt
 from datetime import UTC, datetime, timedelta
-from fastapi import Cookie
+from fastapi import Cookie, Request
 from jose import JWTError, jwt
 from jose.constants import ALGORITHMS
 from typing import Annotated, Optional
@@ -9,30 +9,56 @@ from models.jwt import JWTPayload, JWTUserData
 from models.users import User
 from config.calendar_mgr import GoogleService
 from utils.exceptions import AuthExceptions
+from utils.password_hashing import password_pool
+from utils.token_cache import token_cache
 
 ALGORITHM = ALGORITHMS.HS256
 
+# bcrypt cost for new hashes; calibrate per host with `python -m config.bcrypt_cost`
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+
 SIGNING_KEY = os.environ.get("SIGNING_KEY")
 if not SIGNING_KEY:
     raise ValueError("SIGNING_KEY environment variable not set")
 
 
 async def decode_jwt(token: str) -> Optional[JWTPayload]:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
-        payload = jwt.decode(token, SIGNING_KEY, algorithms=[ALGORITHM])
-        return JWTPayload(**payload)
+        payload = JWTPayload(**jwt.decode(token, SIGNING_KEY, algorithms=[ALGORITHM]))
+        token_cache.put(token, payload)
+        return payload
     except (JWTError, AttributeError) as e:
         print(e)
     return None
 
 
+async def get_request_jwt_payload(request: Request, token: Optional[str]) -> Optional[JWTPayload]:
+    """
+    Decode the session token at most once per request. The result, including
+    a failed decode, is kept on request.state so logging_middleware and the
+    route dependencies share one verification.
+    """
+    state = request.state
+    if getattr(state, "jwt_token", None) == token and hasattr(state, "jwt_payload"):
+        return state.jwt_payload
+
+    payload = await decode_jwt(token) if token else None
+    state.jwt_token = token
+    state.jwt_payload = payload
+    return payload
+
+
 async def try_get_jwt_user_data(
+    request: Request,
     fast_api_token: Annotated[str | None, Cookie()] = None,
 ) -> Optional[JWTUserData]:
     if not fast_api_token:
         return
 
-    payload = await decode_jwt(fast_api_token)
+    payload = await get_request_jwt_payload(request, fast_api_token)
     if not payload:
         return
 
@@ -49,10 +75,28 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def hash_password(plain_password: str) -> str:
     return bcrypt.hashpw(
         plain_password.encode("utf-8"),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     ).decode()
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when a stored hash ($2b$<cost>$...) was made with a cost other than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt pool; raises a 503 when the pool is saturated"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    """hash_password on the bcrypt pool; raises a 503 when the pool is saturated"""
+    return await password_pool.run(hash_password, plain_password)
+
+
 def generate_jwt(user: User) -> str:
     exp = int((datetime.now(tz=UTC) + timedelta(hours=1)).timestamp())
     jwt_data = JWTPayload(
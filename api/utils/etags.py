@@ -0,0 +1,51 @@
+import hashlib
+from typing import Optional
+
+
+def collection_etag(user_id: str, version: int, variant: str = "") -> str:
+    """
+    Strong ETag for a user's task list at a given collection version. Filtered
+    or sorted listings pass their query as the variant so each representation
+    gets its own tag.
+    """
+    if variant:
+        digest = hashlib.sha256(variant.encode()).hexdigest()[:16]
+        return f'"tasks-{user_id}-{version}-{digest}"'
+    return f'"tasks-{user_id}-{version}"'
+
+
+def task_etag(task_id: str, version: int) -> str:
+    """
+    Strong ETag for a single task. Any write to the user's tasks bumps the
+    collection version, so it is safe to derive this from the version alone
+    and answer conditional requests without loading the task document.
+    """
+    return f'"task-{task_id}-{version}"'
+
+
+CONTENT_CODINGS = ("br", "gzip")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether If-None-Match names this representation, including the tags the
+    compression middleware gave its gzip and brotli codings.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates or etag in candidates:
+        return True
+    return any(coded_etag(etag, coding) in candidates for coding in CONTENT_CODINGS)
+
+
+def representation_etag(etag: str, media_type: str) -> str:
+    """Give each encoding of the same resource version its own strong ETag"""
+    if media_type == "application/json":
+        return etag
+    return f'{etag[:-1]}-{media_type.rsplit("/", 1)[-1]}"'
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    """Strong ETag of a representation sent with a content-coding such as gzip"""
+    return f'{etag[:-1]}-{coding}"'
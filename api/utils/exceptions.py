@@ -21,6 +21,22 @@ class AuthExceptions:
             detail="Incorrect username or password"
         )
 
+    @staticmethod
+    def busy(retry_after: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    @staticmethod
+    def too_many_attempts(retry_after: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many sign-in attempts, please try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
 class UserExceptions:
     @staticmethod
     def not_found(detail: str = "User not found") -> HTTPException:
@@ -61,6 +77,29 @@ class TaskExceptions:
             detail="Task not found"
         )
 
+    @staticmethod
+    def too_many_streams() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open task event streams"
+        )
+
+class IdempotencyExceptions:
+    @staticmethod
+    def key_reused() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+
+    @staticmethod
+    def in_progress(retry_after: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+            headers={"Retry-After": str(retry_after)}
+        )
+
 class CalendarExceptions:
     @staticmethod
     def not_connected() -> HTTPException:
@@ -91,6 +130,8 @@ def handle_database_operation(operation_name: str):
         async def wrapper(*args, **kwargs):
             try:
                 return await func(*args, **kwargs)
+            except HTTPException:
+                raise
             except ValueError as e:
                 logger.warning(
                     "validation_error",
@@ -0,0 +1,146 @@
+import math
+import os
+import time
+import structlog
+from collections import OrderedDict, deque
+from datetime import UTC, datetime
+from typing import Optional
+
+from pymongo import DESCENDING
+
+from utils.exceptions import AuthExceptions
+
+logger = structlog.get_logger()
+
+
+class MemoryThrottleBackend:
+    """
+    Per-worker sliding-window log. Each key keeps at most limit timestamps,
+    and keys are evicted least-recently-used past max_keys, so an attacker
+    cycling through usernames or addresses cannot grow it without bound.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._windows: OrderedDict[str, deque[float]] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float, now: float) -> float:
+        """Record an attempt, or return the seconds until one is allowed without recording it"""
+        attempts = self._windows.get(key)
+        if attempts is None:
+            attempts = self._windows[key] = deque(maxlen=limit)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+
+        while attempts and attempts[0] <= now - window:
+            attempts.popleft()
+        if len(attempts) >= limit:
+            return attempts[0] + window - now
+        attempts.append(now)
+        return 0.0
+
+    async def reset(self, key: str) -> None:
+        self._windows.pop(key, None)
+
+    def clear(self) -> None:
+        self._windows.clear()
+
+
+class MongoThrottleBackend:
+    """
+    Sliding-window log shared by every worker, one login_attempts document
+    per allowed attempt. Documents are removed by a TTL index once they fall
+    out of the window.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def hit(self, key: str, limit: int, window: float, now: float) -> float:
+        recent = await self.collection.find(
+            {"key": key, "at": {"$gt": now - window}},
+            {"at": 1}
+        ).sort("at", DESCENDING).limit(limit).to_list(limit)
+        if len(recent) >= limit:
+            return recent[-1]["at"] + window - now
+        await self.collection.insert_one({
+            "key": key,
+            "at": now,
+            "expires_at": datetime.fromtimestamp(now + window, tz=UTC),
+        })
+        return 0.0
+
+    async def reset(self, key: str) -> None:
+        await self.collection.delete_many({"key": key})
+
+
+class LoginThrottle:
+    """
+    Sliding-window limits on signin attempts per client IP and per username,
+    checked before the user lookup and bcrypt so a brute-force burst is
+    rejected for the cost of a dictionary lookup. A successful signin clears
+    its username's window so a user's own typos do not lock them out.
+
+    The backend is per-worker memory by default; MongoThrottleBackend makes
+    the limits hold across workers. If the shared backend fails, attempts are
+    let through rather than taking signin down with it.
+    """
+
+    def __init__(
+        self,
+        username_limit: int = 10,
+        ip_limit: int = 50,
+        window_seconds: float = 300,
+        backend=None
+    ):
+        self.username_limit = username_limit
+        self.ip_limit = ip_limit
+        self.window_seconds = window_seconds
+        self.backend = backend or MemoryThrottleBackend()
+        self.allowed = 0
+        self.rejected = {"ip": 0, "username": 0}
+        self.backend_errors = 0
+
+    async def check(self, username: str, client_ip: Optional[str]) -> None:
+        """Record a signin attempt, raising a 429 with Retry-After when a limit is exceeded"""
+        now = time.time()
+        keys = [("username", f"user:{username}", self.username_limit)]
+        if client_ip:
+            keys.insert(0, ("ip", f"ip:{client_ip}", self.ip_limit))
+
+        for scope, key, limit in keys:
+            try:
+                retry_after = await self.backend.hit(key, limit, self.window_seconds, now)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.error("login_throttle_backend_failed", error=str(e))
+                return
+            if retry_after > 0:
+                self.rejected[scope] += 1
+                logger.warning("login_throttled", scope=scope, username=username, client_ip=client_ip)
+                raise AuthExceptions.too_many_attempts(max(1, math.ceil(retry_after)))
+        self.allowed += 1
+
+    async def succeeded(self, username: str) -> None:
+        try:
+            await self.backend.reset(f"user:{username}")
+        except Exception as e:
+            self.backend_errors += 1
+            logger.error("login_throttle_backend_failed", error=str(e))
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected_ip": self.rejected["ip"],
+            "rejected_username": self.rejected["username"],
+            "backend_errors": self.backend_errors,
+        }
+
+
+login_throttle = LoginThrottle(
+    username_limit=int(os.environ.get("LOGIN_THROTTLE_USERNAME_LIMIT", "10")),
+    ip_limit=int(os.environ.get("LOGIN_THROTTLE_IP_LIMIT", "50")),
+    window_seconds=float(os.environ.get("LOGIN_THROTTLE_WINDOW_SECONDS", "300")),
+)
@@ -0,0 +1,25 @@
+from typing import AsyncIterator
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Split a streamed request body into numbered NDJSON lines without holding
+    more than one partial line in memory.
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Line {line_number + 1} exceeds {max_line_bytes} bytes")
+    if buffer:
+        yield line_number + 1, buffer
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import structlog
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from utils.exceptions import AuthExceptions
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class PasswordHashingPool:
+    """
+    Dedicated, size-bounded thread pool for bcrypt work.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without blocking the event loop. At most max_workers hashes run at once
+    and at most max_queue more wait behind them; anything beyond that is
+    shed immediately with a 503 instead of queueing for seconds while the
+    client's own timeout runs out.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, retry_after: int = 1):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self.completed = 0
+        self.shed = 0
+
+    @property
+    def pending(self) -> int:
+        """Jobs running or waiting for a worker"""
+        return self._pending
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_workers + self.max_queue:
+            self.shed += 1
+            logger.warning("password_hashing_shed", pending=self._pending)
+            raise AuthExceptions.busy(self.retry_after)
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "completed": self.completed,
+            "shed": self.shed,
+        }
+
+
+password_pool = PasswordHashingPool(
+    max_workers=int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", "32")),
+)
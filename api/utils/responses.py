@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Any, Optional
+
+import msgpack
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from models.tasks import Task, TaskBreakdown
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+
+
+def _default(obj: Any) -> Any:
+    # Field values straight off the instance: the models rendered here have no
+    # aliases or custom serializers, so this matches model_dump at a fraction
+    # of the cost and orjson recurses into nested models itself
+    if isinstance(obj, BaseModel):
+        return vars(obj)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def _msgpack_default(obj: Any) -> Any:
+    # Datetimes become the same ISO 8601 strings the JSON representation uses
+    if isinstance(obj, datetime):
+        text = obj.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    return _default(obj)
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON rendered with orjson from plain data. Returning a Response skips
+    FastAPI's response_model validation and jsonable_encoder pass, so use it
+    only for trusted internal objects whose shape already matches the
+    declared response model.
+    """
+    media_type = JSON
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class MsgPackResponse(Response):
+    """MessagePack rendering of the same trusted content FastJSONResponse takes"""
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+
+def preferred_media_type(accept: Optional[str]) -> str:
+    """
+    Pick JSON or MessagePack from an Accept header by quality value. JSON wins
+    ties and is the default for a missing header or wildcards.
+    """
+    if not accept:
+        return JSON
+    best, best_quality = JSON, 0.0
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.lower()
+        if media_type in MSGPACK_TYPES and quality > best_quality:
+            best, best_quality = MSGPACK, quality
+        elif media_type in (JSON, "application/*", "*/*") and quality >= best_quality:
+            best, best_quality = JSON, quality
+    return best
+
+
+def encode_response(
+    content: Any,
+    media_type: str = JSON,
+    status_code: int = 200,
+    headers: Optional[dict] = None
+) -> Response:
+    """
+    Shared encoder for negotiated endpoints: render trusted content in the
+    media type picked by preferred_media_type.
+    """
+    response_class = MsgPackResponse if media_type == MSGPACK else FastJSONResponse
+    response = response_class(content, status_code=status_code, headers=headers)
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+def task_document(task: Task, breakdown: Optional[TaskBreakdown] = None) -> dict:
+    """The TaskResponse fields of a stored task, without building a TaskResponse"""
+    return {
+        "id": str(task.id),
+        "title": task.title,
+        "description": task.description,
+        "priority": task.priority,
+        "status": task.status,
+        "user_id": task.user_id,
+        "context": task.context,
+        "breakdown": breakdown or task.breakdown,
+        "breakdown_key": task.breakdown_key,
+        "last_analyzed": task.last_analyzed,
+        "revision": task.revision,
+        "updated_at": task.updated_at,
+        "completed_at": task.completed_at,
+    }
+
+
+def archived_task_document(
+    task: Task,
+    archived_at: datetime,
+    breakdown: Optional[TaskBreakdown] = None
+) -> dict:
+    return {**task_document(task, breakdown), "archived_at": archived_at}
@@ -0,0 +1,20 @@
+import asyncio
+import structlog
+from typing import Callable
+
+logger = structlog.get_logger()
+
+
+async def log_stats(sources: dict[str, Callable[[], dict]], interval_seconds: float) -> None:
+    """
+    Log each source's counters as one component_stats line per interval, so
+    in-process caches and limiters can be watched from the log pipeline. A
+    source that fails is logged and the others still report.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for component, stats in sources.items():
+            try:
+                logger.info("component_stats", component=component, **stats())
+            except Exception as e:
+                logger.error("component_stats_failed", component=component, error=str(e))
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import socket
+import structlog
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+logger = structlog.get_logger()
+
+ARCHIVER_LEASE = "task_archiver"
+
+
+async def acquire_lease(collection, name: str, owner: str, ttl_seconds: float) -> bool:
+    """
+    Take the named lease for ttl_seconds if it has expired or was never
+    taken. The lease document's _id is its name, so when two workers race
+    for it one upsert wins and the other hits the unique _id and gets False.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        await collection.update_one(
+            {"_id": name, "expires_at": {"$lte": now}},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def run_task_archiver(queries, older_than: timedelta, interval_seconds: float, leases) -> None:
+    """
+    Periodically move long-completed tasks into the archive collection so the
+    hot tasks collection and its indexes only hold the working set. Every
+    worker runs this loop, but a run only starts under a lease held for one
+    interval, so each interval is archived by a single worker. A failed run
+    is logged and retried on the next interval.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    while True:
+        try:
+            if await acquire_lease(leases, ARCHIVER_LEASE, owner, interval_seconds):
+                await queries.archive_completed_tasks(older_than)
+            else:
+                logger.info("task_archive_run_skipped", reason="lease_held")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("task_archive_run_failed", error=str(e))
+        await asyncio.sleep(interval_seconds)
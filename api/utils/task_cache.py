@@ -0,0 +1,151 @@
+import asyncio
+import os
+import time
+import structlog
+from collections import OrderedDict
+from typing import Optional
+
+from models.tasks import Task
+
+logger = structlog.get_logger()
+
+
+class _UserTasks:
+    def __init__(self, version: Optional[int]):
+        self.version = version
+        self.tasks: Optional[list[Task]] = None
+        self.items: dict[str, Task] = {}
+        self.expires_at = 0.0
+
+
+class TaskReadCache:
+    """
+    Bounded, per-user, in-process cache of task lists and single tasks.
+
+    Entries are evicted least-recently-used once max_users is reached and
+    expire after ttl_seconds. Cached tasks are shared objects, so callers
+    must treat them as read-only. Fills are guarded by an invalidation epoch
+    so a read that raced a write never stores the pre-write result.
+    """
+
+    def __init__(self, max_users: int = 1000, ttl_seconds: float = 60):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, _UserTasks] = OrderedDict()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def epoch(self) -> int:
+        """Snapshot to take before reading from the database and pass back to the setters"""
+        return self._epoch
+
+    def _lookup(self, user_id: str, version: Optional[int]) -> Optional[_UserTasks]:
+        entry = self._entries.get(user_id)
+        if not entry:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        if version is not None and entry.version != version:
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def _entry_for_fill(self, user_id: str, version: Optional[int]) -> _UserTasks:
+        entry = self._lookup(user_id, None)
+        if not entry or (version is not None and entry.version != version):
+            entry = _UserTasks(version)
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        entry.expires_at = time.monotonic() + self.ttl_seconds
+        return entry
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def get_tasks(self, user_id: str, version: Optional[int] = None) -> Optional[list[Task]]:
+        entry = self._lookup(user_id, version)
+        tasks = entry.tasks if entry else None
+        self._record(tasks is not None)
+        return tasks
+
+    def set_tasks(self, user_id: str, tasks: list[Task], epoch: int, version: Optional[int] = None) -> None:
+        if epoch != self._epoch:
+            return
+        entry = self._entry_for_fill(user_id, version)
+        entry.tasks = tasks
+        entry.items = {str(task.id): task for task in tasks}
+
+    def get_task(self, user_id: str, task_id: str, version: Optional[int] = None) -> Optional[Task]:
+        entry = self._lookup(user_id, version)
+        task = entry.items.get(task_id) if entry else None
+        self._record(task is not None)
+        return task
+
+    def set_task(self, user_id: str, task: Task, epoch: int, version: Optional[int] = None) -> None:
+        if epoch != self._epoch:
+            return
+        entry = self._entry_for_fill(user_id, version)
+        entry.items[str(task.id)] = task
+
+    def invalidate(self, user_id: str) -> None:
+        self._epoch += 1
+        if self._entries.pop(user_id, None):
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+task_cache = TaskReadCache(
+    max_users=int(os.environ.get("TASK_CACHE_MAX_USERS", "1000")),
+    ttl_seconds=float(os.environ.get("TASK_CACHE_TTL_SECONDS", "60")),
+)
+
+
+async def watch_task_invalidations(cache: TaskReadCache, collection) -> None:
+    """
+    Cross-worker invalidation channel. Every task write updates the user's
+    document in task_versions when its version is allocated and again once it
+    is committed, so watching that collection's change stream tells each
+    worker which users to drop, the second time after the write has landed. Requires a replica set; any gap in
+    the stream clears the whole cache since invalidations may have been missed.
+    """
+    while True:
+        try:
+            async with collection.watch(full_document="updateLookup") as stream:
+                cache.clear()
+                logger.info("task_cache_invalidation_stream_started")
+                async for change in stream:
+                    document = change.get("fullDocument")
+                    if document:
+                        cache.invalidate(document["user_id"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("task_cache_invalidation_stream_failed", error=str(e))
+            cache.clear()
+            await asyncio.sleep(5)
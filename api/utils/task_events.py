@@ -0,0 +1,146 @@
+import asyncio
+import os
+import structlog
+from collections import defaultdict
+from typing import Optional
+
+from models.tasks import Task, TaskResponse
+
+logger = structlog.get_logger()
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+RESYNC = "resync"
+
+
+class TaskEventBroker:
+    """
+    In-process pub/sub of task change events, one bounded queue per
+    connected client. A client that falls behind has its backlog replaced by
+    a single resync event, telling it to catch up through /api/tasks/sync
+    instead of letting its queue grow without limit.
+    """
+
+    def __init__(self, queue_size: int = 100, max_connections_per_user: int = 5, local_publish: bool = True):
+        self.queue_size = queue_size
+        self.max_connections_per_user = max_connections_per_user
+        self.local_publish = local_publish
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self.published = 0
+        self.overflows = 0
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+    def can_subscribe(self, user_id: str) -> bool:
+        return len(self._subscribers.get(user_id, ())) < self.max_connections_per_user
+
+    def subscribe(self, user_id: str) -> Optional[asyncio.Queue]:
+        """Register a client queue, or None when the user has too many open connections"""
+        if not self.can_subscribe(user_id):
+            return None
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[user_id]
+
+    def publish(
+        self,
+        user_id: str,
+        event_type: str,
+        task_id: str,
+        sync_version: Optional[int] = None,
+        task: Optional[Task] = None
+    ) -> None:
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return
+
+        event = {"type": event_type, "task_id": task_id, "sync_version": sync_version}
+        if task is not None:
+            event["task"] = TaskResponse.from_mongo(task).model_dump(mode="json")
+
+        for queue in subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflows += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": RESYNC})
+                logger.warning("task_event_queue_overflow", user_id=user_id)
+        self.published += 1
+
+    def resync(self, user_id: str) -> None:
+        """Replace a user's pending events with a single resync, e.g. after a bulk import"""
+        for queue in self._subscribers.get(user_id, ()):
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": RESYNC})
+
+    def resync_all(self) -> None:
+        """Tell every connected client to catch up, e.g. after events may have been lost"""
+        for user_id in list(self._subscribers):
+            self.resync(user_id)
+
+    def publish_local(self, *args, **kwargs) -> None:
+        """Publish from a write path, unless a change stream is the event source"""
+        if self.local_publish:
+            self.publish(*args, **kwargs)
+
+
+task_events = TaskEventBroker(
+    queue_size=int(os.environ.get("TASK_EVENTS_QUEUE_SIZE", "100")),
+    local_publish=os.environ.get("TASK_EVENTS_SOURCE", "local") != "change_stream",
+)
+
+
+async def watch_task_changes(broker: TaskEventBroker, database) -> None:
+    """
+    Change-stream event source for multi-worker deployments. Task inserts and
+    updates come from the tasks collection; deletions are read from
+    task_tombstones because a delete event carries no user_id. Requires a
+    replica set (a single-node one is enough).
+    """
+    pipeline = [{"$match": {
+        "ns.coll": {"$in": [Task.model_config["collection"], "task_tombstones"]},
+        "operationType": {"$in": ["insert", "update", "replace"]},
+    }}]
+    while True:
+        try:
+            async with database.watch(pipeline, full_document="updateLookup") as stream:
+                logger.info("task_change_stream_started")
+                async for change in stream:
+                    document = change.get("fullDocument")
+                    if not document:
+                        continue
+                    if change["ns"]["coll"] == "task_tombstones":
+                        broker.publish(
+                            document["user_id"],
+                            TASK_DELETED,
+                            document["task_id"],
+                            document.get("sync_version")
+                        )
+                        continue
+                    task = Task.model_validate_doc(document)
+                    broker.publish(
+                        task.user_id,
+                        TASK_CREATED if change["operationType"] == "insert" else TASK_UPDATED,
+                        str(task.id),
+                        task.sync_version,
+                        task
+                    )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("task_change_stream_failed", error=str(e))
+            broker.resync_all()
+            await asyncio.sleep(5)
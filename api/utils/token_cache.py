@@ -0,0 +1,72 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from models.jwt import JWTPayload
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of session tokens that already passed signature and claim
+    validation, so a token presented on every request for its lifetime is
+    verified once per worker.
+
+    Entries are keyed by a SHA-256 digest of the full token, signature
+    included, and only ever written after a successful verification: a forged
+    or altered token hashes to a different key and misses. Each entry expires
+    at the token's own exp claim.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, JWTPayload] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[JWTPayload]:
+        key = self.key_for(token)
+        payload = self._entries.get(key)
+        if payload is not None and payload.exp <= time.time():
+            del self._entries[key]
+            payload = None
+        if payload is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: JWTPayload) -> None:
+        if self.max_entries <= 0:
+            return
+        key = self.key_for(token)
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+token_cache = VerifiedTokenCache(
+    max_entries=int(os.environ.get("JWT_CACHE_MAX_ENTRIES", "10000")),
+)